@@ -0,0 +1,55 @@
+"""Alokasi slot terdekat: index grid vs pemindaian linear + sort.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_alokasi.py
+"""
+import math
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.domain.alokasi_slot import Koordinat, SlotParkir  # noqa: E402
+from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository  # noqa: E402
+
+LANTAI = 5
+SLOT_PER_LANTAI = 10_000  # 100 x 100 bay per lantai
+TERISI = 0.9
+N = 500
+
+
+def linear(repo: InMemorySlotParkirRepository, pintu: Koordinat):
+    kandidat = repo.list_tersedia()
+    kandidat.sort(key=lambda s: (
+        abs(s.koordinat.lantai - pintu.lantai),
+        s.koordinat.lantai,
+        math.hypot(s.koordinat.posisi_x - pintu.posisi_x, s.koordinat.posisi_y - pintu.posisi_y),
+    ))
+    return kandidat[0] if kandidat else None
+
+
+def main() -> None:
+    rng = random.Random(1)
+    repo = InMemorySlotParkirRepository(ukuran_sel_grid=15.0)
+    for lantai in range(LANTAI):
+        for i in range(SLOT_PER_LANTAI):
+            slot = repo.save(SlotParkir.create(lantai, (i % 100) * 3.0, (i // 100) * 5.0))
+            if rng.random() < TERISI:
+                slot.tandai_terisi()
+
+    pintu = [Koordinat(rng.randrange(LANTAI), rng.uniform(0, 300), rng.uniform(0, 500)) for _ in range(N)]
+    for p in pintu[:50]:
+        assert repo.cari_tersedia_terdekat(p) is linear(repo, p)
+
+    grid = timeit.timeit(lambda: [repo.cari_tersedia_terdekat(p) for p in pintu], number=1) / N
+    scan = timeit.timeit(lambda: [linear(repo, p) for p in pintu[:50]], number=1) / 50
+    print(f"{LANTAI * SLOT_PER_LANTAI:,} slot, {repo.count_tersedia():,} tersedia")
+    print(f"  grid            {grid * 1e6:>10.1f} us/alokasi")
+    print(f"  linear + sort   {scan * 1e6:>10.1f} us/alokasi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark analitik: setahun riwayat (~2000 sesi per hari) dari repository memori.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_analitik.py
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.application.analitik import LEBAR_INTERVAL, ringkas  # noqa: E402
+from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository  # noqa: E402
+
+from bench_arsip import buat_sesi  # noqa: E402
+
+N_SESI = 730_000
+N_KENDARAAN = 20_000
+N_SLOT = 1_000
+N_LANTAI = 5
+N_ULANG = 3
+
+
+def main() -> None:
+    kendaraan = [(uuid4(), uuid4(), f"B {i} XY") for i in range(N_KENDARAAN)]
+    slots = [uuid4() for _ in range(N_SLOT)]
+    lantai_slot = {slot_id: i % N_LANTAI for i, slot_id in enumerate(slots)}
+    awal = datetime(2024, 1, 1)
+    repo = InMemorySesiParkirRepository()
+    for i in range(N_SESI):
+        sesi = buat_sesi(i, kendaraan, slots, awal)
+        # sebar setahun penuh, bukan 150 detik per sesi
+        sesi.waktu_masuk = awal + timedelta(seconds=43 * i)
+        sesi.waktu_keluar = sesi.waktu_masuk + timedelta(minutes=sesi.durasi.total_menit)
+        repo.save(sesi)
+        if i % 100_000 == 99_999:
+            repo.arsipkan()
+    repo.arsipkan()
+    print(f"{N_SESI} sesi, {N_SLOT} slot di {N_LANTAI} lantai, {repo.jumlah_arsip()} di arsip")
+
+    for interval, lebar in LEBAR_INTERVAL.items():
+        terbaik = float("inf")
+        for _ in range(N_ULANG):
+            mulai = time.perf_counter()
+            kolom = repo.kolom_analitik()
+            tengah = time.perf_counter()
+            hasil = ringkas(kolom, lantai_slot, lebar)
+            selesai = time.perf_counter()
+            if selesai - mulai < terbaik:
+                terbaik, baca, hitung = selesai - mulai, tengah - mulai, selesai - tengah
+        print(
+            f"  interval={interval:<5}{len(hasil.per_interval):>6} ember  "
+            f"kolom {baca * 1e3:6.0f} ms + ringkas {hitung * 1e3:6.0f} ms = {terbaik * 1e3:6.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
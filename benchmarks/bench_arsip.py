@@ -0,0 +1,88 @@
+"""Benchmark arsip kolumnar sesi selesai: memori, waktu kompaksi, dan query.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_arsip.py
+"""
+import gc
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi  # noqa: E402
+from manajemen_parkir.domain.value_objects import BiayaFinal, Durasi, NomorPlat  # noqa: E402
+from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository  # noqa: E402
+
+N_SESI = 200_000
+N_KENDARAAN = 4_000
+N_SLOT = 1_000
+N_REQUEST = 50
+
+
+def buat_sesi(i, kendaraan, slots, awal):
+    owner_id, vehicle_id, plat = kendaraan[i % len(kendaraan)]
+    masuk = awal + timedelta(seconds=150 * i)
+    menit = 15 + i * 7 % 600
+    return SesiParkir(
+        nomor_plat=NomorPlat(plat, "MOBIL"),
+        waktu_masuk=masuk,
+        waktu_keluar=masuk + timedelta(minutes=menit),
+        status=StatusSesi.SELESAI,
+        durasi=Durasi(total_menit=menit),
+        biaya_final=BiayaFinal(jumlah=Decimal(3000 * (menit // 60 + 1))),
+        owner_id=owner_id,
+        vehicle_id=vehicle_id,
+        slot_id=slots[i % len(slots)],
+    )
+
+
+def ukur_query(repo, owner_id, id_sesi):
+    for nama, fn in (
+        ("get_by_id", lambda: repo.get_by_id(id_sesi)),
+        ("list_history_by_owner", lambda: repo.list_history_by_owner(owner_id)),
+        ("list_halaman(100)", lambda: repo.list_halaman(batas=100)),
+    ):
+        detik = timeit.timeit(fn, number=N_REQUEST) / N_REQUEST
+        print(f"    {nama:<24}{detik * 1e3:>8.2f} ms")
+
+
+def main() -> None:
+    kendaraan = [(uuid4(), uuid4(), f"B {i} XY") for i in range(N_KENDARAAN)]
+    slots = [uuid4() for _ in range(N_SLOT)]
+    awal = datetime(2024, 1, 1, 6, 0)
+    repo = InMemorySesiParkirRepository()
+
+    gc.collect()
+    tracemalloc.start()
+    nol = tracemalloc.get_traced_memory()[0]
+    for i in range(N_SESI):
+        repo.save(buat_sesi(i, kendaraan, slots, awal))
+    gc.collect()
+    panas = (tracemalloc.get_traced_memory()[0] - nol) / N_SESI
+    repo.arsipkan()
+    gc.collect()
+    arsip = (tracemalloc.get_traced_memory()[0] - nol) / N_SESI
+    tracemalloc.stop()
+    print(f"{N_SESI} sesi selesai, {N_KENDARAAN} kendaraan, {N_SLOT} slot")
+    print(f"  memori: {panas:.0f} -> {arsip:.0f} bytes/sesi ({panas / arsip:.1f}x)")
+
+    repo = InMemorySesiParkirRepository()
+    for i in range(N_SESI):
+        repo.save(buat_sesi(i, kendaraan, slots, awal))
+    contoh = repo.list()[N_SESI // 2].id_sesi
+    print("  query, sesi di memori:")
+    ukur_query(repo, kendaraan[7][0], contoh)
+    detik = timeit.timeit(repo.arsipkan, number=1)
+    print(f"  kompaksi: {detik:.2f} s")
+    print("  query, sesi di arsip:")
+    ukur_query(repo, kendaraan[7][0], contoh)
+
+
+if __name__ == "__main__":
+    main()
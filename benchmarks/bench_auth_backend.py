@@ -0,0 +1,61 @@
+"""Micro-benchmark: import jose per panggilan vs codec yang dipilih sekali.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_auth_backend.py
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.application.services import AuthService  # noqa: E402
+
+N = 20_000
+CLAIMS = {"sub": "gate-01", "akun_id": "00000000-0000-0000-0000-000000000000", "peran": "PETUGAS"}
+
+
+def encode_lama(data: dict) -> str:
+    try:
+        from jose import jwt
+        to_encode = data.copy()
+        expire = datetime.utcnow() + timedelta(minutes=AuthService.ACCESS_TOKEN_EXPIRE_MINUTES)
+        to_encode.update({"exp": expire})
+        return jwt.encode(to_encode, AuthService.SECRET_KEY, algorithm=AuthService.ALGORITHM)
+    except ImportError:
+        raise
+
+
+def decode_lama(token: str) -> dict:
+    try:
+        from jose import jwt, JWTError  # noqa: F401
+        return jwt.decode(token, AuthService.SECRET_KEY, algorithms=[AuthService.ALGORITHM])
+    except ImportError:
+        raise
+
+
+def per_call_us(fn) -> float:
+    return min(timeit.repeat(fn, number=N, repeat=5)) / N * 1e6
+
+
+def main() -> None:
+    service = AuthService()
+    token = service._create_access_token(CLAIMS)
+
+    hasil = [
+        ("encode", per_call_us(lambda: encode_lama(CLAIMS)),
+         per_call_us(lambda: service._create_access_token(CLAIMS))),
+        ("decode", per_call_us(lambda: decode_lama(token)),
+         per_call_us(lambda: service._decode_token(token))),
+    ]
+
+    print(f"token codec: {service.token_codec.nama}, {N} panggilan")
+    print(f"{'operasi':<8} {'lama (us)':>10} {'baru (us)':>10} {'hemat (us)':>11}")
+    for nama, lama, baru in hasil:
+        print(f"{nama:<8} {lama:>10.2f} {baru:>10.2f} {lama - baru:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
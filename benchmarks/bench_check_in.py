@@ -0,0 +1,52 @@
+"""Throughput check-in paralel: satu lock global vs lock per slot (striped).
+
+Jalankan dari root project:
+
+    python benchmarks/bench_check_in.py
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.application.services import ParkingService, SlotTidakTersedia  # noqa: E402
+from manajemen_parkir.domain.alokasi_slot import SlotParkir  # noqa: E402
+from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository  # noqa: E402
+from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository  # noqa: E402
+
+JUMLAH_SLOT = 5_000
+PERCOBAAN = 40_000
+THREADS = 32
+
+
+def ukur(nama: str, jumlah_kunci: int) -> None:
+    slot_repo = InMemorySlotParkirRepository(jumlah_kunci=jumlah_kunci)
+    service = ParkingService(InMemorySesiParkirRepository(), None, slot_repo)
+    slot_ids = [slot_repo.save(SlotParkir.create(i % 10, float(i), 0.0)).id for i in range(JUMLAH_SLOT)]
+
+    def check_in(i):
+        try:
+            service.start_parking(uuid4(), uuid4(), slot_ids[i % JUMLAH_SLOT])
+            return 1
+        except SlotTidakTersedia:
+            return 0
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        berhasil = sum(pool.map(check_in, range(PERCOBAAN), chunksize=256))
+    detik = time.perf_counter() - mulai
+
+    assert berhasil == JUMLAH_SLOT == slot_repo.count_terisi()
+    print(f"{nama:<22}{PERCOBAAN / detik:>12,.0f} check-in/s  ({berhasil} slot terisi, tanpa double booking)")
+
+
+def main() -> None:
+    ukur("lock global (1)", 1)
+    ukur("striped (64 lock)", 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Biaya check-out per 100 ribu sesi: jalur float + Decimal lama vs tarif sen.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_checkout.py
+"""
+import random
+import sys
+import time
+from datetime import datetime, time as jam, timedelta
+from decimal import Decimal
+from math import ceil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi, _durasi  # noqa: E402
+from manajemen_parkir.domain.tariff import (  # noqa: E402
+    DaftarTarif,
+    JendelaTarif,
+    TarifParkir,
+    TipeKendaraan,
+)
+from manajemen_parkir.domain.value_objects import BiayaFinal, NomorPlat  # noqa: E402
+
+N_SESI = 100_000
+N_ULANG = 3
+
+
+def check_out_lama(sesi: SesiParkir, price_per_hour: float, max_daily: float) -> None:
+    """Salinan jalur sebelum tarif sen: float per sesi lalu Decimal baru."""
+    sesi.waktu_keluar = datetime.utcnow()
+    selisih = sesi.waktu_keluar - sesi.waktu_masuk
+    sesi.durasi = _durasi(int(selisih.total_seconds() / 60))
+    hours = max(1, ceil(selisih.total_seconds() / 3600))
+    fee = hours * price_per_hour
+    days = max(1, (sesi.waktu_keluar.date() - sesi.waktu_masuk.date()).days + 1)
+    fee = min(fee, days * max_daily)
+    sesi.biaya_final = BiayaFinal(jumlah=Decimal(float(fee)))
+    sesi.status = StatusSesi.SELESAI
+
+
+def buat_sesi(rng: random.Random):
+    sekarang = datetime.utcnow()
+    tipe = ("MOBIL", "MOTOR", None)
+    return [
+        SesiParkir(
+            nomor_plat=NomorPlat(kode=f"B {i} XY", tipe_kendaraan=tipe[i % 3]),
+            waktu_masuk=sekarang - timedelta(seconds=rng.randrange(60, 3 * 86400)),
+        )
+        for i in range(N_SESI)
+    ]
+
+
+def ukur(nama: str, check_out) -> None:
+    rng = random.Random(1)
+    terbaik = float("inf")
+    for _ in range(N_ULANG):
+        daftar = buat_sesi(rng)
+        mulai = time.perf_counter()
+        for sesi in daftar:
+            check_out(sesi)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    print(f"  {nama:<32}{terbaik * 1e3:8.0f} ms / {N_SESI} sesi  ({terbaik / N_SESI * 1e9:5.0f} ns/sesi)")
+
+
+def main() -> None:
+    daftar_tarif = DaftarTarif(tarif=[
+        TarifParkir.create("Motor", TipeKendaraan.MOTOR, Decimal("2000"), harga_maksimum_harian=Decimal("20000")),
+        TarifParkir.create("Mobil", TipeKendaraan.MOBIL, Decimal("5000"), harga_maksimum_harian=Decimal("60000")),
+    ])
+    bawaan = daftar_tarif.bawaan
+    berjadwal = TarifParkir.create(
+        "Mobil berjadwal", TipeKendaraan.MOBIL, Decimal("3000"),
+        harga_maksimum_harian=Decimal("60000"),
+        jendela=[
+            JendelaTarif("AKHIR_PEKAN", Decimal("4000"), jam(0), jam(0), frozenset({5, 6})),
+            JendelaTarif("MALAM", Decimal("1000"), jam(22), jam(6)),
+            JendelaTarif("PUNCAK", Decimal("6000"), jam(7), jam(9), frozenset(range(5))),
+            JendelaTarif("SORE", Decimal("5000"), jam(16), jam(19), frozenset(range(5))),
+        ],
+        selisih_utc_menit=420,
+    )
+
+    print("check-out, 1/3 motor, 1/3 mobil, 1/3 tanpa tipe")
+    ukur("float + Decimal (lama)", lambda sesi: check_out_lama(sesi, 3000.0, 50000.0))
+    ukur("sen, satu tarif", lambda sesi: sesi.check_out(bawaan))
+    ukur(
+        "sen, tarif per tipe kendaraan",
+        lambda sesi: sesi.check_out(daftar_tarif.pilih(sesi.nomor_plat.tipe_kendaraan)),
+    )
+    ukur("sen, jadwal 4 jendela", lambda sesi: sesi.check_out(berjadwal))
+
+
+if __name__ == "__main__":
+    main()
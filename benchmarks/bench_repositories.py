@@ -0,0 +1,85 @@
+"""Benchmark repository InMemory vs SQLite (WAL) untuk operasi yang sering dipakai API.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_repositories.py
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manajemen_parkir.domain.alokasi_slot import SlotParkir  # noqa: E402
+from manajemen_parkir.domain.auth import Akun, Peran  # noqa: E402
+from manajemen_parkir.domain.model import SesiParkir  # noqa: E402
+from manajemen_parkir.domain.user import User, Vehicle  # noqa: E402
+from manajemen_parkir.domain.value_objects import NomorPlat  # noqa: E402
+from manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository  # noqa: E402
+from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository  # noqa: E402
+from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository  # noqa: E402
+from manajemen_parkir.infrastructure.sqlite_repository import (  # noqa: E402
+    SQLiteAuthRepository,
+    SQLiteDatabase,
+    SQLiteSesiParkirRepository,
+    SQLiteSlotParkirRepository,
+    SQLiteUserRepository,
+)
+from manajemen_parkir.infrastructure.user_repository import InMemoryUserRepository  # noqa: E402
+
+N_DATA = 2_000
+N_OPS = 2_000
+
+
+def isi(repos):
+    auth, users, slots, sesi = repos
+    for i in range(N_DATA):
+        auth.save(Akun.create(f"user{i}", "hash", Peran.PENGGUNA))
+        user = User.create(f"User {i}")
+        user.vehicles.append(Vehicle.create_legacy(f"B {i} XY", "MOBIL"))
+        users.save(user)
+        slots.save(SlotParkir.create(i % 5, float(i), 0.0))
+        sesi.save(SesiParkir(nomor_plat=NomorPlat(f"B {i} XY"), owner_id=user.id))
+    return users.list()[N_DATA // 2].id
+
+
+def ukur(nama, repos):
+    auth, users, slots, sesi = repos
+    mulai = timeit.default_timer()
+    owner_id = isi(repos)
+    isi_detik = timeit.default_timer() - mulai
+
+    hasil = {
+        "save (4 repo)": isi_detik / N_DATA,
+        "get_by_username": timeit.timeit(lambda: auth.get_by_username("user777"), number=N_OPS) / N_OPS,
+        "find_by_plate": timeit.timeit(lambda: users.find_by_plate("b777xy"), number=N_OPS) / N_OPS,
+        "list_active_by_owner": timeit.timeit(lambda: sesi.list_active_by_owner(owner_id), number=N_OPS) / N_OPS,
+        "count_tersedia": timeit.timeit(slots.count_tersedia, number=N_OPS) / N_OPS,
+        "list_tersedia(lantai)": timeit.timeit(lambda: slots.list_tersedia(2), number=20) / 20,
+    }
+    print(f"\n{nama}")
+    for op, detik in hasil.items():
+        print(f"  {op:<24}{detik * 1e6:>12.1f} us/op")
+
+
+def main() -> None:
+    ukur("InMemory", (
+        InMemoryAuthRepository(),
+        InMemoryUserRepository(),
+        InMemorySlotParkirRepository(),
+        InMemorySesiParkirRepository(),
+    ))
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabase(str(Path(tmp) / "bench.db"))
+        ukur("SQLite (WAL)", (
+            SQLiteAuthRepository(db),
+            SQLiteUserRepository(db),
+            SQLiteSlotParkirRepository(db),
+            SQLiteSesiParkirRepository(db),
+        ))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark endpoint list dengan 10k baris: serialisasi respons end-to-end.
+
+Jalankan dari root project:
+
+    python benchmarks/bench_serialisasi.py
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from manajemen_parkir.api.dependencies import (  # noqa: E402
+    get_sesi_repository,
+    get_slot_repository,
+    get_slot_service,
+    get_user_repository,
+    verify_token_dependency,
+)
+from manajemen_parkir.application.slot_service import SlotParkirService  # noqa: E402
+from manajemen_parkir.domain.alokasi_slot import Sensor, SlotParkir, TipeSensor  # noqa: E402
+from manajemen_parkir.domain.auth import Akun, Peran  # noqa: E402
+from manajemen_parkir.domain.model import SesiParkir  # noqa: E402
+from manajemen_parkir.domain.value_objects import BiayaFinal, Durasi, NomorPlat  # noqa: E402
+from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository  # noqa: E402
+from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository  # noqa: E402
+from manajemen_parkir.infrastructure.user_repository import InMemoryUserRepository  # noqa: E402
+
+N_BARIS = 10_000
+N_REQUEST = 10
+
+
+def isi():
+    sesi_repo = InMemorySesiParkirRepository()
+    slot_repo = InMemorySlotParkirRepository()
+    awal = datetime(2024, 1, 1, 7, 0, 0, 123456)
+    for i in range(N_BARIS):
+        sesi = SesiParkir(
+            nomor_plat=NomorPlat(f"B {i} XY", "MOBIL"),
+            waktu_masuk=awal + timedelta(minutes=i),
+            owner_id=uuid4(),
+            vehicle_id=uuid4(),
+            slot_id=uuid4(),
+        )
+        if i % 2:
+            sesi.waktu_keluar = sesi.waktu_masuk + timedelta(minutes=95)
+            sesi.durasi = Durasi(total_menit=95)
+            sesi.biaya_final = BiayaFinal(jumlah=Decimal("6000"))
+        sesi_repo.save(sesi)
+        sensor = Sensor.create(TipeSensor.KAMERA) if i % 3 == 0 else None
+        slot_repo.save(SlotParkir.create(i % 5, float(i), 0.0, sensor=sensor))
+    return sesi_repo, slot_repo
+
+
+def main() -> None:
+    sesi_repo, slot_repo = isi()
+    slot_service = SlotParkirService(slot_repo)
+    akun = Akun.create("bench", "hash", Peran.ADMIN)
+    app.dependency_overrides[verify_token_dependency] = lambda: akun
+    app.dependency_overrides[get_sesi_repository] = lambda: sesi_repo
+    app.dependency_overrides[get_slot_repository] = lambda: slot_repo
+    app.dependency_overrides[get_user_repository] = InMemoryUserRepository
+    app.dependency_overrides[get_slot_service] = lambda: slot_service
+    client = TestClient(app)
+
+    print(f"{N_BARIS} baris, rata-rata {N_REQUEST} request")
+    for path in ("/parking/sessions", "/slots/", "/slots/tersedia"):
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+        detik = timeit.timeit(lambda: client.get(path), number=N_REQUEST) / N_REQUEST
+        print(f"  GET {path:<20}{detik * 1e3:>10.1f} ms  {len(response.content) / 1e6:.2f} MB")
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
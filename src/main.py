@@ -1,10 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from manajemen_parkir.api.endpoints import router as parking_router
 from manajemen_parkir.api.users import router as users_router
 from manajemen_parkir.api.auth import router as auth_router
 from manajemen_parkir.api.slots import router as slots_router
+from manajemen_parkir.api.dependencies import get_penjadwal_arsip
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    penjadwal = get_penjadwal_arsip()
+    if penjadwal is not None:
+        penjadwal.mulai()
+    try:
+        yield
+    finally:
+        if penjadwal is not None:
+            penjadwal.berhenti()
+
 
-app = FastAPI(title="II3160 Smart Parking System", version="0.1.0")
+app = FastAPI(title="II3160 Smart Parking System", version="0.1.0", lifespan=lifespan)
 app.include_router(auth_router)
 app.include_router(parking_router)
 app.include_router(users_router)
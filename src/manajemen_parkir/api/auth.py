@@ -4,10 +4,12 @@ from pydantic import BaseModel
 from typing import Optional
 
 from manajemen_parkir.application.services import AuthService
-from manajemen_parkir.domain.auth import Peran
+from manajemen_parkir.application.hashing_pool import HashingPoolPenuh
+from manajemen_parkir.domain.auth import Akun, Peran
 from manajemen_parkir.api.dependencies import (
     get_auth_service,
     security,
+    verify_token_dependency,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -32,7 +34,7 @@ class TokenResponse(BaseModel):
 
 
 @router.post("/register", status_code=201)
-def register(
+async def register(
     request: RegisterRequest,
     auth_service: AuthService = Depends(get_auth_service),
 ):
@@ -51,7 +53,7 @@ def register(
                 detail=f"Peran tidak valid. Pilih: ADMIN, PETUGAS, atau PENGGUNA",
             )
 
-        akun, user = auth_service.register(
+        akun, user = await auth_service.register_async(
             username=request.username,
             password=request.password,
             email=request.email,
@@ -67,12 +69,14 @@ def register(
             "message": "Registrasi berhasil. User profile otomatis dibuat.",
         }
 
+    except HashingPoolPenuh as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     request: LoginRequest,
     auth_service: AuthService = Depends(get_auth_service),
 ):
@@ -83,7 +87,7 @@ def login(
                 detail="Password terlalu panjang. Maksimal 72 karakter.",
             )
         
-        token_akses = auth_service.login(
+        token_akses = await auth_service.login_async(
             username=request.username,
             password=request.password,
         )
@@ -94,6 +98,8 @@ def login(
             "expires_at": token_akses.expires_at.isoformat(),
         }
 
+    except HashingPoolPenuh as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
@@ -118,3 +124,20 @@ def get_current_user(
 
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
+
+
+@router.get("/token-cache")
+def get_token_cache_stats(
+    current_akun: Akun = Depends(verify_token_dependency),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    return auth_service.token_cache.stats()
+
+
+
+@router.get("/hashing-pool")
+def get_hashing_pool_stats(
+    current_akun: Akun = Depends(verify_token_dependency),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    return auth_service.hashing_pool.stats()
@@ -5,15 +5,59 @@ from manajemen_parkir.infrastructure.user_repository import InMemoryUserReposito
 from manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository
 from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository
 from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
+from manajemen_parkir.infrastructure.tarif_repository import InMemoryTarifParkirRepository
+from manajemen_parkir.infrastructure.sqlite_repository import (
+    SQLiteAuthRepository,
+    SQLiteDatabase,
+    SQLiteSesiParkirRepository,
+    SQLiteSlotParkirRepository,
+    SQLiteTarifParkirRepository,
+    SQLiteUserRepository,
+)
 from manajemen_parkir.application.services import AuthService
 from manajemen_parkir.application.slot_service import SlotParkirService
-
-_shared_user_repo = InMemoryUserRepository()
-_shared_auth_repo = InMemoryAuthRepository()
-_shared_slot_repo = InMemorySlotParkirRepository()
-_shared_sesi_repo = InMemorySesiParkirRepository()
+from manajemen_parkir.application.token_cache import TokenCache
+from manajemen_parkir.application.hashing_pool import HashingPool
+from manajemen_parkir.application.password_hasher import password_hashing_dari_config
+from manajemen_parkir.application.token_codec import token_codec_untuk
+from manajemen_parkir.application.penjadwal_arsip import PenjadwalArsip
+from manajemen_parkir.application.kutipan import CacheKutipan
+from manajemen_parkir.application.pemilih_tarif import PemilihTarif
+from manajemen_parkir import config
+
+if config.STORAGE == "sqlite":
+    _shared_db = SQLiteDatabase(config.SQLITE_PATH, pool_size=config.SQLITE_POOL)
+    _shared_user_repo = SQLiteUserRepository(_shared_db)
+    _shared_auth_repo = SQLiteAuthRepository(_shared_db)
+    _shared_slot_repo = SQLiteSlotParkirRepository(_shared_db)
+    _shared_sesi_repo = SQLiteSesiParkirRepository(_shared_db)
+    _shared_tarif_repo = SQLiteTarifParkirRepository(_shared_db)
+    _shared_penjadwal_arsip = None
+elif config.STORAGE == "memory":
+    _shared_user_repo = InMemoryUserRepository()
+    _shared_auth_repo = InMemoryAuthRepository()
+    _shared_slot_repo = InMemorySlotParkirRepository()
+    _shared_sesi_repo = InMemorySesiParkirRepository()
+    _shared_tarif_repo = InMemoryTarifParkirRepository()
+    # Sesi SELESAI dipadatkan berkala; SQLite sudah menyimpannya di disk
+    _shared_penjadwal_arsip = PenjadwalArsip(
+        _shared_sesi_repo, config.ARSIP_INTERVAL, config.ARSIP_UMUR_MENIT
+    )
+else:
+    raise ValueError(f"PARKIR_STORAGE tidak dikenal: {config.STORAGE}")
 
 _shared_slot_service = SlotParkirService(_shared_slot_repo)
+# Cache tarif dan tabelnya dipakai bersama, bukan disusun per request check-out
+_shared_pemilih_tarif = PemilihTarif(_shared_tarif_repo)
+_shared_cache_kutipan = CacheKutipan()
+_shared_token_cache = TokenCache()
+_shared_hashing_pool = HashingPool(
+    max_workers=config.HASH_WORKERS,
+    max_antrian=config.HASH_MAX_ANTRIAN,
+)
+# Backend hash dan token dipilih sekali saat modul dimuat
+_shared_password_hashing = password_hashing_dari_config()
+_shared_token_codec = token_codec_untuk(AuthService.SECRET_KEY, AuthService.ALGORITHM)
 
 security = HTTPBearer()
 
@@ -30,6 +74,22 @@ def get_sesi_repository():
     return _shared_sesi_repo
 
 
+def get_tarif_repository():
+    return _shared_tarif_repo
+
+
+def get_pemilih_tarif():
+    return _shared_pemilih_tarif
+
+
+def get_cache_kutipan():
+    return _shared_cache_kutipan
+
+
+def get_penjadwal_arsip():
+    return _shared_penjadwal_arsip
+
+
 def get_slot_service(
     slot_repo = Depends(get_slot_repository),
 ):
@@ -42,10 +102,19 @@ def get_auth_service(
     user_repo = Depends(get_user_repository),
 ):
     """Create AuthService with current repositories (allows test overrides)"""
-    return AuthService(auth_repo, user_repo)
-
-
-async def verify_token_dependency(
+    return AuthService(
+        auth_repo,
+        user_repo,
+        _shared_token_cache,
+        _shared_hashing_pool,
+        _shared_password_hashing,
+        _shared_token_codec,
+    )
+
+
+# def biasa, bukan async: FastAPI menjalankannya di threadpool sehingga
+# lookup token ke SQLite tidak memblokir event loop
+def verify_token_dependency(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
 ):
@@ -1,26 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
+import csv
+import io
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from uuid import UUID
-from typing import Optional, List
-from datetime import datetime
+from typing import Iterator, Optional, List
+from datetime import datetime, timezone
 from decimal import Decimal
 
-from manajemen_parkir.application.services import ParkingService
+from manajemen_parkir.application.analitik import LEBAR_INTERVAL, PERSENTIL_DEFAULT
+from manajemen_parkir.application.services import (
+    KendaraanTidakDitemukan,
+    ParkingService,
+    SesiSudahSelesai,
+    SlotTidakDitemukan,
+    SlotTidakTersedia,
+)
 from manajemen_parkir.domain.auth import Akun
+from manajemen_parkir.domain.model import StatusSesi
+from manajemen_parkir.domain.alokasi_slot import Koordinat
+from manajemen_parkir.infrastructure.arsip_sesi import dari_mikro
+from manajemen_parkir import config
 from manajemen_parkir.api.dependencies import (
+    get_cache_kutipan,
+    get_pemilih_tarif,
     get_user_repository,
     get_slot_repository,
     get_sesi_repository,
     get_slot_service,
     verify_token_dependency,
 )
+from manajemen_parkir.api.pagination import HalamanWaktu
+from manajemen_parkir.api.serialisasi import ResponsJSON, dumps, encode_list, sesi_dict
 
 router = APIRouter(prefix="/parking", tags=["Parking Management"])
 
 
+class PintuMasuk(BaseModel):
+    lantai: int
+    posisi_x: float
+    posisi_y: float
+
+
 class CheckInRequest(BaseModel):
     vehicle_id: UUID
     slot_id: Optional[UUID] = None
+    # Dipakai untuk memilih slot kosong terdekat bila slot_id kosong
+    pintu_masuk: Optional[PintuMasuk] = None
     
     class Config:
         json_schema_extra = {
@@ -31,12 +57,22 @@ class CheckInRequest(BaseModel):
         }
 
 
+def _pintu_masuk(request) -> Koordinat:
+    if request.pintu_masuk is not None:
+        p = request.pintu_masuk
+        return Koordinat(lantai=p.lantai, posisi_x=p.posisi_x, posisi_y=p.posisi_y)
+    lantai, posisi_x, posisi_y = config.PINTU_MASUK
+    return Koordinat(lantai=int(lantai), posisi_x=posisi_x, posisi_y=posisi_y)
+
+
 def get_parking_service(
     sesi_repo = Depends(get_sesi_repository),
     user_repo = Depends(get_user_repository),
     slot_repo = Depends(get_slot_repository),
+    pemilih_tarif = Depends(get_pemilih_tarif),
+    cache_kutipan = Depends(get_cache_kutipan),
 ):
-    return ParkingService(sesi_repo, user_repo, slot_repo)
+    return ParkingService(sesi_repo, user_repo, slot_repo, pemilih_tarif, cache_kutipan)
 
 
 class SessionResponse(BaseModel):
@@ -45,87 +81,48 @@ class SessionResponse(BaseModel):
     vehicle_type: Optional[str] = None
     owner_id: Optional[UUID] = None
     vehicle_id: Optional[UUID] = None
+    slot_id: Optional[UUID] = None
     checkin_time: datetime
     checkout_time: Optional[datetime] = None
     status: str
     final_fee: Optional[Decimal] = None
 
 
-def _serialize_sesi(sesi) -> dict:
-    sid = getattr(sesi, "id_sesi", None)
-    np = getattr(sesi, "nomor_plat", None)
-    plate = None
-    vehicle_type = None
-    if np is not None:
-        plate = getattr(np, "kode", None)
-        vehicle_type = getattr(np, "tipe_kendaraan", None)
-    plate = plate or getattr(sesi, "plate", None)
-    vehicle_type = vehicle_type or getattr(sesi, "vehicle_type", None)
-
-    biaya = getattr(sesi, "biaya_final", None)
-    biaya_val = None
-    if biaya is not None:
-        raw = getattr(biaya, "jumlah", biaya)
-        try:
-            biaya_val = float(raw)
-        except Exception:
-            biaya_val = raw
-
-    return {
-        "id": str(sid) if sid is not None else None,
-        "plate": plate,
-        "vehicle_type": vehicle_type,
-        "owner_id": getattr(sesi, "owner_id", None),
-        "vehicle_id": getattr(sesi, "vehicle_id", None),
-        "checkin_time": getattr(sesi, "waktu_masuk", None),
-        "checkout_time": getattr(sesi, "waktu_keluar", None),
-        "status": getattr(sesi, "status", None).value if getattr(sesi, "status", None) is not None else None,
-        "final_fee": biaya_val,
-    }
-
-
 @router.post("/check-in")
 def check_in(
     request: CheckInRequest,
     service: ParkingService = Depends(get_parking_service),
     user_repo = Depends(get_user_repository),
-    slot_repo = Depends(get_slot_repository),
     current_akun: Akun = Depends(verify_token_dependency),
 ):
     try:
-        vehicle = None
-        owner = None
-        for user in user_repo.list():
-            for v in user.vehicles:
-                if v.id == request.vehicle_id:
-                    vehicle = v
-                    owner = user
-                    break
-            if vehicle:
-                break
-        
-        if not vehicle:
+        pintu_masuk = _pintu_masuk(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        found = user_repo.find_by_vehicle_id(request.vehicle_id)
+        if not found:
             raise HTTPException(status_code=404, detail=f"Vehicle with ID {request.vehicle_id} not found")
+        owner, vehicle = found
         
-        if request.slot_id:
-            from manajemen_parkir.domain.alokasi_slot import StatusSlot
-            slot = slot_repo.get_by_id(request.slot_id)
-            if not slot:
-                raise HTTPException(status_code=404, detail=f"Slot with ID {request.slot_id} not found")
-            if slot.status_ketersediaan.status != StatusSlot.TERSEDIA:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Slot {request.slot_id} tidak tersedia (status: {slot.status_ketersediaan.status.value})"
-                )
-        
+        # Status slot dicek sekaligus direservasi oleh service
         sesi = service.start_parking(
             user_id=owner.id,
             vehicle_id=vehicle.id,
             slot_id=request.slot_id,
+            pintu_masuk=pintu_masuk,
         )
-        return _serialize_sesi(sesi)
+        return ResponsJSON(sesi_dict(sesi))
     except HTTPException:
         raise
+    except SlotTidakDitemukan:
+        raise HTTPException(status_code=404, detail=f"Slot with ID {request.slot_id} not found")
+    except SlotTidakTersedia as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Slot {request.slot_id} tidak tersedia (status: {e.status})"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -141,7 +138,230 @@ def check_out(
         sesi = service.end_parking(id_sesi)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    return _serialize_sesi(sesi)
+    return ResponsJSON(sesi_dict(sesi))
+
+
+MAKS_ITEM_BATCH = 500
+
+
+class BatchCheckInRequest(BaseModel):
+    items: List[CheckInRequest]
+    pintu_masuk: Optional[PintuMasuk] = None
+
+
+class BatchCheckOutRequest(BaseModel):
+    id_sesi: List[UUID]
+
+
+def _cek_ukuran_batch(jumlah: int) -> None:
+    if jumlah == 0:
+        raise HTTPException(status_code=400, detail="Batch tidak boleh kosong")
+    if jumlah > MAKS_ITEM_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maksimal {MAKS_ITEM_BATCH} item per batch"
+        )
+
+
+def _hasil_batch(hasil, status_gagal) -> dict:
+    items = []
+    for index, item in enumerate(hasil):
+        if isinstance(item, Exception):
+            items.append({"index": index, "status_code": status_gagal(item), "detail": str(item)})
+        else:
+            items.append({"index": index, "status_code": 200, "data": sesi_dict(item)})
+    gagal = sum(1 for item in items if item["status_code"] != 200)
+    return {"berhasil": len(items) - gagal, "gagal": gagal, "hasil": items}
+
+
+def _status_gagal_check_in(e: Exception) -> int:
+    if isinstance(e, (KendaraanTidakDitemukan, SlotTidakDitemukan)):
+        return 404
+    return 400
+
+
+@router.post("/batch/check-in")
+def batch_check_in(
+    request: BatchCheckInRequest,
+    service: ParkingService = Depends(get_parking_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    """Check-in banyak kendaraan dalam satu request; hasil dilaporkan per item."""
+    _cek_ukuran_batch(len(request.items))
+    try:
+        # pintu_masuk per item mengalahkan pintu_masuk batch
+        pintu_batch = _pintu_masuk(request)
+        permintaan = [
+            (item.vehicle_id, item.slot_id, _pintu_masuk(item) if item.pintu_masuk else pintu_batch)
+            for item in request.items
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    hasil = service.start_parking_batch(permintaan)
+    return ResponsJSON(_hasil_batch(hasil, _status_gagal_check_in))
+
+
+@router.post("/batch/check-out")
+def batch_check_out(
+    request: BatchCheckOutRequest,
+    service: ParkingService = Depends(get_parking_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    """Check-out banyak sesi dalam satu request; hasil dilaporkan per item."""
+    _cek_ukuran_batch(len(request.id_sesi))
+    return ResponsJSON(_hasil_batch(service.end_parking_batch(request.id_sesi), lambda e: 404))
+
+
+KOLOM_EKSPOR = [
+    "id", "plate", "vehicle_type", "owner_id", "vehicle_id", "slot_id",
+    "checkin_time", "checkout_time", "status", "final_fee",
+]
+_MEDIA_EKSPOR = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _utc_naif(waktu: Optional[datetime]) -> Optional[datetime]:
+    # waktu_masuk disimpan sebagai UTC tanpa zona waktu
+    if waktu is None or waktu.tzinfo is None:
+        return waktu
+    return waktu.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _nilai_teks(nilai):
+    if isinstance(nilai, datetime):
+        return nilai.isoformat()
+    return str(nilai)
+
+
+def _ekspor_ndjson(blok_blok) -> Iterator[bytes]:
+    for blok in blok_blok:
+        yield b"".join(dumps(sesi_dict(s)) + b"\n" for s in blok)
+
+
+def _ekspor_csv(blok_blok) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(KOLOM_EKSPOR)
+    # header dikirim lebih dulu agar klien langsung menerima byte pertama
+    yield buffer.getvalue()
+    for blok in blok_blok:
+        buffer.seek(0)
+        buffer.truncate()
+        for s in blok:
+            data = sesi_dict(s)
+            writer.writerow(
+                "" if data[k] is None else _nilai_teks(data[k]) for k in KOLOM_EKSPOR
+            )
+        yield buffer.getvalue()
+
+
+@router.get("/sessions/export")
+def export_sessions(
+    format: str = Query("ndjson", description="ndjson atau csv"),
+    dari: Optional[datetime] = Query(None, description="Waktu masuk paling awal (inklusif)"),
+    sampai: Optional[datetime] = Query(None, description="Batas waktu masuk (eksklusif)"),
+    status: Optional[str] = Query(None, description="AKTIF, SELESAI, atau DIBATALKAN"),
+    owner_id: Optional[UUID] = Query(None),
+    service: ParkingService = Depends(get_parking_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    format = format.lower()
+    if format not in _MEDIA_EKSPOR:
+        raise HTTPException(status_code=400, detail=f"Format tidak didukung: {format}")
+    status_enum = None
+    if status:
+        try:
+            status_enum = StatusSesi[status.upper()]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Status tidak valid: {status}")
+    dari, sampai = _utc_naif(dari), _utc_naif(sampai)
+    if dari is not None and sampai is not None and dari >= sampai:
+        raise HTTPException(status_code=400, detail="dari harus sebelum sampai")
+    
+    blok_blok = service.ekspor(dari=dari, sampai=sampai, status=status_enum, owner_id=owner_id)
+    isi = _ekspor_csv(blok_blok) if format == "csv" else _ekspor_ndjson(blok_blok)
+    return StreamingResponse(
+        isi,
+        media_type=_MEDIA_EKSPOR[format],
+        headers={"Content-Disposition": f'attachment; filename="sesi-parkir.{format}"'},
+    )
+
+
+def _rupiah(sen: int) -> float:
+    return sen / 100
+
+
+@router.get("/analytics")
+def analytics(
+    dari: Optional[datetime] = Query(None, description="Waktu masuk paling awal (inklusif)"),
+    sampai: Optional[datetime] = Query(None, description="Batas waktu masuk (eksklusif)"),
+    interval: str = Query("day", description="hour atau day"),
+    percentile: Optional[List[float]] = Query(None, description="Persentil durasi, 0-100"),
+    service: ParkingService = Depends(get_parking_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    """Pendapatan per interval, durasi rata-rata/persentil, dan okupansi puncak per lantai.
+
+    Sesi dikelompokkan menurut waktu masuk (UTC). Pendapatan dan durasi dari
+    sesi yang sudah check-out; okupansi ikut menghitung sesi aktif.
+    """
+    interval = interval.lower()
+    if interval not in LEBAR_INTERVAL:
+        raise HTTPException(status_code=400, detail=f"Interval tidak didukung: {interval}")
+    daftar_persentil = tuple(percentile) if percentile else PERSENTIL_DEFAULT
+    if any(not 0 <= p <= 100 for p in daftar_persentil):
+        raise HTTPException(status_code=400, detail="Persentil harus di antara 0 dan 100")
+    dari, sampai = _utc_naif(dari), _utc_naif(sampai)
+    if dari is not None and sampai is not None and dari >= sampai:
+        raise HTTPException(status_code=400, detail="dari harus sebelum sampai")
+
+    hasil = service.analitik(dari, sampai, LEBAR_INTERVAL[interval], daftar_persentil)
+    return ResponsJSON({
+        "from": dari,
+        "to": sampai,
+        "interval": interval,
+        "sessions": hasil.jumlah_sesi,
+        "revenue": {
+            "total": _rupiah(hasil.total_sen),
+            "buckets": [
+                {"start": dari_mikro(awal), "revenue": _rupiah(sen), "sessions": jumlah}
+                for awal, sen, jumlah in hasil.per_interval
+            ],
+        },
+        "duration_minutes": {
+            "mean": hasil.rata_rata_menit,
+            "percentiles": {f"p{p:g}": nilai for p, nilai in hasil.persentil_menit.items()},
+        },
+        "peak_occupancy": [
+            {"floor": lantai, "peak": puncak, "at": dari_mikro(waktu)}
+            for lantai, puncak, waktu in hasil.okupansi_puncak
+        ],
+    })
+
+
+@router.get("/sessions/{id_sesi}/quote")
+def quote_session(
+    id_sesi: UUID,
+    service: ParkingService = Depends(get_parking_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    """Biaya bila sesi aktif check-out sekarang; sesi tidak diubah."""
+    try:
+        kutipan = service.kutip_biaya(id_sesi)
+    except SesiSudahSelesai as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    sisa = (kutipan.berlaku_sampai - kutipan.dihitung_pada).total_seconds()
+    return ResponsJSON(
+        {
+            "id": kutipan.id_sesi,
+            "fee": _rupiah(kutipan.sen),
+            "quoted_at": kutipan.dihitung_pada,
+            "valid_until": kutipan.berlaku_sampai,
+        },
+        headers={"Cache-Control": f"private, max-age={max(0, int(sisa))}"},
+    )
 
 
 @router.get("/sessions/{id_sesi}")
@@ -153,15 +373,20 @@ def get_session(
     sesi = service.get(id_sesi)
     if not sesi:
         raise HTTPException(status_code=404, detail="Session not found")
-    return _serialize_sesi(sesi)
+    return ResponsJSON(sesi_dict(sesi))
 
 
 @router.get("/sessions")
 def list_sessions(
+    halaman: HalamanWaktu = Depends(),
     service: ParkingService = Depends(get_parking_service),
     current_akun: Akun = Depends(verify_token_dependency),
 ):
-    res = []
-    for s in service.list():
-        res.append(_serialize_sesi(s))
-    return res
+    berikut = None
+    if halaman.aktif:
+        sessions, berikut = service.list_halaman(halaman.setelah, halaman.batas)
+    else:
+        sessions = service.list()
+    response = ResponsJSON(encode_list(sesi_dict, sessions))
+    halaman.set_berikut(response, berikut)
+    return response
@@ -0,0 +1,103 @@
+"""Kursor opaque untuk endpoint list berhalaman.
+
+Kursor adalah kunci urut item terakhir di halaman sebelumnya, yaitu
+``(waktu, id)`` atau ``(urutan, id)``, dikemas sebagai base64url JSON.
+Klien tidak perlu (dan tidak boleh bergantung pada) isinya. Setiap endpoint
+memakai ``HalamanWaktu`` atau ``HalamanUrutan`` sesuai jenis kuncinya, sehingga
+kursor dari endpoint lain ditolak dengan 400.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Type
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+
+from manajemen_parkir.infrastructure.index_urut import Kunci
+
+BATAS_DEFAULT = 50
+BATAS_MAKS = 500
+HEADER_KURSOR = "X-Next-Cursor"
+
+
+def encode_kursor(kunci: Kunci) -> str:
+    nilai, item_id = kunci
+    if isinstance(nilai, datetime):
+        data = ["d", nilai.isoformat(), str(item_id)]
+    else:
+        data = ["i", int(nilai), str(item_id)]
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_kursor(kursor: str, tipe_kunci: Optional[Type] = None) -> Kunci:
+    """Kebalikan ``encode_kursor``.
+
+    Bila ``tipe_kunci`` diberikan (``datetime`` atau ``int``), kursor dengan
+    jenis kunci lain ditolak. Waktu selalu naive UTC seperti di repository,
+    jadi waktu dengan zona waktu juga ditolak.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(kursor + "=" * (-len(kursor) % 4))
+        tipe, nilai, item_id = json.loads(raw)
+        if not isinstance(item_id, str):
+            raise ValueError
+        UUID(item_id)
+        if tipe == "d" and tipe_kunci in (None, datetime):
+            waktu = datetime.fromisoformat(nilai)
+            if waktu.tzinfo is None:
+                return waktu, item_id
+        if (
+            tipe == "i" and tipe_kunci in (None, int)
+            and isinstance(nilai, int) and not isinstance(nilai, bool)
+        ):
+            return nilai, item_id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        pass
+    raise ValueError("Kursor tidak valid")
+
+
+class Halaman:
+    """Parameter query ``limit``/``cursor``; dipakai sebagai dependency.
+
+    Endpoint memakai subkelas yang menetapkan ``TIPE_KUNCI`` sesuai kunci
+    urut repository-nya.
+    """
+
+    TIPE_KUNCI: Optional[Type] = None
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None, ge=1, le=BATAS_MAKS, description="Jumlah item per halaman"
+        ),
+        cursor: Optional[str] = Query(
+            None, description=f"Kursor dari header {HEADER_KURSOR} halaman sebelumnya"
+        ),
+    ) -> None:
+        self.aktif = limit is not None or cursor is not None
+        self.batas = limit or BATAS_DEFAULT
+        self.setelah: Optional[Kunci] = None
+        if cursor is not None:
+            try:
+                self.setelah = decode_kursor(cursor, self.TIPE_KUNCI)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+    def set_berikut(self, response: Response, kunci: Optional[Kunci]) -> None:
+        if kunci is not None:
+            response.headers[HEADER_KURSOR] = encode_kursor(kunci)
+
+
+class HalamanWaktu(Halaman):
+    """Kursor ``(waktu, id)``: slot (created_at) dan sesi (waktu_masuk)."""
+
+    TIPE_KUNCI = datetime
+
+
+class HalamanUrutan(Halaman):
+    """Kursor ``(urutan, id)``: user, urut waktu simpan pertama."""
+
+    TIPE_KUNCI = int
@@ -0,0 +1,122 @@
+"""Serialisasi respons API langsung ke bytes JSON.
+
+Encoder per tipe membaca atribut domain secara langsung, lalu orjson menulis
+hasilnya (datetime dan UUID ditangani native). Route yang mengembalikan
+``ResponsJSON`` melewati ``jsonable_encoder`` FastAPI sepenuhnya.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterable, List, Optional
+from uuid import UUID
+
+from starlette.responses import Response
+
+from manajemen_parkir.domain.alokasi_slot import Sensor, SlotParkir
+from manajemen_parkir.domain.model import SesiParkir
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ada di requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+if orjson is not None:
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=_default)
+else:
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, default=_default, separators=(",", ":")).encode()
+
+
+class ResponsJSON(Response):
+    """Respons JSON yang menerima bytes siap kirim atau data mentah."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def sesi_dict(sesi: SesiParkir) -> dict:
+    nomor_plat = sesi.nomor_plat
+    biaya = sesi.biaya_final
+    return {
+        "id": sesi.id_sesi,
+        "plate": nomor_plat.kode,
+        "vehicle_type": nomor_plat.tipe_kendaraan,
+        "owner_id": sesi.owner_id,
+        "vehicle_id": sesi.vehicle_id,
+        "slot_id": sesi.slot_id,
+        "checkin_time": sesi.waktu_masuk,
+        "checkout_time": sesi.waktu_keluar,
+        "status": sesi.status.value,
+        "final_fee": float(biaya.jumlah) if biaya is not None else None,
+    }
+
+
+def _sensor_dict(sensor: Optional[Sensor]) -> Optional[dict]:
+    if sensor is None:
+        return None
+    return {
+        "id": sensor.id,
+        "tipe": sensor.tipe.value,
+        "kondisi": sensor.kondisi,
+        "is_active": sensor.is_active,
+    }
+
+
+def slot_dict(slot: SlotParkir) -> dict:
+    koordinat = slot.koordinat
+    status = slot.status_ketersediaan
+    return {
+        "id": slot.id,
+        "lantai": koordinat.lantai,
+        "posisi_x": koordinat.posisi_x,
+        "posisi_y": koordinat.posisi_y,
+        "kapasitas": slot.kapasitas,
+        "status": status.status.value,
+        "waktu_update": status.waktu_update,
+        "sensor": _sensor_dict(slot.sensor),
+        "keterangan": slot.keterangan,
+    }
+
+
+def slot_detail_dict(slot: SlotParkir) -> dict:
+    data = slot_dict(slot)
+    if slot.sensor is not None:
+        data["sensor"]["created_at"] = slot.sensor.created_at
+    data["created_at"] = slot.created_at
+    data["updated_at"] = slot.updated_at
+    return data
+
+
+def slot_ringkas_dict(slot: SlotParkir) -> dict:
+    koordinat = slot.koordinat
+    return {
+        "id": slot.id,
+        "lantai": koordinat.lantai,
+        "posisi_x": koordinat.posisi_x,
+        "posisi_y": koordinat.posisi_y,
+        "status": slot.status_ketersediaan.status.value,
+    }
+
+
+def encode_list(encoder: Callable[[Any], dict], items: Iterable[Any]) -> bytes:
+    data: List[dict] = [encoder(item) for item in items]
+    return dumps(data)
@@ -9,6 +9,14 @@ from manajemen_parkir.api.dependencies import (
     verify_token_dependency,
     get_slot_service,
 )
+from manajemen_parkir.api.pagination import HalamanWaktu
+from manajemen_parkir.api.serialisasi import (
+    ResponsJSON,
+    encode_list,
+    slot_detail_dict,
+    slot_dict,
+    slot_ringkas_dict,
+)
 
 router = APIRouter(prefix="/slots", tags=["Alokasi Slot"])
 
@@ -35,6 +43,38 @@ class CreateSlotRequest(BaseModel):
         }
 
 
+class GridSlotRequest(BaseModel):
+    lantai: int
+    baris: int
+    kolom: int
+    jarak_x: float
+    jarak_y: float
+    asal_x: float = 0.0
+    asal_y: float = 0.0
+    kapasitas: int = 1
+    tipe_sensor: Optional[str] = None
+
+
+class CreateSlotMassalRequest(BaseModel):
+    # Isi salah satu: daftar slot atau spesifikasi grid satu lantai
+    slots: Optional[List[CreateSlotRequest]] = None
+    grid: Optional[GridSlotRequest] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "grid": {
+                    "lantai": 2,
+                    "baris": 10,
+                    "kolom": 40,
+                    "jarak_x": 2.5,
+                    "jarak_y": 5.0,
+                    "tipe_sensor": "ULTRASONIK"
+                }
+            }
+        }
+
+
 class UpdateStatusRequest(BaseModel):
     status: str  # "TERSEDIA", "TERISI", "RUSAK"
     
@@ -118,47 +158,84 @@ def create_slot(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", status_code=201)
+def create_slots_bulk(
+    req: CreateSlotMassalRequest,
+    service = Depends(get_slot_service),
+    current_akun: Akun = Depends(verify_token_dependency),
+):
+    if (req.slots is None) == (req.grid is None):
+        raise HTTPException(status_code=400, detail="Isi salah satu dari 'slots' atau 'grid'")
+    
+    try:
+        if req.grid is not None:
+            grid = req.grid
+            slots = service.buat_slot_grid(
+                lantai=grid.lantai,
+                baris=grid.baris,
+                kolom=grid.kolom,
+                jarak_x=grid.jarak_x,
+                jarak_y=grid.jarak_y,
+                asal_x=grid.asal_x,
+                asal_y=grid.asal_y,
+                kapasitas=grid.kapasitas,
+                tipe_sensor=grid.tipe_sensor
+            )
+        else:
+            slots = service.buat_slot_massal(
+                {
+                    "lantai": item.lantai,
+                    "posisi_x": item.posisi_x,
+                    "posisi_y": item.posisi_y,
+                    "kapasitas": item.kapasitas,
+                    "keterangan": item.keterangan,
+                    "tipe_sensor": item.tipe_sensor,
+                }
+                for item in req.slots
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "jumlah": len(slots),
+        "ids": [str(slot.id) for slot in slots],
+        "message": f"{len(slots)} slot parkir berhasil dibuat"
+    }
+
+
 @router.get("/")
 def list_slots(
     lantai: Optional[int] = Query(None, description="Filter berdasarkan lantai"),
     status: Optional[str] = Query(None, description="Filter berdasarkan status (TERSEDIA/TERISI/RUSAK)"),
+    halaman: HalamanWaktu = Depends(),
     current_akun: Akun = Depends(verify_token_dependency),
     service = Depends(get_slot_service),
 ):
     
-    if lantai is not None:
-        slots = service.repository.list_by_lantai(lantai)
-    else:
-        slots = service.repository.list_all()
-    
+    status_enum = None
     if status:
         status_upper = status.upper()
         from manajemen_parkir.domain.alokasi_slot import StatusSlot
         try:
             status_enum = StatusSlot[status_upper]
-            slots = [s for s in slots if s.status_ketersediaan.status == status_enum]
         except KeyError:
             raise HTTPException(status_code=400, detail=f"Status tidak valid: {status}")
     
-    return [
-        {
-            "id": str(slot.id),
-            "lantai": slot.koordinat.lantai,
-            "posisi_x": slot.koordinat.posisi_x,
-            "posisi_y": slot.koordinat.posisi_y,
-            "kapasitas": slot.kapasitas,
-            "status": slot.status_ketersediaan.status.value,
-            "waktu_update": slot.status_ketersediaan.waktu_update.isoformat(),
-            "sensor": {
-                "id": str(slot.sensor.id),
-                "tipe": slot.sensor.tipe.value,
-                "kondisi": slot.sensor.kondisi,
-                "is_active": slot.sensor.is_active
-            } if slot.sensor else None,
-            "keterangan": slot.keterangan
-        }
-        for slot in slots
-    ]
+    berikut = None
+    if halaman.aktif:
+        slots, berikut = service.repository.list_halaman(
+            halaman.setelah, halaman.batas, lantai=lantai, status=status_enum
+        )
+    elif status_enum is not None:
+        slots = service.repository.list_by_status(status_enum, lantai)
+    elif lantai is not None:
+        slots = service.repository.list_by_lantai(lantai)
+    else:
+        slots = service.repository.list_all()
+    
+    response = ResponsJSON(encode_list(slot_dict, slots))
+    halaman.set_berikut(response, berikut)
+    return response
 
 
 @router.get("/tersedia")
@@ -169,16 +246,7 @@ def list_available_slots(
 ):
     slots = service.get_slot_tersedia(lantai=lantai)
     
-    return [
-        {
-            "id": str(slot.id),
-            "lantai": slot.koordinat.lantai,
-            "posisi_x": slot.koordinat.posisi_x,
-            "posisi_y": slot.koordinat.posisi_y,
-            "status": slot.status_ketersediaan.status.value
-        }
-        for slot in slots
-    ]
+    return ResponsJSON(encode_list(slot_ringkas_dict, slots))
 
 
 @router.get("/statistik")
@@ -208,25 +276,7 @@ def get_slot(
     if not slot:
         raise HTTPException(status_code=404, detail="Slot parkir tidak ditemukan")
     
-    return {
-        "id": str(slot.id),
-        "lantai": slot.koordinat.lantai,
-        "posisi_x": slot.koordinat.posisi_x,
-        "posisi_y": slot.koordinat.posisi_y,
-        "kapasitas": slot.kapasitas,
-        "status": slot.status_ketersediaan.status.value,
-        "waktu_update": slot.status_ketersediaan.waktu_update.isoformat(),
-        "sensor": {
-            "id": str(slot.sensor.id),
-            "tipe": slot.sensor.tipe.value,
-            "kondisi": slot.sensor.kondisi,
-            "is_active": slot.sensor.is_active,
-            "created_at": slot.sensor.created_at.isoformat()
-        } if slot.sensor else None,
-        "keterangan": slot.keterangan,
-        "created_at": slot.created_at.isoformat(),
-        "updated_at": slot.updated_at.isoformat()
-    }
+    return ResponsJSON(slot_detail_dict(slot))
 
 
 @router.patch("/{slot_id}/status")
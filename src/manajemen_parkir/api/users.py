@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from pydantic import BaseModel
 from typing import Optional
 from uuid import UUID
@@ -9,6 +9,7 @@ from manajemen_parkir.api.dependencies import (
     get_user_repository,
     verify_token_dependency,
 )
+from manajemen_parkir.api.pagination import HalamanUrutan
 
 router = APIRouter(prefix="/users", tags=["Users & Vehicles"])
 
@@ -57,10 +58,16 @@ def get_user(
 
 @router.get("/")
 def list_users(
+    response: Response,
+    halaman: HalamanUrutan = Depends(),
     current_akun: Akun = Depends(verify_token_dependency),
     user_repo = Depends(get_user_repository),
 ):
-    users = user_repo.list()
+    if halaman.aktif:
+        users, berikut = user_repo.list_halaman(halaman.setelah, halaman.batas)
+        halaman.set_berikut(response, berikut)
+    else:
+        users = user_repo.list()
     return [
         {
             "id": str(u.id),
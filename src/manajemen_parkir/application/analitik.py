@@ -0,0 +1,172 @@
+"""
+Analitik riwayat parkir: pendapatan per interval, durasi, dan okupansi puncak.
+
+Perhitungan berjalan atas ``KolomSesi`` (kolom ``array``), bukan objek
+``SesiParkir``. Tidak ada loop Python per sesi: pendapatan dihitung dengan
+bisect di atas run yang sudah urut waktu masuk lalu ``sum`` per irisan,
+durasi dengan ``Counter``, dan okupansi dengan numpy atas tampilan tanpa
+salinan dari kolom yang sama.
+
+Sesi dikelompokkan menurut waktu masuk, sama dengan filter ``dari``/``sampai``.
+Semua waktu dalam UTC; interval jam/hari dihitung dari epoch UTC.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import accumulate
+from math import floor
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from manajemen_parkir.infrastructure.arsip_sesi import KOSONG, KolomSesi
+
+LEBAR_INTERVAL = {
+    "hour": 3_600_000_000,
+    "day": 86_400_000_000,
+}
+PERSENTIL_DEFAULT = (50.0, 90.0, 95.0)
+_DETIK = 1_000_000
+
+
+@dataclass(slots=True)
+class Ringkasan:
+    jumlah_sesi: int
+    total_sen: int
+    # (awal interval dalam mikrodetik epoch, pendapatan sen, jumlah sesi)
+    per_interval: List[Tuple[int, int, int]]
+    rata_rata_menit: Optional[float]
+    persentil_menit: Dict[float, Optional[float]]
+    # (lantai, jumlah sesi bersamaan terbanyak, waktu mulai puncak)
+    okupansi_puncak: List[Tuple[int, int, int]]
+
+
+def pendapatan_per_interval(kolom: KolomSesi, lebar: int) -> List[Tuple[int, int, int]]:
+    """Pendapatan dan jumlah sesi selesai per interval waktu masuk.
+
+    Di dalam tiap run yang urut waktu masuk, batas interval dicari dengan
+    bisect dan biaya dijumlahkan per irisan, jadi kerja Python sebanding
+    dengan jumlah interval, bukan jumlah sesi. Biaya sesi aktif selalu 0.
+    """
+    total: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    masuk, keluar, biaya_sen = kolom.masuk, kolom.keluar, kolom.biaya_sen
+    for i, akhir in kolom.rentang_run():
+        while i < akhir:
+            awal = masuk[i] // lebar * lebar
+            j = bisect_left(masuk, awal + lebar, i, akhir)
+            nilai = total[awal]
+            nilai[0] += sum(biaya_sen[i:j])
+            nilai[1] += j - i - keluar[i:j].count(KOSONG)
+            i = j
+    return [(awal, *total[awal]) for awal in sorted(total) if total[awal][1]]
+
+
+def persentil(
+    menit: Sequence[int], daftar: Sequence[float]
+) -> Tuple[Optional[float], Dict[float, Optional[float]]]:
+    """Rata-rata dan persentil durasi (interpolasi linear seperti numpy)."""
+    n = len(menit)
+    if n == 0:
+        return None, {p: None for p in daftar}
+    frekuensi = Counter(menit)
+    nilai = sorted(frekuensi)
+    # kumulatif[i] = jumlah sesi dengan durasi <= nilai[i]
+    kumulatif = list(accumulate(frekuensi[v] for v in nilai))
+
+    def ke(k: int) -> int:
+        return nilai[bisect_right(kumulatif, k)]
+
+    hasil = {}
+    for p in daftar:
+        posisi = p / 100 * (n - 1)
+        bawah = floor(posisi)
+        v_bawah = ke(bawah)
+        v_atas = ke(min(bawah + 1, n - 1))
+        hasil[p] = v_bawah + (v_atas - v_bawah) * (posisi - bawah)
+    return sum(menit) / n, hasil
+
+
+def okupansi_puncak(
+    kolom: KolomSesi, lantai_slot: Dict[UUID, int]
+) -> List[Tuple[int, int, int]]:
+    """Jumlah sesi bersamaan terbanyak per lantai, dengan resolusi detik.
+
+    Sesi menempati setiap detik yang disentuhnya (waktu keluar dibulatkan ke
+    atas) dan pada detik yang sama event keluar dihitung sebelum event masuk.
+    Sesi yang belum check-out dihitung sampai akhir rentang.
+
+    Setiap event dikodekan sebagai ``lantai * rentang + 2 * detik + jenis``
+    (keluar 0, masuk 1), sehingga satu ``np.sort`` mengurutkan semua lantai
+    sekaligus dan ``cumsum`` atas +1/-1 memberi okupansi setelah tiap event.
+    Masuk dan keluar satu lantai selalu berpasangan, jadi jumlahnya kembali
+    ke nol di batas lantai berikutnya.
+    """
+    lantai_per_kode = [lantai_slot.get(slot_id) for slot_id in kolom.slot_id.nilai]
+    daftar_lantai = sorted({l for l in lantai_per_kode if l is not None})
+    if not daftar_lantai or not len(kolom):
+        return []
+    urutan = {lantai: i for i, lantai in enumerate(daftar_lantai)}
+    # slot tanpa lantai mendapat -1 lalu dibuang
+    lantai = np.array([urutan.get(l, -1) for l in lantai_per_kode], dtype=np.int64)[_np(kolom.slot)]
+    ada = lantai >= 0
+    lantai = lantai[ada]
+    masuk = _np(kolom.masuk)[ada] // _DETIK
+    keluar = _np(kolom.keluar)[ada]
+    if not len(masuk):
+        return []
+
+    aktif = keluar == KOSONG
+    keluar = -(-np.where(aktif, 0, keluar) // _DETIK)
+    awal = int(masuk.min())
+    akhir = int(max(masuk.max(), keluar.max(initial=0, where=~aktif))) + 1
+    keluar[aktif] = akhir
+    rentang = 2 * (akhir - awal + 1)
+
+    dasar = lantai * rentang - 2 * awal
+    event = np.concatenate((dasar + 2 * masuk + 1, dasar + 2 * keluar))
+    event.sort()
+    terisi = np.cumsum((event & 1) * 2 - 1)
+
+    hasil = []
+    batas = np.searchsorted(event, np.arange(len(daftar_lantai) + 1) * rentang)
+    for i, lantai in enumerate(daftar_lantai):
+        mulai, selesai = batas[i], batas[i + 1]
+        if mulai == selesai:
+            continue
+        j = mulai + int(terisi[mulai:selesai].argmax())
+        detik = (int(event[j]) - i * rentang) // 2 + awal
+        hasil.append((lantai, int(terisi[j]), detik * _DETIK))
+    return hasil
+
+
+def _np(kolom: array) -> np.ndarray:
+    """Tampilan numpy tanpa salinan atas satu kolom ``array``."""
+    return np.frombuffer(kolom, dtype=kolom.typecode)
+
+
+def ringkas(
+    kolom: KolomSesi,
+    lantai_slot: Dict[UUID, int],
+    lebar: int = LEBAR_INTERVAL["day"],
+    daftar_persentil: Sequence[float] = PERSENTIL_DEFAULT,
+) -> Ringkasan:
+    """Semua metrik analitik untuk ``kolom``.
+
+    Pendapatan dan durasi hanya dari sesi yang sudah check-out; okupansi
+    ikut menghitung sesi yang masih parkir.
+    """
+    menit = kolom.menit
+    aktif = kolom.keluar.count(KOSONG)
+    if aktif:
+        menit = _np(menit)[_np(kolom.keluar) != KOSONG].tolist()
+    rata_rata, nilai_persentil = persentil(menit, daftar_persentil)
+    return Ringkasan(
+        jumlah_sesi=len(kolom) - aktif,
+        total_sen=sum(kolom.biaya_sen),
+        per_interval=pendapatan_per_interval(kolom, lebar),
+        rata_rata_menit=rata_rata,
+        persentil_menit=nilai_persentil,
+        okupansi_puncak=okupansi_puncak(kolom, lantai_slot),
+    )
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HashingPoolPenuh(RuntimeError):
+    pass
+
+
+class HashingPool:
+    """Executor terpisah untuk operasi hash password yang mahal.
+
+    Hash dijalankan di thread pool sendiri, bukan di threadpool bawaan
+    FastAPI, sehingga lonjakan login tidak menghambat endpoint lain.
+    Permintaan ditolak dengan ``HashingPoolPenuh`` bila jumlah yang
+    berjalan ditambah yang mengantre melebihi ``max_antrian``.
+    """
+
+    _default: Optional["HashingPool"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 2, max_antrian: int = 64) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers minimal 1")
+        self.max_workers = max_workers
+        self.max_antrian = max_antrian
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hashing"
+        )
+        self._lock = threading.Lock()
+        self._mengantre = 0
+        self._berjalan = 0
+        self._selesai = 0
+        self._ditolak = 0
+        self._antrian_puncak = 0
+
+    @classmethod
+    def default(cls) -> "HashingPool":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    async def jalankan(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._mengantre + self._berjalan >= self.max_workers + self.max_antrian:
+                self._ditolak += 1
+                raise HashingPoolPenuh("Server sedang sibuk, coba lagi nanti")
+            self._mengantre += 1
+            self._antrian_puncak = max(self._antrian_puncak, self._mengantre)
+
+        def tugas():
+            with self._lock:
+                self._mengantre -= 1
+                self._berjalan += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._berjalan -= 1
+                    self._selesai += 1
+
+        future = self._executor.submit(tugas)
+        future.add_done_callback(self._batal_sebelum_jalan)
+        return await asyncio.wrap_future(future)
+
+    def _batal_sebelum_jalan(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._mengantre -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_antrian": self.max_antrian,
+                "mengantre": self._mengantre,
+                "berjalan": self._berjalan,
+                "selesai": self._selesai,
+                "ditolak": self._ditolak,
+                "antrian_puncak": self._antrian_puncak,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Tuple
+from uuid import UUID
+
+
+@dataclass(frozen=True, slots=True)
+class KutipanBiaya:
+    """Biaya sesi yang masih parkir bila check-out pada ``dihitung_pada``."""
+    id_sesi: UUID
+    sen: int
+    dihitung_pada: datetime
+    # biaya tidak berubah selama waktu masih sebelum ini
+    berlaku_sampai: datetime
+
+
+class CacheKutipan:
+    """LRU id sesi -> kutipan biaya terakhir, untuk kios yang polling.
+
+    Biaya sesi aktif hanya berubah saat jam tertagih berikutnya dimulai (atau
+    tengah malam bila ada batas harian), jadi kutipan dipakai ulang sampai
+    ``berlaku_sampai``. Entri juga diabaikan bila penghitung tarif sesi itu
+    sudah lain (tarif diganti atau harganya diubah) atau waktu masuknya
+    dikoreksi.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        # id_sesi -> (penghitung, waktu_masuk, sen, dihitung_pada, berlaku_sampai)
+        self._entries: "OrderedDict[UUID, Tuple[Callable, datetime, int, datetime, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def kutip(self, id_sesi: UUID, waktu_masuk: datetime, tarif, sekarang: datetime) -> KutipanBiaya:
+        penghitung = tarif.penghitung()
+        with self._lock:
+            entry = self._entries.get(id_sesi)
+            if (
+                entry is not None
+                and entry[0] is penghitung
+                and entry[1] == waktu_masuk
+                and entry[3] <= sekarang < entry[4]
+            ):
+                self._entries.move_to_end(id_sesi)
+                self.hits += 1
+                return KutipanBiaya(id_sesi, entry[2], sekarang, entry[4])
+            self.misses += 1
+        sen, sampai = tarif.kutip_sen(waktu_masuk, sekarang)
+        with self._lock:
+            self._entries[id_sesi] = (penghitung, waktu_masuk, sen, sekarang, sampai)
+            self._entries.move_to_end(id_sesi)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return KutipanBiaya(id_sesi, sen, sekarang, sampai)
+
+    def lupakan(self, id_sesi: UUID) -> None:
+        with self._lock:
+            self._entries.pop(id_sesi, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,273 @@
+"""Hasher password yang dapat dipilih beserta parameternya.
+
+Setiap hash tersimpan membawa algoritma dan parameternya sendiri
+(mis. ``$2b$12$...`` atau ``$scrypt$ln=14,r=8,p=1$...``), sehingga
+``PasswordHashing`` bisa memverifikasi hash lama sekaligus melaporkan
+apakah hash itu perlu dibuat ulang sesuai kebijakan saat ini.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+try:
+    import bcrypt as _bcrypt
+except ImportError:  # pragma: no cover - bcrypt ada di requirements.txt
+    _bcrypt = None
+
+logger = logging.getLogger(__name__)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher(ABC):
+    """Satu algoritma hash; subkelas yang belum lengkap gagal saat dibuat."""
+
+    nama: str = ""
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed: str) -> bool:
+        ...
+
+    @abstractmethod
+    def cocok_format(self, hashed: str) -> bool:
+        ...
+
+    @abstractmethod
+    def perlu_rehash(self, hashed: str) -> bool:
+        """True bila ``hashed`` dibuat dengan parameter berbeda dari hasher ini."""
+
+    def deskripsi(self) -> str:
+        return self.nama
+
+
+class BcryptHasher(PasswordHasher):
+    nama = "bcrypt"
+    _FORMAT = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+    def __init__(self, rounds: int = 12) -> None:
+        if _bcrypt is None:
+            raise RuntimeError("Paket bcrypt tidak terpasang")
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds harus antara 4 dan 31")
+        self.rounds = rounds
+
+    @staticmethod
+    def _potong(password: str) -> bytes:
+        # bcrypt hanya memakai 72 byte pertama
+        return password.encode("utf-8")[:72]
+
+    def hash(self, password: str) -> str:
+        salt = _bcrypt.gensalt(rounds=self.rounds)
+        return _bcrypt.hashpw(self._potong(password), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return _bcrypt.checkpw(self._potong(password), hashed.encode("utf-8"))
+        except ValueError:
+            return False
+
+    def cocok_format(self, hashed: str) -> bool:
+        return self._FORMAT.match(hashed) is not None
+
+    def perlu_rehash(self, hashed: str) -> bool:
+        match = self._FORMAT.match(hashed)
+        return match is None or int(match.group(1)) != self.rounds
+
+    def deskripsi(self) -> str:
+        return f"bcrypt(rounds={self.rounds})"
+
+
+class ScryptHasher(PasswordHasher):
+    nama = "scrypt"
+    _PREFIX = "$scrypt$"
+
+    def __init__(self, ln: int = 14, r: int = 8, p: int = 1, panjang: int = 32) -> None:
+        if ln < 1 or r < 1 or p < 1:
+            raise ValueError("Parameter scrypt tidak valid")
+        self.ln = ln
+        self.r = r
+        self.p = p
+        self.panjang = panjang
+
+    def _derive(self, password: str, salt: bytes, ln: int, r: int, p: int, panjang: int) -> bytes:
+        n = 1 << ln
+        return hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+            maxmem=128 * r * (n + p + 2), dklen=panjang,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        dk = self._derive(password, salt, self.ln, self.r, self.p, self.panjang)
+        return f"{self._PREFIX}ln={self.ln},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(dk)}"
+
+    def _parse(self, hashed: str):
+        _, _, params, salt, dk = hashed.split("$")
+        nilai = dict(bagian.split("=") for bagian in params.split(","))
+        return int(nilai["ln"]), int(nilai["r"]), int(nilai["p"]), _b64decode(salt), _b64decode(dk)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            ln, r, p, salt, dk = self._parse(hashed)
+        except (ValueError, KeyError):
+            return False
+        return hmac.compare_digest(self._derive(password, salt, ln, r, p, len(dk)), dk)
+
+    def cocok_format(self, hashed: str) -> bool:
+        return hashed.startswith(self._PREFIX)
+
+    def perlu_rehash(self, hashed: str) -> bool:
+        try:
+            ln, r, p, _, dk = self._parse(hashed)
+        except (ValueError, KeyError):
+            return True
+        return (ln, r, p, len(dk)) != (self.ln, self.r, self.p, self.panjang)
+
+    def deskripsi(self) -> str:
+        return f"scrypt(ln={self.ln}, r={self.r}, p={self.p})"
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    nama = "pbkdf2_sha256"
+    _PREFIX = "$pbkdf2-sha256$"
+
+    def __init__(self, iterasi: int = 600_000) -> None:
+        if iterasi < 1:
+            raise ValueError("Iterasi PBKDF2 minimal 1")
+        self.iterasi = iterasi
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterasi)
+        return f"{self._PREFIX}{self.iterasi}${_b64encode(salt)}${_b64encode(dk)}"
+
+    def _parse(self, hashed: str):
+        _, _, iterasi, salt, dk = hashed.split("$")
+        return int(iterasi), _b64decode(salt), _b64decode(dk)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            iterasi, salt, dk = self._parse(hashed)
+        except ValueError:
+            return False
+        hasil = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterasi)
+        return hmac.compare_digest(hasil, dk)
+
+    def cocok_format(self, hashed: str) -> bool:
+        return hashed.startswith(self._PREFIX)
+
+    def perlu_rehash(self, hashed: str) -> bool:
+        try:
+            iterasi, _, _ = self._parse(hashed)
+        except ValueError:
+            return True
+        return iterasi != self.iterasi
+
+    def deskripsi(self) -> str:
+        return f"pbkdf2_sha256(iterasi={self.iterasi})"
+
+
+class LegacySha256Hasher(PasswordHasher):
+    """Hanya untuk memverifikasi hash SHA-256 tanpa salt dari versi lama."""
+
+    nama = "sha256_legacy"
+    _FORMAT = re.compile(r"^[0-9a-f]{64}$")
+
+    def hash(self, password: str) -> str:
+        raise RuntimeError("SHA-256 tanpa salt tidak boleh dipakai untuk hash baru")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+
+    def cocok_format(self, hashed: str) -> bool:
+        return self._FORMAT.match(hashed) is not None
+
+    def perlu_rehash(self, hashed: str) -> bool:
+        return True
+
+
+class PasswordHashing:
+    """Kebijakan hash: satu hasher untuk hash baru, semuanya untuk verifikasi."""
+
+    def __init__(self, default: PasswordHasher, lainnya: Optional[List[PasswordHasher]] = None) -> None:
+        self.default = default
+        self._hashers: List[PasswordHasher] = [default] + [
+            h for h in (lainnya or []) if h.nama != default.nama
+        ]
+
+    def hash(self, password: str) -> str:
+        return self.default.hash(password)
+
+    def _kenali(self, hashed: str) -> Optional[PasswordHasher]:
+        for hasher in self._hashers:
+            if hasher.cocok_format(hashed):
+                return hasher
+        return None
+
+    def verify(self, password: str, hashed: str) -> bool:
+        hasher = self._kenali(hashed)
+        if hasher is None:
+            return False
+        return hasher.verify(password, hashed)
+
+    def perlu_rehash(self, hashed: str) -> bool:
+        if not self.default.cocok_format(hashed):
+            return True
+        return self.default.perlu_rehash(hashed)
+
+
+def _buat_hasher(algoritma: str, params: Dict[str, int]) -> PasswordHasher:
+    if algoritma == "bcrypt":
+        return BcryptHasher(rounds=params.get("bcrypt_rounds", 12))
+    if algoritma == "scrypt":
+        return ScryptHasher(ln=params.get("scrypt_ln", 14))
+    if algoritma == "pbkdf2_sha256":
+        return Pbkdf2Hasher(iterasi=params.get("pbkdf2_iterasi", 600_000))
+    raise ValueError(f"Algoritma hash password tidak dikenal: {algoritma}")
+
+
+def buat_password_hashing(algoritma: str = "bcrypt", **params: int) -> PasswordHashing:
+    try:
+        default = _buat_hasher(algoritma, params)
+    except RuntimeError:
+        logger.warning("Hasher %s tidak tersedia, memakai pbkdf2_sha256", algoritma)
+        default = _buat_hasher("pbkdf2_sha256", params)
+
+    lainnya: List[PasswordHasher] = []
+    if _bcrypt is not None:
+        lainnya.append(BcryptHasher())
+    lainnya += [ScryptHasher(), Pbkdf2Hasher(), LegacySha256Hasher()]
+    return PasswordHashing(default, lainnya)
+
+
+_dari_config: Optional[PasswordHashing] = None
+
+
+def password_hashing_dari_config() -> PasswordHashing:
+    """PasswordHashing sesuai ``manajemen_parkir.config``, dibuat sekali per proses."""
+    global _dari_config
+    if _dari_config is None:
+        from manajemen_parkir import config
+        _dari_config = buat_password_hashing(
+            config.HASH_ALGORITMA,
+            bcrypt_rounds=config.BCRYPT_ROUNDS,
+            scrypt_ln=config.SCRYPT_LN,
+            pbkdf2_iterasi=config.PBKDF2_ITERASI,
+        )
+        logger.info("Hasher password aktif: %s", _dari_config.default.deskripsi())
+    return _dari_config
@@ -0,0 +1,54 @@
+"""
+Pemilihan tarif aktif saat check-out, di atas repository tarif.
+
+Hasil dicache per (TipeKendaraan, JenisTarif) dan seluruh cache dibuang
+begitu ``versi`` repository berubah, jadi check-out hanya membaca satu int
+dan satu dict; repository baru ditanya saat cache kosong.
+"""
+from typing import Dict, Optional, Tuple, Union
+
+from manajemen_parkir.domain.tariff import (
+    HARGA_PER_JAM_BAWAAN,
+    MAKS_HARIAN_BAWAAN,
+    JenisTarif,
+    ParkingTariff,
+    TipeKendaraan,
+    tipe_kendaraan_dari,
+)
+
+
+class PemilihTarif:
+    """Pengganti ``DaftarTarif`` yang membaca tarif dari repository.
+
+    ``repo`` cukup menyediakan ``versi`` dan ``cari_aktif(tipe, jenis)``.
+    Kendaraan tanpa tipe yang dikenal, atau tanpa tarif aktif untuk
+    kombinasinya, memakai ``bawaan``.
+    """
+
+    def __init__(self, repo, bawaan=None):
+        if bawaan is None:
+            bawaan = ParkingTariff(price_per_hour=HARGA_PER_JAM_BAWAAN, max_daily=MAKS_HARIAN_BAWAAN)
+        self.repo = repo
+        self.bawaan = bawaan
+        self._versi: Optional[int] = None
+        self._cache: Dict[Tuple[Optional[TipeKendaraan], JenisTarif], object] = {}
+
+    def pilih(
+        self,
+        tipe_kendaraan: Union[str, TipeKendaraan, None],
+        jenis_tarif: JenisTarif = JenisTarif.REGULER,
+    ):
+        # versi dibaca sebelum repository ditanya: hasil yang terlambat
+        # hanya masuk ke dict lama yang sudah tidak dipakai
+        versi = self.repo.versi
+        if versi != self._versi:
+            self._cache = {}
+            self._versi = versi
+        cache = self._cache
+        kunci = (tipe_kendaraan_dari(tipe_kendaraan), jenis_tarif)
+        tarif = cache.get(kunci)
+        if tarif is None:
+            if kunci[0] is not None:
+                tarif = self.repo.cari_aktif(*kunci)
+            cache[kunci] = tarif = tarif or self.bawaan
+        return tarif
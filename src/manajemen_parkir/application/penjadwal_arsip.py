@@ -0,0 +1,49 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PenjadwalArsip:
+    """Memanggil ``repo.arsipkan`` secara berkala di thread latar.
+
+    Sesi yang baru check-out kurang dari ``umur_menit`` tetap di memori,
+    karena riwayat terbaru paling sering dibaca dan mungkin masih diubah.
+    """
+
+    def __init__(self, repo, interval_detik: float, umur_menit: int = 60) -> None:
+        self.repo = repo
+        self.interval_detik = interval_detik
+        self.umur_menit = umur_menit
+        self._henti = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def jalankan_sekali(self) -> int:
+        batas = datetime.utcnow() - timedelta(minutes=self.umur_menit)
+        jumlah = self.repo.arsipkan(selesai_sebelum=batas)
+        if jumlah:
+            logger.info("%d sesi selesai dipindah ke arsip", jumlah)
+        return jumlah
+
+    def mulai(self) -> None:
+        if self.interval_detik <= 0 or self._thread is not None:
+            return
+        self._henti.clear()
+        self._thread = threading.Thread(target=self._loop, name="arsip-sesi", daemon=True)
+        self._thread.start()
+
+    def berhenti(self) -> None:
+        if self._thread is None:
+            return
+        self._henti.set()
+        self._thread.join()
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._henti.wait(self.interval_detik):
+            try:
+                self.jalankan_sekali()
+            except Exception:
+                logger.exception("Kompaksi arsip sesi gagal")
@@ -1,13 +1,31 @@
+import asyncio
+from dataclasses import replace
 from decimal import Decimal
-from typing import Optional
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 from datetime import datetime, timedelta
 
-from manajemen_parkir.domain.model import SesiParkir
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from manajemen_parkir.domain.alokasi_slot import Koordinat
 from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
-from manajemen_parkir.domain.tariff import ParkingTariff
+from manajemen_parkir.domain.tariff import DaftarTarif, JenisTarif
 from manajemen_parkir.domain.auth import Akun, Kredensial, Peran, TokenAkses
 from manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository
+from manajemen_parkir.application.analitik import (
+    LEBAR_INTERVAL,
+    PERSENTIL_DEFAULT,
+    Ringkasan,
+    ringkas,
+)
+from manajemen_parkir.application.kutipan import CacheKutipan, KutipanBiaya
+from manajemen_parkir.application.pemilih_tarif import PemilihTarif
+from manajemen_parkir.application.token_cache import TokenCache
+from manajemen_parkir.application.hashing_pool import HashingPool
+from manajemen_parkir.application.password_hasher import (
+    PasswordHashing,
+    password_hashing_dari_config,
+)
+from manajemen_parkir.application.token_codec import token_codec_untuk
 
 
 class AuthService:
@@ -16,18 +34,82 @@ class AuthService:
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-    def __init__(self, repo: Optional[InMemoryAuthRepository] = None, user_repo=None):
+    def __init__(
+        self,
+        repo: Optional[InMemoryAuthRepository] = None,
+        user_repo=None,
+        token_cache: Optional[TokenCache] = None,
+        hashing_pool: Optional[HashingPool] = None,
+        password_hashing: Optional[PasswordHashing] = None,
+        token_codec=None,
+    ):
         self.repo = repo or InMemoryAuthRepository()
         self.user_repo = user_repo
+        self.token_cache = token_cache if token_cache is not None else TokenCache()
+        self.hashing_pool = hashing_pool or HashingPool.default()
+        self.password_hashing = password_hashing or password_hashing_dari_config()
+        self.token_codec = token_codec or token_codec_untuk(self.SECRET_KEY, self.ALGORITHM)
 
     def register(
         self, username: str, password: str, email: Optional[str] = None, peran: Peran = Peran.PENGGUNA
     ) -> tuple[Akun, Optional[any]]:
+        self._cek_username_tersedia(username)
+        password_hash = self._hash_password(password)
+        return self._simpan_akun_baru(username, password_hash, email, peran)
+
+    async def register_async(
+        self, username: str, password: str, email: Optional[str] = None, peran: Peran = Peran.PENGGUNA
+    ) -> tuple[Akun, Optional[any]]:
+        """Seperti register, tetapi bcrypt dijalankan di hashing_pool.
+
+        Akses repository dijalankan di thread lain agar query database tidak
+        memblokir event loop.
+        """
+        await asyncio.to_thread(self._cek_username_tersedia, username)
+        password_hash = await self.hashing_pool.jalankan(self._hash_password, password)
+        return await asyncio.to_thread(
+            self._daftarkan_bila_tersedia, username, password_hash, email, peran
+        )
+
+    def login(self, username: str, password: str) -> TokenAkses:
+        akun = self._akun_untuk_login(username)
+        cocok, hash_baru = self._cek_password(password, akun.kredensial.password_hash)
+        if not cocok:
+            raise ValueError("Username atau password salah")
+        return self._selesaikan_login(akun, hash_baru)
+
+    async def login_async(self, username: str, password: str) -> TokenAkses:
+        """Seperti login, tetapi verifikasi bcrypt dijalankan di hashing_pool.
+
+        Seperti register_async, akses repository dijalankan di thread lain.
+        """
+        akun = await asyncio.to_thread(self._akun_untuk_login, username)
+        cocok, hash_baru = await self.hashing_pool.jalankan(
+            self._cek_password, password, akun.kredensial.password_hash
+        )
+        if not cocok:
+            raise ValueError("Username atau password salah")
+        return await asyncio.to_thread(self._selesaikan_login, akun, hash_baru)
+
+    def _cek_username_tersedia(self, username: str) -> None:
         if self.repo.username_exists(username):
             raise ValueError(f"Username '{username}' sudah terdaftar")
-        
-        password_hash = self._hash_password(password)
-        
+
+    def _daftarkan_bila_tersedia(
+        self, username: str, password_hash: str, email: Optional[str], peran: Peran
+    ) -> tuple[Akun, Optional[any]]:
+        # username bisa saja terdaftar selama menunggu hash selesai
+        self._cek_username_tersedia(username)
+        return self._simpan_akun_baru(username, password_hash, email, peran)
+
+    def _selesaikan_login(self, akun: Akun, hash_baru: Optional[str]) -> TokenAkses:
+        if hash_baru:
+            akun.ganti_password_hash(hash_baru)
+        return self._terbitkan_token(akun)
+
+    def _simpan_akun_baru(
+        self, username: str, password_hash: str, email: Optional[str], peran: Peran
+    ) -> tuple[Akun, Optional[any]]:
         akun = Akun.create(
             username=username,
             password_hash=password_hash,
@@ -45,7 +127,7 @@ class AuthService:
         
         return akun, user
 
-    def login(self, username: str, password: str) -> TokenAkses:
+    def _akun_untuk_login(self, username: str) -> Akun:
         akun = self.repo.get_by_username(username)
         
         if not akun:
@@ -54,11 +136,11 @@ class AuthService:
         if not akun.is_active:
             raise ValueError("Akun tidak aktif")
         
-        if not self._verify_password(password, akun.kredensial.password_hash):
-            raise ValueError("Username atau password salah")
-        
+        return akun
+
+    def _terbitkan_token(self, akun: Akun) -> TokenAkses:
         token = self._create_access_token(
-            data={"sub": username, "akun_id": str(akun.id), "peran": akun.peran.value}
+            data={"sub": akun.kredensial.username, "akun_id": str(akun.id), "peran": akun.peran.value}
         )
         
         token_akses = akun.issue_token(token, self.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -67,6 +149,13 @@ class AuthService:
         return token_akses
 
     def verify_token(self, token: str) -> Akun:
+        akun_id = self.token_cache.get(token)
+        if akun_id is not None:
+            akun = self.repo.get_by_id(akun_id)
+            if akun is not None and akun.is_active:
+                return akun
+            self.token_cache.invalidate_akun(akun_id)
+        
         try:
             payload = self._decode_token(token)
             username: str = payload.get("sub")
@@ -80,69 +169,75 @@ class AuthService:
             if not akun.is_active:
                 raise ValueError("Akun tidak aktif")
             
-            return akun
-            
         except Exception as e:
             raise ValueError(f"Token tidak valid: {str(e)}")
+        
+        akun._pengamat = self.token_cache.akun_berubah
+        self.token_cache.put(token, akun.id, payload.get("exp"))
+        return akun
+
+    def revoke_token(self, akun_id: UUID) -> Akun:
+        akun = self._akun_tersimpan(akun_id)
+        akun.revoke_token()
+        self.repo.save(akun)
+        # repository SQLite membentuk Akun baru per baca, jadi pengamat
+        # dari verify_token belum tentu terpasang di objek ini
+        self.token_cache.invalidate_akun(akun_id)
+        return akun
+
+    def deactivate(self, akun_id: UUID) -> Akun:
+        akun = self._akun_tersimpan(akun_id)
+        akun.deactivate()
+        self.repo.save(akun)
+        self.token_cache.invalidate_akun(akun_id)
+        return akun
+
+    def _akun_tersimpan(self, akun_id: UUID) -> Akun:
+        akun = self.repo.get_by_id(akun_id)
+        if akun is None:
+            raise ValueError("Akun tidak ditemukan")
+        return akun
 
     def _hash_password(self, password: str) -> str:
-        password_bytes = password.encode('utf-8')
-        if len(password_bytes) > 72:
-            password = password[:72]
-        
-        try:
-            import bcrypt
-            salt = bcrypt.gensalt()
-            return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-        except ImportError:
-            try:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                return pwd_context.hash(password)
-            except Exception:
-                import hashlib
-                return hashlib.sha256(password.encode()).hexdigest()
+        return self.password_hashing.hash(password)
 
     def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        password_bytes = plain_password.encode('utf-8')
-        if len(password_bytes) > 72:
-            plain_password = plain_password[:72]
-        
-        try:
-            import bcrypt
-            return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-        except ImportError:
-            try:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                return pwd_context.verify(plain_password, hashed_password)
-            except Exception:
-                import hashlib
-                return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+        return self.password_hashing.verify(plain_password, hashed_password)
+
+    def _cek_password(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Verifikasi password; bila cocok dan parameter hash usang, sertakan hash baru."""
+        if not self._verify_password(password, hashed_password):
+            return False, None
+        if self.password_hashing.perlu_rehash(hashed_password):
+            return True, self._hash_password(password)
+        return True, None
 
     def _create_access_token(self, data: dict) -> str:
-        try:
-            from jose import jwt
-            to_encode = data.copy()
-            expire = datetime.utcnow() + timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
-            to_encode.update({"exp": expire})
-            encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
-            return encoded_jwt
-        except ImportError:
-            import json
-            import base64
-            return base64.b64encode(json.dumps(data).encode()).decode()
+        to_encode = data.copy()
+        expire = datetime.utcnow() + timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
+        to_encode.update({"exp": expire})
+        return self.token_codec.encode(to_encode)
 
     def _decode_token(self, token: str) -> dict:
-        try:
-            from jose import jwt, JWTError
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            return payload
-        except ImportError:
-            # Fallback sederhana
-            import json
-            import base64
-            return json.loads(base64.b64decode(token.encode()).decode())
+        return self.token_codec.decode(token)
+
+
+class KendaraanTidakDitemukan(ValueError):
+    pass
+
+
+class SlotTidakDitemukan(ValueError):
+    pass
+
+
+class SlotTidakTersedia(ValueError):
+    def __init__(self, status: str):
+        super().__init__(f"Slot parkir tidak tersedia (status: {status})")
+        self.status = status
+
+
+class SesiSudahSelesai(ValueError):
+    pass
 
 
 class ParkingService:
@@ -150,18 +245,23 @@ class ParkingService:
         self, 
         sesi_repo: Optional[InMemorySesiParkirRepository] = None,
         user_repo = None,
-        slot_repo = None
+        slot_repo = None,
+        daftar_tarif: Optional[Union[DaftarTarif, PemilihTarif]] = None,
+        cache_kutipan: Optional[CacheKutipan] = None,
     ):
         self.repo = sesi_repo or InMemorySesiParkirRepository()
         self.user_repo = user_repo
         self.slot_repo = slot_repo
-        self.tarif = ParkingTariff(price_per_hour=3000.0, max_daily=50000.0)
+        self.daftar_tarif = daftar_tarif or DaftarTarif()
+        self.tarif = self.daftar_tarif.bawaan
+        self.cache_kutipan = cache_kutipan if cache_kutipan is not None else CacheKutipan()
 
     def start_parking(
         self,
         user_id: UUID,
         vehicle_id: UUID,
-        slot_id: Optional[UUID]
+        slot_id: Optional[UUID],
+        pintu_masuk: Optional[Koordinat] = None
     ) -> SesiParkir:
         vehicle = None
         if self.user_repo:
@@ -173,15 +273,57 @@ class ParkingService:
             if not vehicle:
                 raise ValueError("Kendaraan tidak ditemukan untuk user ini")
         
-        if slot_id and self.slot_repo:
-            from manajemen_parkir.domain.alokasi_slot import StatusSlot
-            slot = self.slot_repo.find_by_id(slot_id)
-            if not slot:
-                raise ValueError("Slot parkir tidak ditemukan")
-            if slot.status_ketersediaan.status != StatusSlot.TERSEDIA:
-                raise ValueError("Slot parkir tidak tersedia")
-            slot.tandai_terisi()
-            self.slot_repo.save(slot)
+        return self._mulai_parkir(user_id, vehicle_id, vehicle, slot_id, pintu_masuk)
+
+    def start_parking_batch(
+        self,
+        permintaan: Sequence[Tuple[UUID, Optional[UUID], Optional[Koordinat]]]
+    ) -> List[Union[SesiParkir, ValueError]]:
+        """Check-in banyak kendaraan, tiap item (vehicle_id, slot_id, pintu_masuk).
+
+        Item diproses berurutan dan kegagalan satu item tidak menghentikan
+        yang lain; hasilnya sesi atau ValueError pada posisi yang sama.
+        Pemilik kendaraan dicari sekali per vehicle_id.
+        """
+        if self.user_repo is None:
+            raise ValueError("Batch check-in membutuhkan user repository")
+        
+        kendaraan = {}
+        hasil: List[Union[SesiParkir, ValueError]] = []
+        for vehicle_id, slot_id, pintu_masuk in permintaan:
+            try:
+                if vehicle_id not in kendaraan:
+                    kendaraan[vehicle_id] = self.user_repo.find_by_vehicle_id(vehicle_id)
+                found = kendaraan[vehicle_id]
+                if found is None:
+                    raise KendaraanTidakDitemukan("Kendaraan tidak ditemukan")
+                owner, vehicle = found
+                hasil.append(self._mulai_parkir(owner.id, vehicle.id, vehicle, slot_id, pintu_masuk))
+            except ValueError as e:
+                hasil.append(e)
+        return hasil
+
+    def _mulai_parkir(
+        self,
+        user_id: UUID,
+        vehicle_id: UUID,
+        vehicle,
+        slot_id: Optional[UUID],
+        pintu_masuk: Optional[Koordinat]
+    ) -> SesiParkir:
+        if slot_id is None and pintu_masuk is not None and self.slot_repo:
+            # Tanpa slot pilihan: ambil slot kosong terdekat bila ada,
+            # bila penuh sesi tetap dicatat tanpa slot seperti sebelumnya
+            slot_id = self._alokasi_terdekat(pintu_masuk)
+        elif slot_id and self.slot_repo:
+            # Cek status dan pengisian slot terjadi atomik di repository,
+            # sehingga dua check-in (juga dari worker lain) tidak bisa
+            # mendapat slot yang sama
+            if self.slot_repo.reservasi(slot_id) is None:
+                slot = self.slot_repo.find_by_id(slot_id)
+                if not slot:
+                    raise SlotTidakDitemukan("Slot parkir tidak ditemukan")
+                raise SlotTidakTersedia(slot.status_ketersediaan.status.value)
         
         # Use vehicle's nomor_plat if available, otherwise create default
         if vehicle and vehicle.nomor_plat:
@@ -196,9 +338,25 @@ class ParkingService:
             vehicle_id=vehicle_id,
             slot_id=slot_id
         )
-        self.repo.save(sesi)
+        try:
+            self.repo.save(sesi)
+        except Exception:
+            if slot_id and self.slot_repo:
+                self.slot_repo.lepas(slot_id)
+            raise
         return sesi
 
+    def _alokasi_terdekat(self, pintu_masuk: Koordinat) -> Optional[UUID]:
+        dicoba = set()
+        while True:
+            slot = self.slot_repo.cari_tersedia_terdekat(pintu_masuk, dicoba)
+            if slot is None:
+                return None
+            if self.slot_repo.reservasi(slot.id) is not None:
+                return slot.id
+            # keduluan check-in lain, coba kandidat berikutnya
+            dicoba.add(slot.id)
+
     def end_parking(self, sesi_id: UUID) -> SesiParkir:
         sesi = self.repo.get_by_id(sesi_id)
         if not sesi:
@@ -206,32 +364,66 @@ class ParkingService:
         if sesi.waktu_keluar is not None:
             raise ValueError("Sesi parkir sudah selesai")
         
-        sesi.check_out(self.tarif)
-        self.repo.save(sesi)
+        # dihitung pada salinan: sesi tersimpan baru berubah bila selesaikan
+        # lolos, jadi check-out yang kalah tidak menimpa hasil pemenangnya
+        sesi = replace(sesi)
+        sesi.check_out(self.tarif_untuk(sesi))
+        if not self.repo.selesaikan(sesi):
+            # keduluan check-out lain untuk sesi yang sama
+            raise ValueError("Sesi parkir sudah selesai")
+        self.cache_kutipan.lupakan(sesi_id)
         
         if sesi.slot_id and self.slot_repo:
-            slot = self.slot_repo.find_by_id(sesi.slot_id)
-            if slot:
-                slot.tandai_tersedia()
-                self.slot_repo.save(slot)
+            self.slot_repo.lepas(sesi.slot_id)
         
         return sesi
+
+    def end_parking_batch(self, sesi_ids: Sequence[UUID]) -> List[Union[SesiParkir, ValueError]]:
+        """Check-out banyak sesi; hasil per item seperti start_parking_batch."""
+        hasil: List[Union[SesiParkir, ValueError]] = []
+        for sesi_id in sesi_ids:
+            try:
+                hasil.append(self.end_parking(sesi_id))
+            except ValueError as e:
+                hasil.append(e)
+        return hasil
     
+    def tarif_untuk(self, sesi: SesiParkir, jenis_tarif: JenisTarif = JenisTarif.REGULER):
+        """Tarif untuk tipe kendaraan sesi, atau tarif bawaan."""
+        return self.daftar_tarif.pilih(sesi.nomor_plat.tipe_kendaraan, jenis_tarif)
+
     def get_active_sessions_by_user(self, user_id: UUID):
-        all_sessions = self.repo.list()
-        return [s for s in all_sessions if s.owner_id == user_id and s.waktu_keluar is None]
+        return self.repo.list_active_by_owner(user_id)
     
     def get_session_history_by_user(self, user_id: UUID):
-        all_sessions = self.repo.list()
-        return [s for s in all_sessions if s.owner_id == user_id and s.waktu_keluar is not None]
+        return self.repo.list_history_by_owner(user_id)
     
     def calculate_parking_fee(self, sesi_id: UUID) -> Decimal:
+        """Biaya final sesi yang sudah selesai, atau perkiraan saat ini bila masih parkir."""
         sesi = self.repo.get_by_id(sesi_id)
         if not sesi:
             raise ValueError("Sesi parkir tidak ditemukan")
-        if sesi.durasi:
-            return self.tarif.calculate(sesi.durasi.total_jam)
+        if sesi.biaya_final is not None:
+            return sesi.biaya_final.jumlah
+        if sesi.status == StatusSesi.AKTIF:
+            return Decimal(self._kutip(sesi, datetime.utcnow()).sen) / 100
         return Decimal("0")
+
+    def kutip_biaya(self, sesi_id: UUID, sekarang: Optional[datetime] = None) -> KutipanBiaya:
+        """Biaya bila sesi aktif check-out ``sekarang``, tanpa mengubah sesi.
+
+        Kutipan dicache sampai jam tertagih berikutnya dimulai, jadi kios yang
+        polling berkali-kali hanya memicu perhitungan sekali per jam.
+        """
+        sesi = self.repo.get_by_id(sesi_id)
+        if not sesi:
+            raise ValueError("Sesi parkir tidak ditemukan")
+        if sesi.status != StatusSesi.AKTIF or sesi.waktu_keluar is not None:
+            raise SesiSudahSelesai("Sesi parkir sudah selesai")
+        return self._kutip(sesi, sekarang or datetime.utcnow())
+
+    def _kutip(self, sesi: SesiParkir, sekarang: datetime) -> KutipanBiaya:
+        return self.cache_kutipan.kutip(sesi.id_sesi, sesi.waktu_masuk, self.tarif_untuk(sesi), sekarang)
     
     def get(self, sesi_id: UUID):
         """Get session by ID"""
@@ -240,3 +432,42 @@ class ParkingService:
     def list(self):
         """List all sessions"""
         return self.repo.list()
+    
+    def list_halaman(self, setelah=None, batas: int = 50):
+        """Satu halaman sesi urut waktu masuk: (sesi, kursor berikutnya)"""
+        return self.repo.list_halaman(setelah, batas)
+    
+    def ekspor(
+        self,
+        dari: Optional[datetime] = None,
+        sampai: Optional[datetime] = None,
+        status: Optional[StatusSesi] = None,
+        owner_id: Optional[UUID] = None,
+        ukuran_blok: int = 500,
+    ) -> Iterator[List[SesiParkir]]:
+        """Riwayat sesi urut waktu masuk, per blok ``ukuran_blok``.
+        
+        Blok berikutnya baru diambil dari repository saat diminta, sehingga
+        memori tetap sebesar satu blok berapa pun panjang riwayatnya.
+        """
+        kursor = None
+        while True:
+            blok, kursor = self.repo.list_halaman(
+                kursor, ukuran_blok, dari=dari, sampai=sampai, status=status, owner_id=owner_id
+            )
+            if blok:
+                yield blok
+            if kursor is None:
+                return
+
+    def analitik(
+        self,
+        dari: Optional[datetime] = None,
+        sampai: Optional[datetime] = None,
+        lebar_interval: int = LEBAR_INTERVAL["day"],
+        daftar_persentil: Sequence[float] = PERSENTIL_DEFAULT,
+    ) -> Ringkasan:
+        """Ringkasan pendapatan, durasi dan okupansi untuk sesi yang masuk di [dari, sampai)."""
+        lantai_slot = self.slot_repo.lantai_per_slot() if self.slot_repo else {}
+        kolom = self.repo.kolom_analitik(dari, sampai)
+        return ringkas(kolom, lantai_slot, lebar_interval, daftar_persentil)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 
 from manajemen_parkir.domain.alokasi_slot import (
@@ -7,6 +7,9 @@ from manajemen_parkir.domain.alokasi_slot import (
 from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository
 
 
+MAKS_SLOT_MASSAL = 10_000
+
+
 class SlotParkirService:
     
     def __init__(self, repository: InMemorySlotParkirRepository):
@@ -20,6 +23,18 @@ class SlotParkirService:
         kapasitas: int = 1,
         keterangan: Optional[str] = None,
         tipe_sensor: Optional[str] = None
+    ) -> SlotParkir:
+        slot = self._slot_baru(lantai, posisi_x, posisi_y, kapasitas, keterangan, tipe_sensor)
+        return self.repository.save(slot)
+    
+    def _slot_baru(
+        self,
+        lantai: int,
+        posisi_x: float,
+        posisi_y: float,
+        kapasitas: int = 1,
+        keterangan: Optional[str] = None,
+        tipe_sensor: Optional[str] = None
     ) -> SlotParkir:
         sensor = None
         if tipe_sensor:
@@ -29,7 +44,7 @@ class SlotParkirService:
             except KeyError:
                 raise ValueError(f"Tipe sensor tidak valid: {tipe_sensor}")
         
-        slot = SlotParkir.create(
+        return SlotParkir.create(
             lantai=lantai,
             posisi_x=posisi_x,
             posisi_y=posisi_y,
@@ -37,25 +52,91 @@ class SlotParkirService:
             sensor=sensor,
             keterangan=keterangan
         )
+    
+    def buat_slot_massal(self, data: Iterable[dict]) -> List[SlotParkir]:
+        """Buat banyak slot sekaligus dari dict berargumen sama dengan buat_slot.
         
-        return self.repository.save(slot)
+        Semua data divalidasi lebih dulu; bila ada satu yang salah tidak ada
+        slot yang disimpan. Slot disimpan dengan satu operasi repository.
+        """
+        data = list(data)
+        if not data:
+            raise ValueError("Daftar slot tidak boleh kosong")
+        if len(data) > MAKS_SLOT_MASSAL:
+            raise ValueError(f"Maksimal {MAKS_SLOT_MASSAL} slot per permintaan")
+        
+        slots = []
+        posisi = set()
+        for i, item in enumerate(data):
+            try:
+                slot = self._slot_baru(**item)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Slot ke-{i}: {e}")
+            koordinat = slot.koordinat
+            key = (koordinat.lantai, koordinat.posisi_x, koordinat.posisi_y)
+            if key in posisi:
+                raise ValueError(f"Slot ke-{i}: posisi {key} duplikat")
+            posisi.add(key)
+            slots.append(slot)
+        
+        return self.repository.save_many(slots)
     
-    def update_status_slot(self, slot_id: UUID, status: str) -> SlotParkir:
-        slot = self.repository.get_by_id(slot_id)
-        if not slot:
-            raise ValueError("Slot parkir tidak ditemukan")
+    def buat_slot_grid(
+        self,
+        lantai: int,
+        baris: int,
+        kolom: int,
+        jarak_x: float,
+        jarak_y: float,
+        asal_x: float = 0.0,
+        asal_y: float = 0.0,
+        kapasitas: int = 1,
+        tipe_sensor: Optional[str] = None
+    ) -> List[SlotParkir]:
+        """Buat baris x kolom slot berjarak tetap di satu lantai."""
+        if baris < 1 or kolom < 1:
+            raise ValueError("Baris dan kolom minimal 1")
+        if jarak_x <= 0 or jarak_y <= 0:
+            raise ValueError("Jarak antar slot harus positif")
+        if baris * kolom > MAKS_SLOT_MASSAL:
+            raise ValueError(f"Maksimal {MAKS_SLOT_MASSAL} slot per permintaan")
         
-        status_upper = status.upper()
-        if status_upper == "TERSEDIA":
-            slot.tandai_tersedia()
-        elif status_upper == "TERISI":
-            slot.tandai_terisi()
-        elif status_upper == "RUSAK":
-            slot.tandai_rusak()
-        else:
-            raise ValueError(f"Status tidak valid: {status}")
+        return self.buat_slot_massal(
+            {
+                "lantai": lantai,
+                "posisi_x": asal_x + k * jarak_x,
+                "posisi_y": asal_y + b * jarak_y,
+                "kapasitas": kapasitas,
+                "tipe_sensor": tipe_sensor,
+            }
+            for b in range(baris)
+            for k in range(kolom)
+        )
+    
+    def update_status_slot(self, slot_id: UUID, status: str) -> SlotParkir:
+        """Ubah status slot lewat compare-and-set repository.
         
-        return self.repository.save(slot)
+        Perubahan dari petugas melewati kunci yang sama dengan check-in dan
+        check-out, jadi tidak bisa menimpa reservasi yang terjadi bersamaan.
+        Bila status berubah sejak dibaca, slot dibaca ulang lalu dicoba lagi.
+        """
+        while True:
+            slot = self.repository.get_by_id(slot_id)
+            if not slot:
+                raise ValueError("Slot parkir tidak ditemukan")
+            
+            try:
+                baru = StatusSlot[status.upper()]
+            except KeyError:
+                raise ValueError(f"Status tidak valid: {status}")
+            
+            lama = slot.status_ketersediaan.status
+            if baru.value == StatusSlot.TERISI.value and lama.value == StatusSlot.RUSAK.value:
+                raise ValueError("Slot rusak tidak bisa diisi")
+            
+            hasil = self.repository.ubah_status_jika(slot_id, lama, baru)
+            if hasil is not None:
+                return hasil
     
     def pasang_sensor_ke_slot(
         self,
@@ -100,10 +181,7 @@ class SlotParkirService:
         return self.repository.save(slot)
     
     def get_slot_tersedia(self, lantai: Optional[int] = None) -> List[SlotParkir]:
-        if lantai is not None:
-            slots = self.repository.list_by_lantai(lantai)
-            return [slot for slot in slots if slot.is_tersedia()]
-        return self.repository.list_tersedia()
+        return self.repository.list_tersedia(lantai)
     
     def get_statistik_slot(self) -> dict:
         total = self.repository.count_total()
@@ -120,32 +198,17 @@ class SlotParkirService:
         }
     
     def get_statistik_per_lantai(self) -> dict:
-        all_slots = self.repository.list_all()
         lantai_stats = {}
         
-        for slot in all_slots:
-            lantai = slot.koordinat.lantai
-            if lantai not in lantai_stats:
-                lantai_stats[lantai] = {
-                    "total": 0,
-                    "tersedia": 0,
-                    "terisi": 0,
-                    "rusak": 0
-                }
-            
-            lantai_stats[lantai]["total"] += 1
-            status = slot.status_ketersediaan.status
-            
-            if status == StatusSlot.TERSEDIA:
-                lantai_stats[lantai]["tersedia"] += 1
-            elif status == StatusSlot.TERISI:
-                lantai_stats[lantai]["terisi"] += 1
-            elif status == StatusSlot.RUSAK:
-                lantai_stats[lantai]["rusak"] += 1
-        
-        for lantai, stats in lantai_stats.items():
-            total = stats["total"]
-            terisi = stats["terisi"]
-            stats["persentase_okupansi"] = round((terisi / total * 100) if total > 0 else 0, 2)
+        for lantai, counts in self.repository.count_per_lantai().items():
+            total = counts["total"]
+            terisi = counts[StatusSlot.TERISI.value]
+            lantai_stats[lantai] = {
+                "total": total,
+                "tersedia": counts[StatusSlot.TERSEDIA.value],
+                "terisi": terisi,
+                "rusak": counts[StatusSlot.RUSAK.value],
+                "persentase_okupansi": round((terisi / total * 100) if total > 0 else 0, 2)
+            }
         
         return lantai_stats
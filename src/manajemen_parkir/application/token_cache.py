@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+
+class TokenCache:
+    """LRU token -> akun_id untuk hasil verify_token yang sudah lolos.
+
+    Setiap entri kedaluwarsa pada yang lebih awal antara klaim ``exp`` token
+    dan ``ttl_detik`` sejak disimpan.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl_detik: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl_detik = ttl_detik
+        self._entries: "OrderedDict[str, Tuple[UUID, float]]" = OrderedDict()
+        self._tokens_per_akun: Dict[UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[UUID]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            akun_id, kedaluwarsa = entry
+            if time.time() >= kedaluwarsa:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return akun_id
+
+    def put(self, token: str, akun_id: UUID, exp: Optional[float] = None) -> None:
+        kedaluwarsa = time.time() + self.ttl_detik
+        if exp is not None:
+            kedaluwarsa = min(kedaluwarsa, float(exp))
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (akun_id, kedaluwarsa)
+            self._tokens_per_akun.setdefault(akun_id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_akun(self, akun_id: UUID) -> None:
+        with self._lock:
+            for token in self._tokens_per_akun.pop(akun_id, set()):
+                self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_per_akun.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def akun_berubah(self, akun) -> None:
+        self.invalidate_akun(akun.id)
+
+    def _remove(self, token: str) -> None:
+        akun_id, _ = self._entries.pop(token)
+        tokens = self._tokens_per_akun.get(akun_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_per_akun[akun_id]
@@ -0,0 +1,60 @@
+"""Encoder/decoder token akses yang dipilih sekali per proses."""
+import base64
+import json
+import logging
+from typing import Dict, Tuple
+
+try:
+    from jose import jwt as _jwt
+except ImportError:  # pragma: no cover - python-jose ada di requirements.txt
+    _jwt = None
+
+logger = logging.getLogger(__name__)
+
+
+class JoseTokenCodec:
+    nama = "python-jose"
+
+    def __init__(self, secret_key: str, algorithm: str) -> None:
+        if _jwt is None:
+            raise RuntimeError("Paket python-jose tidak terpasang")
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self._algorithms = [algorithm]
+
+    def encode(self, claims: dict) -> str:
+        return _jwt.encode(claims, self.secret_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return _jwt.decode(token, self.secret_key, algorithms=self._algorithms)
+
+
+class Base64TokenCodec:
+    """Fallback tanpa tanda tangan; hanya untuk lingkungan tanpa python-jose."""
+
+    nama = "base64-json"
+
+    def encode(self, claims: dict) -> str:
+        claims = {k: v for k, v in claims.items() if k != "exp"}
+        return base64.b64encode(json.dumps(claims).encode()).decode()
+
+    def decode(self, token: str) -> dict:
+        return json.loads(base64.b64decode(token.encode()).decode())
+
+
+_codecs: Dict[Tuple[str, str], object] = {}
+
+
+def token_codec_untuk(secret_key: str, algorithm: str):
+    """Codec untuk pasangan (secret, algoritma), dibuat sekali lalu dipakai ulang."""
+    key = (secret_key, algorithm)
+    codec = _codecs.get(key)
+    if codec is None:
+        if _jwt is not None:
+            codec = JoseTokenCodec(secret_key, algorithm)
+            logger.info("Token codec aktif: %s (%s)", codec.nama, algorithm)
+        else:
+            codec = Base64TokenCodec()
+            logger.warning("python-jose tidak tersedia, token codec aktif: %s", codec.nama)
+        _codecs[key] = codec
+    return codec
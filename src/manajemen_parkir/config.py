@@ -0,0 +1,35 @@
+"""Konfigurasi runtime yang dibaca dari environment variable."""
+import os
+
+
+def _env_int(nama: str, default: int) -> int:
+    nilai = os.environ.get(nama)
+    if nilai is None or nilai.strip() == "":
+        return default
+    return int(nilai)
+
+
+# Jumlah thread khusus untuk bcrypt dan batas permintaan yang boleh mengantre
+HASH_WORKERS = _env_int("PARKIR_HASH_WORKERS", 2)
+HASH_MAX_ANTRIAN = _env_int("PARKIR_HASH_MAX_ANTRIAN", 64)
+
+# Kebijakan hash password: bcrypt | scrypt | pbkdf2_sha256, beserta biayanya
+HASH_ALGORITMA = os.environ.get("PARKIR_HASH_ALGORITMA", "bcrypt")
+BCRYPT_ROUNDS = _env_int("PARKIR_BCRYPT_ROUNDS", 12)
+SCRYPT_LN = _env_int("PARKIR_SCRYPT_LN", 14)
+PBKDF2_ITERASI = _env_int("PARKIR_PBKDF2_ITERASI", 600_000)
+
+# Penyimpanan repository: memory (default, hilang saat restart) | sqlite
+STORAGE = os.environ.get("PARKIR_STORAGE", "memory")
+SQLITE_PATH = os.environ.get("PARKIR_SQLITE_PATH", "parkir.db")
+SQLITE_POOL = _env_int("PARKIR_SQLITE_POOL", 4)
+
+# Titik pintu masuk "lantai,posisi_x,posisi_y" untuk alokasi slot terdekat
+PINTU_MASUK = tuple(
+    float(v) for v in os.environ.get("PARKIR_PINTU_MASUK", "1,0,0").split(",")
+)
+
+# Kompaksi sesi SELESAI ke arsip kolumnar (storage memory): interval dalam
+# detik (0 = mati) dan umur minimal sesi sejak check-out sebelum diarsipkan
+ARSIP_INTERVAL = _env_int("PARKIR_ARSIP_INTERVAL", 300)
+ARSIP_UMUR_MENIT = _env_int("PARKIR_ARSIP_UMUR_MENIT", 60)
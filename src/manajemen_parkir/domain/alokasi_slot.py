@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from typing import Callable, Optional, List
 from uuid import UUID, uuid4
 
 
@@ -17,7 +17,7 @@ class StatusSlot(Enum):
     RUSAK = "RUSAK"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Koordinat:
     lantai: int
     posisi_x: float
@@ -28,7 +28,7 @@ class Koordinat:
             raise ValueError("Lantai tidak boleh negatif")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StatusKetersediaan:
     status: StatusSlot
     waktu_update: datetime
@@ -55,7 +55,7 @@ class StatusKetersediaan:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Sensor:
     id: UUID
     tipe: TipeSensor
@@ -82,7 +82,7 @@ class Sensor:
         self.is_active = False
 
 
-@dataclass
+@dataclass(slots=True)
 class SlotParkir:
     id: UUID
     kapasitas: int
@@ -92,6 +92,10 @@ class SlotParkir:
     keterangan: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    # dipanggil dengan (slot, status_lama) setiap kali status berubah
+    _pengamat: Optional[Callable[['SlotParkir', StatusSlot], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     @staticmethod
     def create(
@@ -113,18 +117,22 @@ class SlotParkir:
         )
     
     def tandai_tersedia(self):
-        self.status_ketersediaan = StatusKetersediaan.tersedia()
-        self.updated_at = datetime.now()
+        self._ubah_status(StatusKetersediaan.tersedia())
     
     def tandai_terisi(self):
         if self.status_ketersediaan.status == StatusSlot.RUSAK:
             raise ValueError("Slot rusak tidak bisa diisi")
-        self.status_ketersediaan = StatusKetersediaan.terisi()
-        self.updated_at = datetime.now()
+        self._ubah_status(StatusKetersediaan.terisi())
     
     def tandai_rusak(self):
-        self.status_ketersediaan = StatusKetersediaan.rusak()
+        self._ubah_status(StatusKetersediaan.rusak())
+    
+    def _ubah_status(self, status_baru: StatusKetersediaan):
+        status_lama = self.status_ketersediaan.status
+        self.status_ketersediaan = status_baru
         self.updated_at = datetime.now()
+        if self._pengamat is not None and status_lama != status_baru.status:
+            self._pengamat(self, status_lama)
     
     def pasang_sensor(self, sensor: Sensor):
         self.sensor = sensor
@@ -2,7 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional
 from uuid import UUID, uuid4
 
 
@@ -12,7 +12,7 @@ class Peran(str, Enum):
     PENGGUNA = "PENGGUNA"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Kredensial:
     username: str
     password_hash: str
@@ -24,7 +24,7 @@ class Kredensial:
             raise ValueError("Password hash tidak boleh kosong")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TokenAkses:
     token: str
     expires_at: datetime
@@ -34,7 +34,7 @@ class TokenAkses:
         return datetime.utcnow() > self.expires_at
 
 
-@dataclass
+@dataclass(slots=True)
 class Akun:
     kredensial: Kredensial
     peran: Peran
@@ -43,6 +43,10 @@ class Akun:
     created_at: datetime = field(default_factory=datetime.utcnow)
     is_active: bool = True
     current_token: Optional[TokenAkses] = None
+    # dipanggil dengan (akun) saat token dicabut, mis. untuk membuang cache verifikasi
+    _pengamat: Optional[Callable[[Akun], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @staticmethod
     def create(
@@ -64,8 +68,15 @@ class Akun:
         self.current_token = token_akses
         return token_akses
 
+    def ganti_password_hash(self, password_hash: str) -> None:
+        self.kredensial = Kredensial(
+            username=self.kredensial.username, password_hash=password_hash
+        )
+
     def revoke_token(self) -> None:
         self.current_token = None
+        if self._pengamat is not None:
+            self._pengamat(self)
 
     def deactivate(self) -> None:
         self.is_active = False
@@ -2,6 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID, uuid4
 from decimal import Decimal
@@ -15,7 +16,20 @@ class StatusSesi(str, Enum):
     DIBATALKAN = "DIBATALKAN"
 
 
-@dataclass
+# Value object frozen aman dipakai bersama; riwayat sesi yang besar hanya
+# memiliki sedikit variasi durasi dan biaya, jadi instance-nya di-intern.
+@lru_cache(maxsize=4096)
+def _durasi(total_menit: int) -> Durasi:
+    return Durasi(total_menit=total_menit)
+
+
+@lru_cache(maxsize=1024)
+def _biaya_final(sen: int) -> BiayaFinal:
+    # Decimal hanya dibuat sekali per nominal, bukan sekali per check-out
+    return BiayaFinal(jumlah=Decimal(sen) / 100)
+
+
+@dataclass(slots=True)
 class SesiParkir:
     nomor_plat: NomorPlat
     id_sesi: UUID = field(default_factory=uuid4)
@@ -29,18 +43,22 @@ class SesiParkir:
     slot_id: Optional[UUID] = None
 
     def check_out(self, tarif):
+        """Akhiri sesi sekarang; ``tarif`` menyediakan ``hitung_sen(masuk, keluar)``."""
         if self.status != StatusSesi.AKTIF:
             raise ValueError("Sesi sudah berakhir atau dibatalkan.")
         self.waktu_keluar = datetime.utcnow()
         selisih = self.waktu_keluar - self.waktu_masuk
-        total_menit = int(selisih.total_seconds() / 60)
-        self.durasi = Durasi(total_menit=total_menit)
-        jumlah = tarif.calculate(self.waktu_masuk, self.waktu_keluar)
-        self.biaya_final = BiayaFinal(jumlah=Decimal(jumlah))
+        if selisih.days >= 0:
+            total_menit = selisih.days * 1440 + selisih.seconds // 60
+        else:
+            # jam mundur: dibulatkan ke arah nol seperti int()
+            total_menit = int(selisih.total_seconds() / 60)
+        self.durasi = _durasi(total_menit)
+        self.biaya_final = _biaya_final(tarif.hitung_sen(self.waktu_masuk, self.waktu_keluar))
         self.status = StatusSesi.SELESAI
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaksi:
     id_transaksi: UUID = field(default_factory=uuid4)
     id_sesi: UUID | None = None
@@ -1,9 +1,10 @@
-from dataclasses import dataclass
-from datetime import datetime
-from decimal import Decimal
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 from enum import Enum
-from math import ceil
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
 from uuid import UUID, uuid4
 
 
@@ -18,6 +19,18 @@ class TipeKendaraan(Enum):
     MOBIL = "MOBIL"
 
 
+def tipe_kendaraan_dari(nilai: Union[str, TipeKendaraan, None]) -> Optional[TipeKendaraan]:
+    """TipeKendaraan dari teks bebas di ``NomorPlat`` ("mobil", " MOTOR"), atau None."""
+    if nilai.__class__ is str:
+        return _tipe_dari_teks(nilai)
+    return nilai
+
+
+@lru_cache(maxsize=256)
+def _tipe_dari_teks(teks: str) -> Optional[TipeKendaraan]:
+    return TipeKendaraan._value2member_map_.get(teks.strip().upper())
+
+
 @dataclass(frozen=True)
 class Durasi:
     total_jam: int
@@ -60,6 +73,166 @@ class BiayaFinal:
         return self.format_rupiah()
 
 
+def _ke_sen(harga) -> Optional[int]:
+    """Harga dalam sen, atau None bila tidak tepat sampai dua desimal."""
+    sen = Decimal(harga) * 100
+    if sen != sen.to_integral_value():
+        return None
+    return int(sen)
+
+
+def _ke_sen_bulat(harga) -> int:
+    """Harga dalam sen, dibulatkan setengah ke atas."""
+    return int((Decimal(harga) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+class TabelTarif:
+    """Biaya (sen) per jumlah jam tertagih, dihitung sekali per tarif.
+
+    Lama parkir antara ``jam - 1`` dan ``jam`` jam menyentuh paling sedikit
+    ``ceil(jam / 24)`` hari kalender dan paling banyak satu hari lebih, jadi
+    tiap baris tabel menyimpan biaya untuk kedua kemungkinan itu dengan batas
+    harian sudah diterapkan. Di luar tabel biaya dihitung dengan rumus yang
+    sama, tetap O(1).
+    """
+
+    JAM_TABEL = 24 * 7
+
+    __slots__ = ("per_jam", "maks_harian", "_tabel")
+
+    def __init__(self, per_jam: int, maks_harian: Optional[int] = None, jam_tabel: int = JAM_TABEL):
+        self.per_jam = per_jam
+        self.maks_harian = maks_harian
+        self._tabel: List[Tuple[int, int, int]] = []
+        for jam in range(jam_tabel + 1):
+            hari = max(1, -(-jam // 24))
+            self._tabel.append((hari, self.rumus(jam, hari), self.rumus(jam, hari + 1)))
+
+    def rumus(self, jam: int, hari: int) -> int:
+        biaya = jam * self.per_jam
+        if self.maks_harian is not None and biaya > hari * self.maks_harian:
+            return hari * self.maks_harian
+        return biaya
+
+    def biaya(self, jam: int, hari: int = 1) -> int:
+        """Biaya ``jam`` jam tertagih yang menyentuh ``hari`` hari kalender."""
+        if jam < len(self._tabel):
+            hari_min, biaya, biaya_lebih = self._tabel[jam]
+            if hari == hari_min:
+                return biaya
+            if hari == hari_min + 1:
+                return biaya_lebih
+        return self.rumus(jam, hari)
+
+
+_JAM = 3_600_000_000
+_HARI = 24 * _JAM
+_PEKAN = 7 * _HARI
+_JAM_PER_PEKAN = 7 * 24
+
+
+def _mikro_hari(waktu: time) -> int:
+    return ((waktu.hour * 60 + waktu.minute) * 60 + waktu.second) * 1_000_000 + waktu.microsecond
+
+
+def _mikro(waktu: datetime) -> int:
+    """Mikrodetik sejak 0001-01-01 00:00, yang jatuh pada hari Senin."""
+    return (waktu.toordinal() - 1) * _HARI + _mikro_hari(waktu)
+
+
+@dataclass(frozen=True)
+class JendelaTarif:
+    """Harga per jam yang berlaku pada rentang jam tertentu, misalnya jam sibuk.
+
+    ``hari`` memakai ``datetime.weekday()`` (0 = Senin). Jendela dengan
+    ``selesai`` tidak lebih dari ``mulai`` melewati tengah malam, misalnya
+    malam 22:00-06:00. Bila beberapa jendela tumpang tindih, yang lebih dulu
+    di daftar yang berlaku.
+    """
+    nama: str
+    harga_per_jam: Decimal
+    mulai: time
+    selesai: time
+    hari: FrozenSet[int] = frozenset(range(7))
+
+    def __post_init__(self):
+        if self.harga_per_jam < 0:
+            raise ValueError("Harga per jam tidak boleh negatif")
+        hari = frozenset(self.hari)
+        if not hari or not hari <= frozenset(range(7)):
+            raise ValueError("Hari harus di antara 0 (Senin) dan 6 (Minggu)")
+        object.__setattr__(self, 'hari', hari)
+
+
+class JadwalTarif:
+    """Harga per jam (sen) sepanjang satu pekan sebagai segmen terurut.
+
+    Segmen ke-i dimulai di ``batas[i]`` (mikrodetik sejak Senin 00:00 waktu
+    lokal) dengan harga ``harga[i]``; ``batas[-1]`` selalu satu pekan. Waktu
+    di luar semua jendela memakai harga dasar.
+
+    Tiap jam tertagih dihargai menurut segmen tempat jam itu dimulai. Jumlah
+    awal jam di dalam satu segmen dihitung langsung dari batasnya, jadi
+    biaya sebanding dengan jumlah segmen yang dilewati, bukan lama parkir:
+    jam ke-k dimulai di ``masuk + k jam`` dan satu pekan tepat 168 jam,
+    sehingga pekan-pekan penuh berbiaya sama dan cukup dihitung sekali.
+    """
+
+    __slots__ = ("batas", "harga", "geser")
+
+    def __init__(self, jendela: Sequence[JendelaTarif], harga_dasar: int, selisih_utc_menit: int = 0):
+        # (awal, akhir, sen) dalam satu pekan, urut sesuai daftar jendela
+        potongan: List[Tuple[int, int, int]] = []
+        for j in jendela:
+            sen = _ke_sen_bulat(j.harga_per_jam)
+            mulai, selesai = _mikro_hari(j.mulai), _mikro_hari(j.selesai)
+            if selesai <= mulai:
+                selesai += _HARI
+            for hari in sorted(j.hari):
+                awal, akhir = hari * _HARI + mulai, hari * _HARI + selesai
+                if akhir > _PEKAN:
+                    # malam Minggu berlanjut ke Senin pagi
+                    potongan.append((0, akhir - _PEKAN, sen))
+                    akhir = _PEKAN
+                potongan.append((awal, akhir, sen))
+        titik = sorted({0, _PEKAN}.union(*((a, b) for a, b, _ in potongan)))
+        self.batas: List[int] = []
+        self.harga: List[int] = []
+        for awal, akhir in zip(titik, titik[1:]):
+            sen = next((c for a, b, c in potongan if a <= awal and akhir <= b), harga_dasar)
+            if not self.harga or self.harga[-1] != sen:
+                self.batas.append(awal)
+                self.harga.append(sen)
+        self.batas.append(_PEKAN)
+        self.geser = selisih_utc_menit * 60_000_000
+
+    def biaya(self, masuk: int, jam: int) -> int:
+        """Biaya ``jam`` jam tertagih mulai ``masuk`` (lihat ``_mikro``, waktu lokal)."""
+        awal = masuk % _PEKAN
+        penuh, sisa = divmod(jam, _JAM_PER_PEKAN)
+        total = self._rentang(awal, sisa)
+        if penuh:
+            total += penuh * self._rentang(awal, _JAM_PER_PEKAN)
+        return total
+
+    def _rentang(self, awal: int, jam: int) -> int:
+        """Biaya paling banyak 168 jam berturut-turut mulai ``awal`` dalam pekan."""
+        batas, harga = self.batas, self.harga
+        i = bisect_right(batas, awal) - 1
+        total = sudah = geser = 0
+        while sudah < jam:
+            # jam ke-k dimulai sebelum akhir segmen bila k < ceil((akhir - awal) / 1 jam)
+            sampai = -((awal - batas[i + 1] - geser) // _JAM)
+            if sampai > jam:
+                sampai = jam
+            total += (sampai - sudah) * harga[i]
+            sudah = sampai
+            i += 1
+            if i == len(harga):
+                i, geser = 0, geser + _PEKAN
+        return total
+
+
 @dataclass
 class TarifParkir:
     id: UUID
@@ -71,8 +244,20 @@ class TarifParkir:
     is_active: bool = True
     created_at: datetime = None
     updated_at: datetime = None
+    # jendela harga (jam sibuk, malam, akhir pekan, ...) dalam waktu lokal
+    jendela: Tuple[JendelaTarif, ...] = ()
+    # waktu lokal = UTC + selisih; juga menentukan hari kalender batas harian
+    selisih_utc_menit: int = 0
+    # (harga_per_jam, harga_maksimum_harian, jendela, selisih_utc_menit,
+    #  TabelTarif, tepat, penghitung sen)
+    _tabel: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # dipanggil dengan (tarif) setiap kali harga, jadwal, atau status aktif berubah
+    _pengamat: Optional[Callable[['TarifParkir'], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
+        self.jendela = tuple(self.jendela)
         if self.created_at is None:
             object.__setattr__(self, 'created_at', datetime.now())
         if self.updated_at is None:
@@ -84,7 +269,9 @@ class TarifParkir:
         tipe_kendaraan: TipeKendaraan,
         harga_per_jam: Decimal,
         jenis_tarif: JenisTarif = JenisTarif.REGULER,
-        harga_maksimum_harian: Optional[Decimal] = None
+        harga_maksimum_harian: Optional[Decimal] = None,
+        jendela: Sequence[JendelaTarif] = (),
+        selisih_utc_menit: int = 0,
     ) -> 'TarifParkir':
         if harga_per_jam < 0:
             raise ValueError("Harga per jam tidak boleh negatif")
@@ -97,49 +284,255 @@ class TarifParkir:
             jenis_tarif=jenis_tarif,
             tipe_kendaraan=tipe_kendaraan,
             harga_per_jam=harga_per_jam,
-            harga_maksimum_harian=harga_maksimum_harian
+            harga_maksimum_harian=harga_maksimum_harian,
+            jendela=tuple(jendela),
+            selisih_utc_menit=selisih_utc_menit,
         )
     
     def hitung_biaya(self, durasi: Durasi) -> BiayaFinal:
+        """Biaya menurut lama parkir saja; tanpa waktu masuk, jendela tidak
+        bisa diterapkan sehingga selalu memakai ``harga_per_jam``."""
         jam_penuh = durasi.ke_jam_penuh()
-        biaya = self.harga_per_jam * jam_penuh
+        harga, maks, _, _, tabel, tepat, _ = self._tabel_tarif()
+        if not tepat:
+            # harga dengan pecahan di bawah sen tetap dihitung dengan Decimal
+            biaya = harga * jam_penuh
+            dibatasi = bool(maks) and biaya > maks
+            if dibatasi:
+                biaya = maks
+        else:
+            # batas harian berlaku sekali berapa pun lamanya, seperti sebelumnya
+            sen = tabel.biaya(jam_penuh, 1)
+            dibatasi = sen < jam_penuh * tabel.per_jam
+            biaya = Decimal(sen) / 100
         
-        if self.harga_maksimum_harian and biaya > self.harga_maksimum_harian:
-            biaya = self.harga_maksimum_harian
+        if dibatasi:
             keterangan = f"Tarif maksimum harian diterapkan ({durasi})"
         else:
             keterangan = f"Tarif {self.jenis_tarif.value} - {durasi}"
         
         return BiayaFinal(jumlah=biaya, keterangan=keterangan)
     
+    def hitung_sen(self, waktu_masuk: datetime, waktu_keluar: datetime) -> int:
+        """Biaya check-out dalam sen, dengan mesin yang sama seperti ``ParkingTariff``.
+
+        Berbeda dengan ``hitung_biaya``, batas harian berlaku per hari
+        kalender yang disentuh sesi dan ``jendela`` ikut diterapkan. Harga
+        dengan pecahan di bawah sen dibulatkan ke sen terdekat.
+        """
+        return self._tabel_tarif()[6](waktu_masuk, waktu_keluar)
+    
+    def kutip_sen(self, waktu_masuk: datetime, sekarang: datetime) -> Tuple[int, datetime]:
+        """Biaya sesi yang belum check-out bila keluar ``sekarang``, dan saat
+        biaya itu paling cepat berubah (lihat ``berlaku_sampai``)."""
+        _, maks, _, selisih, _, _, hitung = self._tabel_tarif()
+        return hitung(waktu_masuk, sekarang), berlaku_sampai(waktu_masuk, sekarang, selisih if maks else None)
+    
+    def penghitung(self) -> Callable[[datetime, datetime], int]:
+        """Fungsi (masuk, keluar) -> sen untuk harga dan jadwal saat ini;
+        objeknya baru setiap kali salah satunya berubah."""
+        return self._tabel_tarif()[6]
+    
+    def _tabel_tarif(self) -> tuple:
+        harga, maks = self.harga_per_jam, self.harga_maksimum_harian
+        jendela, selisih = self.jendela, self.selisih_utc_menit
+        cache = self._tabel
+        if (
+            cache is None or cache[0] != harga or cache[1] != maks
+            or cache[2] is not jendela or cache[3] != selisih
+        ):
+            per_jam = _ke_sen(harga)
+            maks_sen = _ke_sen(maks) if maks else None
+            tepat = per_jam is not None and (not maks or maks_sen is not None)
+            tabel = TabelTarif(
+                _ke_sen_bulat(harga), _ke_sen_bulat(maks) if maks else None
+            )
+            if jendela:
+                hitung = _penghitung_jadwal(JadwalTarif(jendela, tabel.per_jam, selisih), tabel.maks_harian)
+            else:
+                hitung = _penghitung(tabel, selisih)
+            cache = self._tabel = (harga, maks, jendela, selisih, tabel, tepat, hitung)
+        return cache
+    
     def update_harga(self, harga_per_jam: Decimal, harga_maksimum_harian: Optional[Decimal] = None):
         if harga_per_jam < 0:
             raise ValueError("Harga per jam tidak boleh negatif")
         self.harga_per_jam = harga_per_jam
         self.harga_maksimum_harian = harga_maksimum_harian
-        self.updated_at = datetime.now()
+        self._berubah()
+    
+    def atur_jadwal(self, jendela: Sequence[JendelaTarif], selisih_utc_menit: Optional[int] = None):
+        """Ganti semua jendela harga; ``selisih_utc_menit`` misalnya 420 untuk WIB."""
+        self.jendela = tuple(jendela)
+        if selisih_utc_menit is not None:
+            self.selisih_utc_menit = selisih_utc_menit
+        self._berubah()
     
     def nonaktifkan(self):
         self.is_active = False
-        self.updated_at = datetime.now()
+        self._berubah()
     
     def aktifkan(self):
         self.is_active = True
+        self._berubah()
+    
+    def _berubah(self):
         self.updated_at = datetime.now()
+        if self._pengamat is not None:
+            self._pengamat(self)
 
 
 class ParkingTariff:
+    """Tarif per jam dengan batas per hari kalender yang disentuh sesi.
+
+    Biaya dibaca dari ``TabelTarif`` dalam sen; tabelnya disusun ulang bila
+    ``price_per_hour`` atau ``max_daily`` diubah.
+    """
+
     def __init__(self, price_per_hour: float = 3000.0, max_daily: float | None = None, tariff_type: str = "regular"):
         self.price_per_hour = float(price_per_hour)
         self.max_daily = float(max_daily) if max_daily is not None else None
         self.tariff_type = tariff_type
+        self._kunci_tabel = None
+        self._hitung = None
 
     def calculate(self, checkin: datetime, checkout: datetime) -> float:
-        seconds = (checkout - checkin).total_seconds()
-        hours = max(1, ceil(seconds / 3600))
-        fee = hours * self.price_per_hour
-        if self.max_daily is not None:
-            days = max(1, (checkout.date() - checkin.date()).days + 1)
-            fee = min(fee, days * self.max_daily)
-        return float(fee)
+        return self.penghitung()(checkin, checkout) / 100
+
+    def hitung_sen(self, checkin: datetime, checkout: datetime) -> int:
+        """Biaya dalam sen (int), tanpa pembulatan float."""
+        return self.penghitung()(checkin, checkout)
+
+    def calculate_many(
+        self, checkins: Sequence[datetime], checkouts: Sequence[datetime]
+    ) -> List[float]:
+        """``calculate`` untuk banyak pasangan sekaligus, misalnya menghitung
+        ulang riwayat setelah harga berubah. Tabel dicari sekali untuk semua."""
+        if len(checkins) != len(checkouts):
+            raise ValueError("Jumlah checkin dan checkout harus sama")
+        return [sen / 100 for sen in map(self.penghitung(), checkins, checkouts)]
+
+    def kutip_sen(self, checkin: datetime, sekarang: datetime) -> Tuple[int, datetime]:
+        """Biaya sesi yang belum check-out bila keluar ``sekarang``, dan saat
+        biaya itu paling cepat berubah (lihat ``berlaku_sampai``)."""
+        sen = self.penghitung()(checkin, sekarang)
+        return sen, berlaku_sampai(checkin, sekarang, 0 if self.max_daily is not None else None)
+
+    def penghitung(self) -> Callable[[datetime, datetime], int]:
+        """Fungsi (checkin, checkout) -> sen untuk harga saat ini; objeknya
+        baru setiap kali harga berubah."""
+        kunci = (self.price_per_hour, self.max_daily)
+        if kunci != self._kunci_tabel:
+            maks = self.max_daily
+            tabel = TabelTarif(
+                round(self.price_per_hour * 100),
+                round(maks * 100) if maks is not None else None,
+            )
+            self._hitung = _penghitung(tabel)
+            self._kunci_tabel = kunci
+        return self._hitung
+
+
+def _penghitung(tabel: TabelTarif, selisih_utc_menit: int = 0) -> Callable[[datetime, datetime], int]:
+    """Biaya (sen) dari waktu masuk dan keluar; dipakai kedua kelas tarif.
 
+    Hari kalender untuk batas harian dihitung dalam UTC + ``selisih_utc_menit``,
+    sama seperti ``_penghitung_jadwal``.
+    """
+    biaya = tabel.biaya
+    geser = timedelta(minutes=selisih_utc_menit)
+
+    def hitung(checkin: datetime, checkout: datetime) -> int:
+        # ceil(selisih / 1 jam) dengan aritmetika int: hari penuh selalu
+        # kelipatan jam, dan sisa mikrodetik cukup dibulatkan ke detik
+        selisih = checkout - checkin
+        jam = selisih.days * 24 - (-(selisih.seconds + (selisih.microseconds > 0)) // 3600)
+        if geser:
+            checkin, checkout = checkin + geser, checkout + geser
+        hari = checkout.toordinal() - checkin.toordinal() + 1
+        return biaya(jam if jam > 0 else 1, hari if hari > 0 else 1)
+
+    return hitung
+
+
+def berlaku_sampai(
+    masuk: datetime, sekarang: datetime, selisih_utc_menit: Optional[int] = None
+) -> datetime:
+    """Saat paling awal biaya sesi yang masih parkir bisa berubah.
+
+    Jumlah jam tertagih baru bertambah setelah ``masuk + N jam``. Bila ada
+    batas harian (``selisih_utc_menit`` tidak None), jumlah hari kalender
+    juga bertambah di tengah malam berikutnya menurut waktu lokal tersebut.
+    Biaya yang dihitung pada ``sekarang`` berlaku selama waktu masih lebih
+    kecil dari hasil fungsi ini.
+    """
+    selisih = sekarang - masuk
+    jam = selisih.days * 24 - (-(selisih.seconds + (selisih.microseconds > 0)) // 3600)
+    batas = masuk + timedelta(hours=jam if jam > 0 else 1)
+    if selisih_utc_menit is not None:
+        geser = timedelta(minutes=selisih_utc_menit)
+        lokal = sekarang + geser
+        tengah_malam = datetime.combine(lokal.date(), time()) + timedelta(days=1) - geser
+        if tengah_malam < batas:
+            return tengah_malam
+    return batas
+
+
+def _penghitung_jadwal(
+    jadwal: JadwalTarif, maks_harian: Optional[int]
+) -> Callable[[datetime, datetime], int]:
+    """Seperti ``_penghitung``, tetapi harga tiap jam mengikuti jadwal.
+
+    Hari kalender untuk batas harian dihitung dalam waktu lokal jadwal.
+    """
+    biaya, geser = jadwal.biaya, jadwal.geser
+
+    def hitung(checkin: datetime, checkout: datetime) -> int:
+        selisih = checkout - checkin
+        jam = selisih.days * 24 - (-(selisih.seconds + (selisih.microseconds > 0)) // 3600)
+        masuk = _mikro(checkin) + geser
+        sen = biaya(masuk, jam if jam > 0 else 1)
+        if maks_harian is not None:
+            hari = (_mikro(checkout) + geser) // _HARI - masuk // _HARI + 1
+            batas = (hari if hari > 0 else 1) * maks_harian
+            if sen > batas:
+                return batas
+        return sen
+
+    return hitung
+
+
+# Tarif yang dipakai sebelum ada tarif per tipe kendaraan
+HARGA_PER_JAM_BAWAAN = 3000.0
+MAKS_HARIAN_BAWAAN = 50000.0
+
+
+class DaftarTarif:
+    """Tarif check-out per (TipeKendaraan, JenisTarif).
+
+    Kombinasi yang tidak terdaftar atau tarifnya nonaktif, termasuk
+    kendaraan tanpa tipe yang dikenal, memakai ``bawaan``. Semua tarif
+    dihitung lewat ``hitung_sen``.
+    """
+
+    def __init__(self, bawaan=None, tarif: Iterable[TarifParkir] = ()):
+        if bawaan is None:
+            bawaan = ParkingTariff(price_per_hour=HARGA_PER_JAM_BAWAAN, max_daily=MAKS_HARIAN_BAWAAN)
+        self.bawaan = bawaan
+        self._tarif: Dict[Tuple[TipeKendaraan, JenisTarif], TarifParkir] = {}
+        for t in tarif:
+            self.daftarkan(t)
+
+    def daftarkan(self, tarif: TarifParkir) -> None:
+        """Pasang ``tarif`` untuk tipe kendaraan dan jenis tarifnya, menggantikan yang lama."""
+        self._tarif[(tarif.tipe_kendaraan, tarif.jenis_tarif)] = tarif
+
+    def pilih(
+        self,
+        tipe_kendaraan: Union[str, TipeKendaraan, None],
+        jenis_tarif: JenisTarif = JenisTarif.REGULER,
+    ):
+        tarif = self._tarif.get((tipe_kendaraan_dari(tipe_kendaraan), jenis_tarif))
+        if tarif is None or not tarif.is_active:
+            return self.bawaan
+        return tarif
@@ -6,7 +6,7 @@ from manajemen_parkir.domain.value_objects import NomorPlat
 
 
 # Entity
-@dataclass
+@dataclass(slots=True)
 class Vehicle:
     id: UUID
     nomor_plat: NomorPlat  # Value Object
@@ -39,7 +39,7 @@ class Vehicle:
         return Vehicle.create(kode_plat=plate, tipe_kendaraan=tipe)
 
 
-@dataclass
+@dataclass(slots=True)
 class MetodePembayaran:
     id: UUID
     tipe: str
@@ -65,7 +65,7 @@ class MetodePembayaran:
 
 
 # Aggregate Root
-@dataclass
+@dataclass(slots=True)
 class User:
     id: UUID
     name: str
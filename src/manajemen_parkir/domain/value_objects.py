@@ -3,13 +3,13 @@ from decimal import Decimal
 from typing import Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NomorPlat:
     kode: str
     tipe_kendaraan: Optional[str] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Durasi:
     total_menit: int
 
@@ -18,7 +18,7 @@ class Durasi:
         return max(1, -(-self.total_menit // 60))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BiayaFinal:
     jumlah: Decimal
     mata_uang: str = "IDR"
@@ -0,0 +1,470 @@
+"""
+Arsip kolumnar untuk sesi parkir yang sudah selesai.
+
+Sesi SELESAI tidak berubah lagi, jadi tidak perlu disimpan sebagai objek
+``SesiParkir`` utuh. Arsip menyimpan tiap field sebagai kolom ``array``:
+
+- waktu masuk/keluar sebagai mikrodetik sejak epoch (``q``),
+- biaya dalam sen (``q``) dan durasi dalam menit (``i``),
+- id sesi sebagai dua kolom 64-bit (``Q``),
+- kendaraan (plat, owner, vehicle sekaligus), slot dan mata uang sebagai
+  kode ke ``Kamus``; nilainya berulang antar sesi sehingga objeknya cukup
+  disimpan sekali.
+
+Kolom dikelompokkan per segmen. Baris di dalam segmen urut
+``(waktu_masuk, id_sesi)`` seperti ``IndexUrut``, ditambah permutasi urut
+id untuk pencarian dengan bisect dan daftar baris per kode kendaraan untuk
+riwayat owner. Setiap kompaksi menambah satu segmen;
+segmen kecil di ujung digabung dengan tetangganya bila ukurannya sebanding,
+sehingga jumlah segmen tetap O(log n).
+
+Objek ``SesiParkir`` dibentuk ulang saat dibaca. Sesi yang disimpan lagi ke
+repository (keluar dari arsip) ditandai terhapus di segmennya dan dibuang
+saat segmen itu digabung.
+"""
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from manajemen_parkir.domain.tariff import _ke_sen
+from manajemen_parkir.domain.value_objects import BiayaFinal, Durasi
+from manajemen_parkir.infrastructure.index_urut import Kunci
+
+EPOCH = datetime(1970, 1, 1)
+_MIKRO = timedelta(microseconds=1)
+# Penanda None di kolom 'q' dan 'i'
+KOSONG = -(1 << 63)
+_MENIT_KOSONG = -(1 << 31)
+_MASK_64 = (1 << 64) - 1
+
+
+def ke_mikro(waktu: Optional[datetime]) -> int:
+    return KOSONG if waktu is None else (waktu - EPOCH) // _MIKRO
+
+
+def dari_mikro(nilai: int) -> Optional[datetime]:
+    return None if nilai == KOSONG else EPOCH + timedelta(microseconds=nilai)
+
+
+def _dari_sen(sen: int) -> Decimal:
+    if sen % 100 == 0:
+        return Decimal(sen // 100)
+    return Decimal(sen).scaleb(-2)
+
+
+class Kamus:
+    """Pemetaan nilai berulang ke kode int; kode 0 selalu berarti None."""
+
+    def __init__(self) -> None:
+        self.nilai: List[Any] = [None]
+        self._kode: Dict[Hashable, int] = {None: 0}
+
+    def __len__(self) -> int:
+        return len(self.nilai)
+
+    def kode(self, nilai: Hashable) -> int:
+        kode = self._kode.get(nilai)
+        if kode is None:
+            kode = self._kode[nilai] = len(self.nilai)
+            self.nilai.append(nilai)
+        return kode
+
+    def cari(self, nilai: Hashable) -> Optional[int]:
+        return self._kode.get(nilai)
+
+    def salin(self) -> "Kamus":
+        kamus = Kamus()
+        kamus.nilai = list(self.nilai)
+        kamus._kode = dict(self._kode)
+        return kamus
+
+
+@dataclass
+class KolomSesi:
+    """Sesi AKTIF dan SELESAI sebagai kolom paralel, untuk analitik.
+
+    ``keluar`` bernilai ``KOSONG`` untuk sesi yang belum check-out, ``biaya_sen``
+    0 bila belum ada biaya, dan ``slot`` berisi kode ke ``slot_id``. Baris
+    tersusun atas beberapa run yang masing-masing urut ``masuk``; ``run``
+    berisi indeks awal tiap run.
+    """
+
+    masuk: array = field(default_factory=lambda: array("q"))
+    keluar: array = field(default_factory=lambda: array("q"))
+    biaya_sen: array = field(default_factory=lambda: array("q"))
+    menit: array = field(default_factory=lambda: array("i"))
+    slot: array = field(default_factory=lambda: array("I"))
+    slot_id: Kamus = field(default_factory=Kamus)
+    run: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.masuk)
+
+    def mulai_run(self) -> None:
+        self.run.append(len(self.masuk))
+
+    def rentang_run(self) -> Iterator[Tuple[int, int]]:
+        batas = [*self.run, len(self.masuk)]
+        for awal, akhir in zip(batas, batas[1:]):
+            if awal < akhir:
+                yield awal, akhir
+
+    def tambah(
+        self,
+        masuk: datetime,
+        keluar: Optional[datetime],
+        biaya_sen: int,
+        menit: Optional[int],
+        slot_id: Optional[UUID],
+    ) -> None:
+        masuk_us, keluar_us = ke_mikro(masuk), ke_mikro(keluar)
+        if menit is None:
+            menit = 0 if keluar is None else (keluar_us - masuk_us) // 60_000_000
+        self.masuk.append(masuk_us)
+        self.keluar.append(keluar_us)
+        self.biaya_sen.append(biaya_sen)
+        self.menit.append(menit)
+        self.slot.append(self.slot_id.kode(slot_id))
+
+    def tambah_sesi(self, sesi: SesiParkir) -> None:
+        biaya = sesi.biaya_final
+        self.tambah(
+            sesi.waktu_masuk,
+            sesi.waktu_keluar,
+            0 if biaya is None else int(biaya.jumlah * 100),
+            None if sesi.durasi is None else sesi.durasi.total_menit,
+            sesi.slot_id,
+        )
+
+
+class _KunciWaktu:
+    """Tampilan baris sebagai kunci (masuk, hi, lo) untuk bisect."""
+
+    __slots__ = ("_seg",)
+
+    def __init__(self, seg: "SegmenArsip") -> None:
+        self._seg = seg
+
+    def __len__(self) -> int:
+        return len(self._seg)
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int]:
+        seg = self._seg
+        return seg.masuk[i], seg.id_hi[i], seg.id_lo[i]
+
+
+class _KunciId:
+    """Tampilan id sesi (sebagai int 128-bit) menurut permutasi urut id."""
+
+    __slots__ = ("_seg",)
+
+    def __init__(self, seg: "SegmenArsip") -> None:
+        self._seg = seg
+
+    def __len__(self) -> int:
+        return len(self._seg)
+
+    def __getitem__(self, i: int) -> int:
+        seg = self._seg
+        j = seg.urut_id[i]
+        return seg.id_hi[j] << 64 | seg.id_lo[j]
+
+
+class SegmenArsip:
+    """Satu blok kolom arsip; baris urut (waktu_masuk, id_sesi)."""
+
+    def __init__(self) -> None:
+        self.masuk = array("q")
+        self.keluar = array("q")
+        self.menit = array("i")
+        self.biaya_sen = array("q")
+        self.mata_uang = array("B")
+        self.id_hi = array("Q")
+        self.id_lo = array("Q")
+        # kode (nomor_plat, owner_id, vehicle_id) di ArsipSesi.kendaraan
+        self.kendaraan = array("I")
+        self.slot = array("I")
+        # indeks baris urut id_sesi, untuk get_by_id
+        self.urut_id = array("I")
+        # kode kendaraan -> baris-barisnya (naik, jadi tetap urut waktu),
+        # untuk riwayat per owner tanpa memindai seluruh kolom
+        self.per_kendaraan: Dict[int, array] = {}
+        # baris yang sudah keluar dari arsip (disimpan ulang ke repository)
+        self.dihapus: Set[int] = set()
+
+    KOLOM = (
+        "masuk", "keluar", "menit", "biaya_sen", "mata_uang",
+        "id_hi", "id_lo", "kendaraan", "slot",
+    )
+
+    def __len__(self) -> int:
+        return len(self.masuk)
+
+    def cari_baris(self, id_sesi: UUID) -> Optional[int]:
+        target = id_sesi.int
+        ids = _KunciId(self)
+        i = bisect_left(ids, target)
+        if i < len(ids) and ids[i] == target:
+            baris = self.urut_id[i]
+            if baris not in self.dihapus:
+                return baris
+        return None
+
+    def awal_setelah(self, kursor: Optional[Tuple[int, ...]]) -> int:
+        if kursor is None:
+            return 0
+        return bisect_right(_KunciWaktu(self), kursor)
+
+    def baris_kendaraan(self, kode: Iterable[int]) -> List[int]:
+        """Baris hidup milik kode kendaraan ``kode``, urut (waktu_masuk, id_sesi)."""
+        baris = [self.per_kendaraan[k] for k in kode if k in self.per_kendaraan]
+        gabungan = baris[0] if len(baris) == 1 else heapq.merge(*baris)
+        return [i for i in gabungan if i not in self.dihapus]
+
+    def _bangun_indeks(self) -> None:
+        ids = [hi << 64 | lo for hi, lo in zip(self.id_hi, self.id_lo)]
+        self.urut_id = array("I", sorted(range(len(ids)), key=ids.__getitem__))
+        per_kendaraan: Dict[int, array] = {}
+        for i, kode in enumerate(self.kendaraan):
+            baris = per_kendaraan.get(kode)
+            if baris is None:
+                baris = per_kendaraan[kode] = array("I")
+            baris.append(i)
+        self.per_kendaraan = per_kendaraan
+
+    @classmethod
+    def gabung(cls, a: "SegmenArsip", b: "SegmenArsip") -> "SegmenArsip":
+        """Segmen baru berisi baris hidup ``a`` dan ``b``, tetap urut waktu."""
+        seg = cls()
+        for nama in cls.KOLOM:
+            kolom = getattr(seg, nama)
+            kolom.extend(getattr(a, nama))
+            kolom.extend(getattr(b, nama))
+        buang = a.dihapus | {len(a) + i for i in b.dihapus}
+        kunci = _KunciWaktu(seg)
+        n = len(seg)
+        # b biasanya seluruhnya lebih baru dari a: cukup disambung
+        berurutan = not a or not b or kunci[len(a) - 1] < kunci[len(a)]
+        if buang or not berurutan:
+            semua = [kunci[i] for i in range(n)]
+            baris = [i for i in sorted(range(n), key=semua.__getitem__) if i not in buang]
+            for nama in cls.KOLOM:
+                lama = getattr(seg, nama)
+                setattr(seg, nama, array(lama.typecode, map(lama.__getitem__, baris)))
+        seg._bangun_indeks()
+        return seg
+
+
+class ArsipSesi:
+    """Penyimpanan kolumnar sesi SELESAI dengan akses seperti repository."""
+
+    def __init__(self) -> None:
+        # diganti utuh (copy-on-write) agar pembaca tanpa lock melihat daftar konsisten
+        self._segmen: List[SegmenArsip] = []
+        self.kendaraan = Kamus()
+        self.slot = Kamus()
+        self.mata_uang = Kamus()
+        # owner_id -> kode kendaraan miliknya
+        self._kode_owner: Dict[UUID, List[int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(s) - len(s.dihapus) for s in self._segmen)
+
+    @property
+    def segmen(self) -> List[SegmenArsip]:
+        return self._segmen
+
+    @staticmethod
+    def dapat_diarsip(sesi: SesiParkir) -> bool:
+        """Hanya sesi SELESAI yang nilainya bisa dibentuk ulang persis."""
+        if sesi.status.value != StatusSesi.SELESAI.value:
+            return False
+        for waktu in (sesi.waktu_masuk, sesi.waktu_keluar):
+            if waktu is not None and waktu.tzinfo is not None:
+                return False
+        biaya = sesi.biaya_final
+        return biaya is None or _ke_sen(biaya.jumlah) is not None
+
+    def tambah(self, sessions: List[SesiParkir]) -> None:
+        """Arsipkan ``sessions`` sebagai segmen baru (cek ``dapat_diarsip`` dulu)."""
+        if not sessions:
+            return
+        seg = SegmenArsip()
+        for sesi in sorted(sessions, key=lambda s: (s.waktu_masuk, s.id_sesi)):
+            id_int = sesi.id_sesi.int
+            biaya = sesi.biaya_final
+            seg.masuk.append(ke_mikro(sesi.waktu_masuk))
+            seg.keluar.append(ke_mikro(sesi.waktu_keluar))
+            seg.menit.append(_MENIT_KOSONG if sesi.durasi is None else sesi.durasi.total_menit)
+            seg.biaya_sen.append(KOSONG if biaya is None else _ke_sen(biaya.jumlah))
+            seg.mata_uang.append(0 if biaya is None else self.mata_uang.kode(biaya.mata_uang))
+            seg.id_hi.append(id_int >> 64)
+            seg.id_lo.append(id_int & _MASK_64)
+            seg.kendaraan.append(self._kode_kendaraan(sesi))
+            seg.slot.append(self.slot.kode(sesi.slot_id))
+        seg._bangun_indeks()
+
+        segmen = self._segmen + [seg]
+        while len(segmen) > 1 and 2 * len(segmen[-1]) >= len(segmen[-2]):
+            b = segmen.pop()
+            segmen[-1] = SegmenArsip.gabung(segmen[-1], b)
+        self._segmen = segmen
+
+    def kolom(
+        self, dari: Optional[datetime] = None, sampai: Optional[datetime] = None
+    ) -> KolomSesi:
+        """Baris arsip dengan waktu_masuk dalam [dari, sampai) sebagai ``KolomSesi``.
+
+        Rentang tiap segmen dicari dengan bisect dan disalin per irisan kolom.
+        """
+        kolom = KolomSesi(slot_id=self.slot.salin())
+        for seg in self._segmen:
+            awal = 0 if dari is None else bisect_left(seg.masuk, ke_mikro(dari))
+            akhir = len(seg) if sampai is None else bisect_left(seg.masuk, ke_mikro(sampai))
+            if awal >= akhir:
+                continue
+            kolom.mulai_run()
+            if seg.dihapus:
+                baris = [i for i in range(awal, akhir) if i not in seg.dihapus]
+                for nama in ("masuk", "keluar", "biaya_sen", "menit", "slot"):
+                    data = getattr(seg, nama)
+                    getattr(kolom, nama).extend(map(data.__getitem__, baris))
+            else:
+                for nama in ("masuk", "keluar", "biaya_sen", "menit", "slot"):
+                    getattr(kolom, nama).extend(getattr(seg, nama)[awal:akhir])
+        # penanda None di arsip diganti nilai netral (jarang ada)
+        if KOSONG in kolom.biaya_sen:
+            kolom.biaya_sen = array("q", (0 if v == KOSONG else v for v in kolom.biaya_sen))
+        if _MENIT_KOSONG in kolom.menit:
+            kolom.menit = array("i", (
+                (k - m) // 60_000_000 if v == _MENIT_KOSONG else v
+                for m, k, v in zip(kolom.masuk, kolom.keluar, kolom.menit)
+            ))
+        return kolom
+
+    def _kode_kendaraan(self, sesi: SesiParkir) -> int:
+        jumlah = len(self.kendaraan)
+        kode = self.kendaraan.kode((sesi.nomor_plat, sesi.owner_id, sesi.vehicle_id))
+        if kode == jumlah and sesi.owner_id is not None:
+            self._kode_owner.setdefault(sesi.owner_id, []).append(kode)
+        return kode
+
+    def _cari(self, id_sesi: UUID) -> Optional[Tuple[SegmenArsip, int]]:
+        for seg in self._segmen:
+            baris = seg.cari_baris(id_sesi)
+            if baris is not None:
+                return seg, baris
+        return None
+
+    def get(self, id_sesi: UUID) -> Optional[SesiParkir]:
+        lokasi = self._cari(id_sesi)
+        return None if lokasi is None else self._sesi(*lokasi)
+
+    def keluarkan(self, id_sesi: UUID) -> bool:
+        """Tandai sesi sudah tidak di arsip; True bila sebelumnya ada."""
+        lokasi = self._cari(id_sesi)
+        if lokasi is None:
+            return False
+        seg, baris = lokasi
+        seg.dihapus.add(baris)
+        return True
+
+    def list(self) -> Iterator[SesiParkir]:
+        for _, sesi in self.setelah():
+            yield sesi
+
+    def list_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        kode = self._kode_owner.get(owner_id)
+        if not kode:
+            return []
+        # tiap segmen sudah urut, jadi cukup digabung lintas segmen
+        per_segmen = [
+            [self._sesi(seg, i) for i in seg.baris_kendaraan(kode)]
+            for seg in self._segmen
+        ]
+        if len(per_segmen) == 1:
+            return per_segmen[0]
+        return list(heapq.merge(*per_segmen, key=lambda s: (s.waktu_masuk, s.id_sesi)))
+
+    def setelah(
+        self,
+        kursor: Optional[Kunci] = None,
+        sampai: Optional[datetime] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> Iterator[Tuple[Kunci, SesiParkir]]:
+        """Pasangan (kunci, sesi) urut (waktu_masuk, id_sesi) setelah ``kursor``.
+
+        Format ``kursor`` sama dengan ``IndexUrut.setelah``; ``sampai``
+        (eksklusif) dan ``owner_id`` disaring langsung di kolom.
+        """
+        kode_owner = None
+        if owner_id is not None:
+            kode_owner = frozenset(self._kode_owner.get(owner_id, ()))
+            if not kode_owner:
+                return
+        posisi = None
+        if kursor is not None:
+            posisi = (ke_mikro(kursor[0]),)
+            if len(kursor) > 1:
+                id_int = UUID(kursor[1]).int if isinstance(kursor[1], str) else kursor[1].int
+                posisi += (id_int >> 64, id_int & _MASK_64)
+        batas = None if sampai is None else ke_mikro(sampai)
+        aliran = [
+            self._setelah_segmen(seg, posisi, batas, kode_owner)
+            for seg in self._segmen
+        ]
+        if len(aliran) == 1:
+            yield from aliran[0]
+        else:
+            yield from heapq.merge(*aliran, key=itemgetter(0))
+
+    def _setelah_segmen(
+        self,
+        seg: SegmenArsip,
+        posisi: Optional[Tuple[int, ...]],
+        batas: Optional[int],
+        kode_owner: Optional[FrozenSet[int]],
+    ) -> Iterator[Tuple[Kunci, SesiParkir]]:
+        masuk, dihapus = seg.masuk, seg.dihapus
+        awal = seg.awal_setelah(posisi)
+        if kode_owner is None:
+            baris: Iterable[int] = range(awal, len(seg))
+        else:
+            milik_owner = seg.baris_kendaraan(kode_owner)
+            baris = milik_owner[bisect_left(milik_owner, awal):]
+        for i in baris:
+            if batas is not None and masuk[i] >= batas:
+                return
+            if i in dihapus:
+                continue
+            sesi = self._sesi(seg, i)
+            yield (sesi.waktu_masuk, sesi.id_sesi), sesi
+
+    def _sesi(self, seg: SegmenArsip, i: int) -> SesiParkir:
+        nomor_plat, owner_id, vehicle_id = self.kendaraan.nilai[seg.kendaraan[i]]
+        menit = seg.menit[i]
+        sen = seg.biaya_sen[i]
+        biaya = None
+        if sen != KOSONG:
+            biaya = BiayaFinal(
+                jumlah=_dari_sen(sen), mata_uang=self.mata_uang.nilai[seg.mata_uang[i]]
+            )
+        return SesiParkir(
+            nomor_plat=nomor_plat,
+            id_sesi=UUID(int=seg.id_hi[i] << 64 | seg.id_lo[i]),
+            waktu_masuk=dari_mikro(seg.masuk[i]),
+            waktu_keluar=dari_mikro(seg.keluar[i]),
+            status=StatusSesi.SELESAI,
+            durasi=None if menit == _MENIT_KOSONG else Durasi(total_menit=menit),
+            biaya_final=biaya,
+            owner_id=owner_id,
+            vehicle_id=vehicle_id,
+            slot_id=self.slot.nilai[seg.slot[i]],
+        )
@@ -0,0 +1,122 @@
+"""
+Index terurut untuk paginasi berbasis kursor.
+
+Setiap item dipetakan ke kunci ``(nilai, id)`` yang disimpan dalam list
+terurut. Kursor adalah kunci item terakhir di halaman sebelumnya, sehingga
+posisi halaman berikutnya ditemukan dengan bisect dalam O(log n).
+
+Id disimpan sebagai objek UUID milik item itu sendiri (tanpa salinan str).
+Urutan UUID sama dengan urutan teks hex-nya, jadi kursor dari SQLite/API
+yang membawa id sebagai str tetap menunjuk posisi yang sama.
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+Kunci = Tuple[Any, Union[UUID, str]]
+
+
+class IndexUrut:
+    def __init__(self) -> None:
+        self._kunci: List[Kunci] = []
+        self._milik: Dict[UUID, Kunci] = {}
+
+    def __len__(self) -> int:
+        return len(self._kunci)
+
+    def simpan(self, item_id: UUID, nilai: Any) -> None:
+        kunci = (nilai, item_id)
+        lama = self._milik.get(item_id)
+        if lama == kunci:
+            return
+        if lama is not None:
+            self._buang(lama)
+        # nilai biasanya bertambah (waktu masuk, urutan simpan): insort jatuh di ujung list
+        insort(self._kunci, kunci)
+        self._milik[item_id] = kunci
+
+    def hapus(self, item_id: UUID) -> None:
+        lama = self._milik.pop(item_id, None)
+        if lama is not None:
+            self._buang(lama)
+
+    def hapus_banyak(self, item_ids: Iterable[UUID]) -> None:
+        """Hapus banyak item sekaligus dalam satu lintasan O(n)."""
+        buang = {self._milik.pop(i) for i in item_ids if i in self._milik}
+        if buang:
+            self._kunci = [k for k in self._kunci if k not in buang]
+            # dict tidak menyusut setelah pop; salin agar memorinya dilepas
+            self._milik = dict(self._milik)
+
+    def kunci_dari(self, item_id: UUID) -> Optional[Kunci]:
+        return self._milik.get(item_id)
+
+    def setelah(self, kursor: Optional[Kunci] = None) -> Iterator[Kunci]:
+        """Kunci terurut yang lebih besar dari ``kursor`` (semua bila None).
+
+        ``kursor`` boleh berupa ``(nilai,)`` saja untuk mulai dari kunci
+        pertama dengan nilai >= ``nilai``.
+        """
+        if kursor is not None and len(kursor) > 1 and isinstance(kursor[1], str):
+            kursor = (kursor[0], UUID(kursor[1]))
+        i = 0 if kursor is None else bisect_right(self._kunci, kursor)
+        # salinan irisan kecil per langkah, aman bila index berubah di tengah iterasi
+        while True:
+            blok = self._kunci[i:i + 256]
+            if not blok:
+                return
+            yield from blok
+            kursor = blok[-1]
+            i = bisect_right(self._kunci, kursor)
+
+    def halaman(
+        self,
+        kursor: Optional[Kunci],
+        batas: int,
+        muat: Callable[[Kunci], Any],
+        sampai: Any = None,
+    ) -> Tuple[List[Any], Optional[Kunci]]:
+        """Paling banyak ``batas`` item setelah ``kursor``.
+
+        ``muat`` mengubah kunci menjadi item, atau None untuk melewatinya
+        (filter). Iterasi berhenti di kunci dengan nilai >= ``sampai`` bila
+        diberikan. Mengembalikan (items, kursor berikutnya); kursor None
+        berarti tidak ada halaman lagi.
+        """
+        return ambil_halaman(self.muat_setelah(kursor, muat, sampai), batas)
+
+    def muat_setelah(
+        self,
+        kursor: Optional[Kunci],
+        muat: Callable[[Kunci], Any],
+        sampai: Any = None,
+    ) -> Iterator[Tuple[Kunci, Any]]:
+        """Pasangan (kunci, item) setelah ``kursor``; lihat ``halaman``."""
+        for kunci in self.setelah(kursor):
+            if sampai is not None and kunci[0] >= sampai:
+                return
+            item = muat(kunci)
+            if item is not None:
+                yield kunci, item
+
+    def _buang(self, kunci: Kunci) -> None:
+        i = bisect_left(self._kunci, kunci)
+        if i < len(self._kunci) and self._kunci[i] == kunci:
+            del self._kunci[i]
+
+
+def ambil_halaman(
+    pasangan: Iterable[Tuple[Kunci, Any]], batas: int
+) -> Tuple[List[Any], Optional[Kunci]]:
+    """Ambil ``batas`` item pertama dari aliran (kunci, item) yang sudah urut.
+
+    Kursor berikutnya hanya dikembalikan bila masih ada item sesudahnya.
+    """
+    hasil: List[Any] = []
+    terakhir: Optional[Kunci] = None
+    for kunci, item in pasangan:
+        if len(hasil) == batas:
+            return hasil, terakhir
+        hasil.append(item)
+        terakhir = kunci
+    return hasil, None
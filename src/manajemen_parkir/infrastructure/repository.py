@@ -1,18 +1,198 @@
-from typing import Dict, List, Optional
+import heapq
+import threading
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from manajemen_parkir.domain.model import SesiParkir
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from manajemen_parkir.infrastructure.arsip_sesi import ArsipSesi, KolomSesi
+from manajemen_parkir.infrastructure.index_urut import IndexUrut, Kunci, ambil_halaman
 
 
 class InMemorySesiParkirRepository:
     def __init__(self) -> None:
         self._store: Dict[UUID, SesiParkir] = {}
+        # owner_id -> {id_sesi: sesi}, urut sesuai waktu simpan pertama
+        self._owner_index: Dict[UUID, Dict[UUID, SesiParkir]] = {}
+        # id_sesi -> owner_id yang terakhir diindeks
+        self._indexed_owner: Dict[UUID, Optional[UUID]] = {}
+        # sesi yang belum check-out
+        self._active: Dict[UUID, SesiParkir] = {}
+        # (waktu_masuk, id_sesi) terurut, untuk paginasi kursor
+        self._urut = IndexUrut()
+        # sesi SELESAI yang sudah dipindah dari _store oleh arsipkan()
+        self._arsip = ArsipSesi()
+        self._kunci = threading.RLock()
 
     def get_by_id(self, id_sesi: UUID) -> Optional[SesiParkir]:
-        return self._store.get(id_sesi)
+        sesi = self._store.get(id_sesi)
+        if sesi is None and self._arsip.segmen:
+            sesi = self._arsip.get(id_sesi)
+        return sesi
 
     def save(self, sesi: SesiParkir) -> None:
+        with self._kunci:
+            if sesi.id_sesi not in self._store and self._arsip.segmen:
+                # sesi arsip yang disimpan ulang kembali menjadi sesi biasa
+                self._arsip.keluarkan(sesi.id_sesi)
+            self._simpan(sesi)
+
+    def selesaikan(self, sesi: SesiParkir) -> bool:
+        """Terapkan hasil check-out hanya bila sesi masih aktif di repository.
+
+        ``sesi`` adalah salinan yang sudah di-check-out; waktu keluar, durasi,
+        biaya, dan status-nya baru disalin ke sesi tersimpan setelah cek ini
+        lolos. Dari dua check-out bersamaan atas sesi yang sama hanya satu
+        yang mendapat True, dan yang kalah tidak menyentuh sesi tersimpan.
+        """
+        with self._kunci:
+            tersimpan = self._active.get(sesi.id_sesi)
+            if tersimpan is None:
+                return False
+            tersimpan.waktu_keluar = sesi.waktu_keluar
+            tersimpan.durasi = sesi.durasi
+            tersimpan.biaya_final = sesi.biaya_final
+            tersimpan.status = sesi.status
+            self._simpan(tersimpan)
+        return True
+
+    def _simpan(self, sesi: SesiParkir) -> None:
+        owner_lama = self._indexed_owner.get(sesi.id_sesi)
+        if owner_lama is not None and owner_lama != sesi.owner_id:
+            self._unindex_owner(owner_lama, sesi.id_sesi)
         self._store[sesi.id_sesi] = sesi
+        self._indexed_owner[sesi.id_sesi] = sesi.owner_id
+        self._urut.simpan(sesi.id_sesi, sesi.waktu_masuk)
+
+        if sesi.owner_id is not None:
+            self._owner_index.setdefault(sesi.owner_id, {})[sesi.id_sesi] = sesi
+
+        if sesi.waktu_keluar is None:
+            self._active[sesi.id_sesi] = sesi
+        else:
+            self._active.pop(sesi.id_sesi, None)
 
     def list(self) -> List[SesiParkir]:
-        return list(self._store.values())
+        with self._kunci:
+            return [*self._arsip.list(), *self._store.values()]
+
+    def arsipkan(self, selesai_sebelum: Optional[datetime] = None) -> int:
+        """Pindahkan sesi SELESAI ke arsip kolumnar.
+
+        Hanya sesi dengan waktu_keluar < ``selesai_sebelum`` (semua bila
+        None) yang dipindah. Mengembalikan jumlah sesi yang diarsipkan.
+        """
+        with self._kunci:
+            pindah = [
+                s for s in self._store.values()
+                if s.id_sesi not in self._active
+                and ArsipSesi.dapat_diarsip(s)
+                and (selesai_sebelum is None or s.waktu_keluar < selesai_sebelum)
+            ]
+            if not pindah:
+                return 0
+            # arsip diisi lebih dulu agar get_by_id tanpa lock selalu menemukan sesinya
+            self._arsip.tambah(pindah)
+            owners = set()
+            for sesi in pindah:
+                del self._store[sesi.id_sesi]
+                owner_id = self._indexed_owner.pop(sesi.id_sesi, None)
+                if owner_id is not None:
+                    owners.add(owner_id)
+                    self._unindex_owner(owner_id, sesi.id_sesi)
+            self._urut.hapus_banyak(s.id_sesi for s in pindah)
+            # dict tidak menyusut setelah del; salin agar memorinya dilepas
+            self._store = dict(self._store)
+            self._indexed_owner = dict(self._indexed_owner)
+            for owner_id in owners:
+                if owner_id in self._owner_index:
+                    self._owner_index[owner_id] = dict(self._owner_index[owner_id])
+            return len(pindah)
+
+    def jumlah_arsip(self) -> int:
+        return len(self._arsip)
+
+    def list_halaman(
+        self,
+        setelah: Optional[Kunci] = None,
+        batas: int = 50,
+        dari: Optional[datetime] = None,
+        sampai: Optional[datetime] = None,
+        status: Optional[StatusSesi] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> Tuple[List[SesiParkir], Optional[Kunci]]:
+        """Sesi urut (waktu_masuk, id_sesi) setelah kursor ``setelah``.
+
+        ``dari``/``sampai`` membatasi waktu_masuk (sampai eksklusif); awal
+        rentang dicari dengan bisect, filter lain diterapkan sambil berjalan.
+        Sesi di memori dan di arsip digabung menurut kunci yang sama.
+        """
+        if dari is not None and (setelah is None or setelah[0] < dari):
+            setelah = (dari,)
+        status_value = status.value if status is not None else None
+
+        def muat(kunci: Kunci) -> Optional[SesiParkir]:
+            sesi = self._store.get(kunci[1])
+            if sesi is None:
+                return None
+            if owner_id is not None and sesi.owner_id != owner_id:
+                return None
+            if status_value is not None and sesi.status.value != status_value:
+                return None
+            return sesi
+
+        with self._kunci:
+            if not self._arsip.segmen or status_value not in (None, StatusSesi.SELESAI.value):
+                return self._urut.halaman(setelah, batas, muat, sampai=sampai)
+            aliran = heapq.merge(
+                self._urut.muat_setelah(setelah, muat, sampai=sampai),
+                self._arsip.setelah(setelah, sampai=sampai, owner_id=owner_id),
+                key=itemgetter(0),
+            )
+            return ambil_halaman(aliran, batas)
+
+    def kolom_analitik(
+        self, dari: Optional[datetime] = None, sampai: Optional[datetime] = None
+    ) -> KolomSesi:
+        """Sesi AKTIF dan SELESAI dengan waktu_masuk dalam [dari, sampai) sebagai kolom."""
+        batal = StatusSesi.DIBATALKAN.value
+        with self._kunci:
+            kolom = self._arsip.kolom(dari, sampai)
+            kolom.mulai_run()
+            for kunci in self._urut.setelah(None if dari is None else (dari,)):
+                if sampai is not None and kunci[0] >= sampai:
+                    break
+                sesi = self._store[kunci[1]]
+                if sesi.status.value != batal:
+                    kolom.tambah_sesi(sesi)
+        return kolom
+
+    def list_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        with self._kunci:
+            return [
+                *self._arsip.list_by_owner(owner_id),
+                *self._owner_index.get(owner_id, {}).values(),
+            ]
+
+    def list_active(self) -> List[SesiParkir]:
+        return list(self._active.values())
+
+    def list_active_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        sessions = self._owner_index.get(owner_id, {})
+        return [s for s in sessions.values() if s.id_sesi in self._active]
+
+    def list_history_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        with self._kunci:
+            sessions = self._owner_index.get(owner_id, {})
+            return [
+                *self._arsip.list_by_owner(owner_id),
+                *(s for s in sessions.values() if s.id_sesi not in self._active),
+            ]
+
+    def _unindex_owner(self, owner_id: UUID, id_sesi: UUID) -> None:
+        bucket = self._owner_index.get(owner_id)
+        if bucket is not None:
+            bucket.pop(id_sesi, None)
+            if not bucket:
+                del self._owner_index[owner_id]
@@ -0,0 +1,102 @@
+"""
+Index spasial grid untuk mencari slot terdekat dalam satu lantai.
+
+Bidang lantai dibagi menjadi sel persegi berukuran ``ukuran_sel``. Pencarian
+dimulai dari sel titik acuan lalu melebar cincin demi cincin, dan berhenti
+begitu cincin berikutnya pasti lebih jauh dari kandidat terbaik.
+"""
+import math
+from typing import Collection, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+Sel = Tuple[int, int]
+
+
+class GridSpasial:
+    def __init__(self, ukuran_sel: float = 10.0) -> None:
+        if ukuran_sel <= 0:
+            raise ValueError("ukuran_sel harus positif")
+        self.ukuran_sel = ukuran_sel
+        self._sel: Dict[Sel, Dict[UUID, Tuple[float, float]]] = {}
+        self._posisi: Dict[UUID, Sel] = {}
+        # batas sel yang pernah terisi; hanya melebar, cukup sebagai batas cincin
+        self._min: Optional[Sel] = None
+        self._max: Optional[Sel] = None
+
+    def __len__(self) -> int:
+        return len(self._posisi)
+
+    def __contains__(self, slot_id: UUID) -> bool:
+        return slot_id in self._posisi
+
+    def _sel_untuk(self, x: float, y: float) -> Sel:
+        return (math.floor(x / self.ukuran_sel), math.floor(y / self.ukuran_sel))
+
+    def tambah(self, slot_id: UUID, x: float, y: float) -> None:
+        self.hapus(slot_id)
+        sel = self._sel_untuk(x, y)
+        self._sel.setdefault(sel, {})[slot_id] = (x, y)
+        self._posisi[slot_id] = sel
+        if self._min is None:
+            self._min = self._max = sel
+        else:
+            self._min = (min(self._min[0], sel[0]), min(self._min[1], sel[1]))
+            self._max = (max(self._max[0], sel[0]), max(self._max[1], sel[1]))
+
+    def hapus(self, slot_id: UUID) -> None:
+        sel = self._posisi.pop(slot_id, None)
+        if sel is None:
+            return
+        bucket = self._sel[sel]
+        del bucket[slot_id]
+        if not bucket:
+            del self._sel[sel]
+
+    def terdekat(
+        self, x: float, y: float, kecuali: Collection[UUID] = ()
+    ) -> Optional[Tuple[UUID, float]]:
+        """(slot_id, jarak) terdekat dari (x, y), atau None bila grid kosong."""
+        if not self._sel:
+            return None
+        pusat = self._sel_untuk(x, y)
+        batas = max(
+            abs(pusat[0] - self._min[0]), abs(pusat[0] - self._max[0]),
+            abs(pusat[1] - self._min[1]), abs(pusat[1] - self._max[1]),
+        )
+        terbaik: Optional[Tuple[UUID, float]] = None
+        r = 0
+        while r <= batas:
+            # Cincin yang lebih besar dari jumlah sel berisi: periksa sel berisi saja
+            if 8 * r > len(self._sel):
+                return self._terbaik_dari(self._sel.items(), x, y, kecuali, terbaik)
+            terbaik = self._terbaik_dari(self._cincin(pusat, r), x, y, kecuali, terbaik)
+            # titik pada cincin r + 1 berjarak minimal r * ukuran_sel
+            if terbaik is not None and terbaik[1] <= r * self.ukuran_sel:
+                return terbaik
+            r += 1
+        return terbaik
+
+    def _cincin(self, pusat: Sel, r: int) -> Iterator[Tuple[Sel, Dict[UUID, Tuple[float, float]]]]:
+        cx, cy = pusat
+        if r == 0:
+            sel = self._sel.get(pusat)
+            if sel:
+                yield pusat, sel
+            return
+        for dx in range(-r, r + 1):
+            for dy in ((-r, r) if abs(dx) != r else range(-r, r + 1)):
+                key = (cx + dx, cy + dy)
+                sel = self._sel.get(key)
+                if sel:
+                    yield key, sel
+
+    @staticmethod
+    def _terbaik_dari(sel_sel, x, y, kecuali, terbaik):
+        for _, bucket in sel_sel:
+            for slot_id, (sx, sy) in bucket.items():
+                if slot_id in kecuali:
+                    continue
+                jarak = math.hypot(sx - x, sy - y)
+                if terbaik is None or jarak < terbaik[1]:
+                    terbaik = (slot_id, jarak)
+        return terbaik
@@ -1,20 +1,66 @@
 """
 Repository untuk BC Alokasi Slot
 """
-from typing import List, Optional
+import threading
+from typing import Collection, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from manajemen_parkir.domain.alokasi_slot import SlotParkir
+from manajemen_parkir.domain.alokasi_slot import Koordinat, SlotParkir, StatusSlot
+from manajemen_parkir.infrastructure.index_urut import IndexUrut, Kunci
+from manajemen_parkir.infrastructure.slot_grid import GridSpasial
+
+JUMLAH_KUNCI = 64
+
+_TANDAI = {
+    StatusSlot.TERSEDIA.value: SlotParkir.tandai_tersedia,
+    StatusSlot.TERISI.value: SlotParkir.tandai_terisi,
+    StatusSlot.RUSAK.value: SlotParkir.tandai_rusak,
+}
 
 
 class InMemorySlotParkirRepository:
-    def __init__(self):
+    def __init__(self, jumlah_kunci: int = JUMLAH_KUNCI, ukuran_sel_grid: float = 10.0):
         self._slots: dict[UUID, SlotParkir] = {}
+        # Counter okupansi dikunci dengan StatusSlot.value agar tidak
+        # bergantung pada identitas kelas enum milik slot yang disimpan.
+        self._indexed: Dict[UUID, Tuple[int, str]] = {}
+        self._counts: Dict[str, int] = {s.value: 0 for s in StatusSlot}
+        # lantai -> {slot_id: slot} dan (lantai, status) -> {slot_id: slot},
+        # keduanya urut sesuai waktu masuk ke partisi
+        self._lantai: Dict[int, Dict[UUID, SlotParkir]] = {}
+        self._partisi: Dict[Tuple[int, str], Dict[UUID, SlotParkir]] = {}
+        # Perubahan status lewat ubah_status_jika dikunci per slot (striped),
+        # sedangkan index dan counter di atas dijaga satu lock yang singkat
+        self._kunci_slot = [threading.Lock() for _ in range(jumlah_kunci)]
+        self._kunci_index = threading.Lock()
+        # lantai -> grid posisi slot TERSEDIA, untuk alokasi slot terdekat
+        self.ukuran_sel_grid = ukuran_sel_grid
+        self._grid: Dict[int, GridSpasial] = {}
+        self._posisi_grid: Dict[UUID, Tuple[int, float, float]] = {}
+        # (created_at, slot_id) terurut, untuk paginasi kursor
+        self._urut = IndexUrut()
     
     def save(self, slot: SlotParkir) -> SlotParkir:
-        self._slots[slot.id] = slot
+        with self._kunci_index:
+            self._simpan(slot)
         return slot
     
+    def save_many(self, slots: List[SlotParkir]) -> List[SlotParkir]:
+        """Simpan banyak slot dengan satu kali mengambil lock index."""
+        with self._kunci_index:
+            for slot in slots:
+                self._simpan(slot)
+        return slots
+    
+    def _simpan(self, slot: SlotParkir) -> None:
+        lama = self._slots.get(slot.id)
+        if lama is not None and lama is not slot and lama._pengamat == self._status_berubah:
+            # instance lama tidak lagi mewakili slot ini di repository
+            lama._pengamat = None
+        self._slots[slot.id] = slot
+        slot._pengamat = self._status_berubah
+        self._reindex(slot)
+    
     def get_by_id(self, slot_id: UUID) -> Optional[SlotParkir]:
         return self._slots.get(slot_id)
     
@@ -26,29 +72,187 @@ class InMemorySlotParkirRepository:
         return list(self._slots.values())
     
     def list_by_lantai(self, lantai: int) -> List[SlotParkir]:
-        return [slot for slot in self._slots.values() if slot.koordinat.lantai == lantai]
+        return list(self._lantai.get(lantai, {}).values())
+    
+    def lantai_per_slot(self) -> Dict[UUID, int]:
+        """slot_id -> lantai, langsung dari index lantai."""
+        with self._kunci_index:
+            return {slot_id: lantai for lantai, slots in self._lantai.items() for slot_id in slots}
+    
+    def list_by_status(self, status: StatusSlot, lantai: Optional[int] = None) -> List[SlotParkir]:
+        if lantai is not None:
+            return list(self._partisi.get((lantai, status.value), {}).values())
+        result: List[SlotParkir] = []
+        with self._kunci_index:
+            for lt in self._lantai:
+                result.extend(self._partisi.get((lt, status.value), {}).values())
+        return result
+    
+    def list_tersedia(self, lantai: Optional[int] = None) -> List[SlotParkir]:
+        return self.list_by_status(StatusSlot.TERSEDIA, lantai)
+    
+    def list_halaman(
+        self,
+        setelah: Optional[Kunci] = None,
+        batas: int = 50,
+        lantai: Optional[int] = None,
+        status: Optional[StatusSlot] = None,
+    ) -> Tuple[List[SlotParkir], Optional[Kunci]]:
+        """Slot urut (created_at, id) setelah kursor ``setelah``.
+        
+        Filter lantai/status diterapkan sambil berjalan dari posisi kursor.
+        """
+        def muat(kunci: Kunci) -> Optional[SlotParkir]:
+            slot_id = kunci[1]
+            slot = self._slots.get(slot_id)
+            if slot is None:
+                return None
+            lt, st = self._indexed[slot_id]
+            if lantai is not None and lt != lantai:
+                return None
+            if status is not None and st != status.value:
+                return None
+            return slot
+        
+        with self._kunci_index:
+            return self._urut.halaman(setelah, batas, muat)
+    
+    def cari_tersedia_terdekat(
+        self, koordinat: Koordinat, kecuali: Collection[UUID] = ()
+    ) -> Optional[SlotParkir]:
+        """Slot TERSEDIA terdekat dari ``koordinat``.
+        
+        Lantai yang sama didahulukan, lalu lantai dengan selisih terkecil.
+        Slot hanya dipilih, belum direservasi.
+        """
+        with self._kunci_index:
+            for lantai in sorted(self._grid, key=lambda lt: (abs(lt - koordinat.lantai), lt)):
+                hasil = self._grid[lantai].terdekat(koordinat.posisi_x, koordinat.posisi_y, kecuali)
+                if hasil is not None:
+                    return self._slots[hasil[0]]
+        return None
     
-    def list_tersedia(self) -> List[SlotParkir]:
-        return [slot for slot in self._slots.values() if slot.is_tersedia()]
+    def ubah_status_jika(
+        self, slot_id: UUID, diharapkan: StatusSlot, baru: StatusSlot
+    ) -> Optional[SlotParkir]:
+        """Compare-and-set status slot.
+        
+        Status diganti ke ``baru`` hanya bila saat ini ``diharapkan``.
+        Mengembalikan slot yang sudah diubah, atau None bila slot tidak ada
+        atau statusnya berbeda.
+        """
+        with self._kunci_untuk(slot_id):
+            slot = self._slots.get(slot_id)
+            if slot is None or slot.status_ketersediaan.status.value != diharapkan.value:
+                return None
+            _TANDAI[baru.value](slot)
+            return slot
+    
+    def reservasi(self, slot_id: UUID) -> Optional[SlotParkir]:
+        """Ubah slot TERSEDIA menjadi TERISI; None bila tidak tersedia."""
+        return self.ubah_status_jika(slot_id, StatusSlot.TERSEDIA, StatusSlot.TERISI)
+    
+    def lepas(self, slot_id: UUID) -> Optional[SlotParkir]:
+        """Ubah slot TERISI menjadi TERSEDIA; None bila slot tidak sedang terisi."""
+        return self.ubah_status_jika(slot_id, StatusSlot.TERISI, StatusSlot.TERSEDIA)
     
     def delete(self, slot_id: UUID) -> bool:
-        if slot_id in self._slots:
-            del self._slots[slot_id]
-            return True
-        return False
+        with self._kunci_index:
+            slot = self._slots.pop(slot_id, None)
+            if slot is None:
+                return False
+            if slot._pengamat == self._status_berubah:
+                slot._pengamat = None
+            self._unindex(slot_id)
+        return True
     
     def count_total(self) -> int:
         return len(self._slots)
     
+    def count_by_status(self, status: StatusSlot) -> int:
+        return self._counts.get(status.value, 0)
+    
     def count_tersedia(self) -> int:
-        return len(self.list_tersedia())
+        return self._counts[StatusSlot.TERSEDIA.value]
     
     def count_terisi(self) -> int:
-        from manajemen_parkir.domain.alokasi_slot import StatusSlot
-        return len([slot for slot in self._slots.values() 
-                   if slot.status_ketersediaan.status == StatusSlot.TERISI])
+        return self._counts[StatusSlot.TERISI.value]
     
     def count_rusak(self) -> int:
-        from manajemen_parkir.domain.alokasi_slot import StatusSlot
-        return len([slot for slot in self._slots.values() 
-                   if slot.status_ketersediaan.status == StatusSlot.RUSAK])
+        return self._counts[StatusSlot.RUSAK.value]
+    
+    def count_per_lantai(self) -> Dict[int, Dict[str, int]]:
+        """Counter per lantai: {lantai: {"total": n, "TERSEDIA": n, ...}}"""
+        with self._kunci_index:
+            return {
+                lantai: {
+                    "total": len(slots),
+                    **{s.value: len(self._partisi.get((lantai, s.value), ())) for s in StatusSlot},
+                }
+                for lantai, slots in self._lantai.items()
+            }
+    
+    def _kunci_untuk(self, slot_id: UUID) -> threading.Lock:
+        return self._kunci_slot[hash(slot_id) % len(self._kunci_slot)]
+    
+    def _status_berubah(self, slot: SlotParkir, status_lama: StatusSlot) -> None:
+        with self._kunci_index:
+            if self._slots.get(slot.id) is slot:
+                self._reindex(slot)
+    
+    def _reindex(self, slot: SlotParkir) -> None:
+        self._reindex_grid(slot)
+        self._urut.simpan(slot.id, slot.created_at)
+        key = (slot.koordinat.lantai, slot.status_ketersediaan.status.value)
+        lama = self._indexed.get(slot.id)
+        if lama == key:
+            # instance bisa berganti walau lantai dan status tetap
+            self._lantai[key[0]][slot.id] = slot
+            self._partisi[key][slot.id] = slot
+            return
+        if lama is not None:
+            self._counts[lama[1]] -= 1
+            _buang(self._partisi, lama, slot.id)
+            if lama[0] != key[0]:
+                _buang(self._lantai, lama[0], slot.id)
+        self._indexed[slot.id] = key
+        self._counts[key[1]] = self._counts.get(key[1], 0) + 1
+        self._lantai.setdefault(key[0], {})[slot.id] = slot
+        self._partisi.setdefault(key, {})[slot.id] = slot
+    
+    def _reindex_grid(self, slot: SlotParkir) -> None:
+        posisi = None
+        if slot.status_ketersediaan.status.value == StatusSlot.TERSEDIA.value:
+            k = slot.koordinat
+            posisi = (k.lantai, k.posisi_x, k.posisi_y)
+        lama = self._posisi_grid.get(slot.id)
+        if lama == posisi:
+            return
+        if lama is not None:
+            self._grid[lama[0]].hapus(slot.id)
+            del self._posisi_grid[slot.id]
+        if posisi is not None:
+            grid = self._grid.get(posisi[0])
+            if grid is None:
+                grid = self._grid[posisi[0]] = GridSpasial(self.ukuran_sel_grid)
+            grid.tambah(slot.id, posisi[1], posisi[2])
+            self._posisi_grid[slot.id] = posisi
+    
+    def _unindex(self, slot_id: UUID) -> None:
+        self._urut.hapus(slot_id)
+        lama = self._posisi_grid.pop(slot_id, None)
+        if lama is not None:
+            self._grid[lama[0]].hapus(slot_id)
+        key = self._indexed.pop(slot_id, None)
+        if key is None:
+            return
+        self._counts[key[1]] -= 1
+        _buang(self._lantai, key[0], slot_id)
+        _buang(self._partisi, key, slot_id)
+
+
+def _buang(index: dict, key, slot_id: UUID) -> None:
+    bucket = index[key]
+    del bucket[slot_id]
+    if not bucket:
+        del index[key]
@@ -0,0 +1,985 @@
+"""
+Repository berbasis SQLite untuk semua BC.
+
+Antarmukanya sama dengan versi InMemory sehingga bisa dipilih lewat
+konfigurasi. Database memakai journal WAL sehingga pembaca tidak
+memblokir penulis, dan koneksi dipinjam dari pool kecil agar handler
+sync di threadpool FastAPI tidak berbagi satu koneksi.
+"""
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time
+from decimal import Decimal
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from manajemen_parkir.domain.alokasi_slot import (
+    Koordinat, Sensor, SlotParkir, StatusKetersediaan, StatusSlot, TipeSensor,
+)
+from manajemen_parkir.domain.auth import Akun, Kredensial, Peran, TokenAkses
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from manajemen_parkir.domain.tariff import JendelaTarif, JenisTarif, TarifParkir, TipeKendaraan
+from manajemen_parkir.domain.user import MetodePembayaran, User, Vehicle
+from manajemen_parkir.domain.value_objects import BiayaFinal, Durasi, NomorPlat
+from manajemen_parkir.infrastructure.arsip_sesi import KOSONG, KolomSesi
+from manajemen_parkir.infrastructure.index_urut import Kunci
+from manajemen_parkir.infrastructure.user_repository import normalisasi_plat
+
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS akun (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    peran TEXT NOT NULL,
+    email TEXT,
+    created_at TEXT NOT NULL,
+    is_active INTEGER NOT NULL,
+    token TEXT,
+    token_expires_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    akun_id TEXT,
+    email TEXT,
+    metode_pembayaran TEXT NOT NULL DEFAULT '[]'
+);
+
+CREATE TABLE IF NOT EXISTS vehicles (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    urutan INTEGER NOT NULL,
+    kode TEXT NOT NULL,
+    tipe_kendaraan TEXT,
+    tahun INTEGER,
+    warna TEXT,
+    plate TEXT,
+    plate_norm TEXT,
+    vehicle_type TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_vehicles_user ON vehicles(user_id, urutan);
+CREATE INDEX IF NOT EXISTS ix_vehicles_plate ON vehicles(plate_norm);
+
+CREATE TABLE IF NOT EXISTS slots (
+    id TEXT PRIMARY KEY,
+    lantai INTEGER NOT NULL,
+    posisi_x REAL NOT NULL,
+    posisi_y REAL NOT NULL,
+    kapasitas INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    waktu_update TEXT NOT NULL,
+    sensor_id TEXT,
+    sensor_tipe TEXT,
+    sensor_kondisi TEXT,
+    sensor_aktif INTEGER,
+    sensor_created_at TEXT,
+    keterangan TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_slots_lantai_status ON slots(lantai, status);
+CREATE INDEX IF NOT EXISTS ix_slots_status ON slots(status);
+CREATE INDEX IF NOT EXISTS ix_slots_urut ON slots(created_at, id);
+
+CREATE TABLE IF NOT EXISTS sesi (
+    id TEXT PRIMARY KEY,
+    kode_plat TEXT NOT NULL,
+    tipe_kendaraan TEXT,
+    waktu_masuk TEXT NOT NULL,
+    waktu_keluar TEXT,
+    status TEXT NOT NULL,
+    durasi_menit INTEGER,
+    biaya TEXT,
+    mata_uang TEXT,
+    owner_id TEXT,
+    vehicle_id TEXT,
+    slot_id TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_sesi_owner ON sesi(owner_id);
+CREATE INDEX IF NOT EXISTS ix_sesi_aktif ON sesi(owner_id) WHERE waktu_keluar IS NULL;
+CREATE INDEX IF NOT EXISTS ix_sesi_urut ON sesi(waktu_masuk, id);
+
+CREATE TABLE IF NOT EXISTS tarif (
+    id TEXT PRIMARY KEY,
+    nama TEXT NOT NULL,
+    jenis_tarif TEXT NOT NULL,
+    tipe_kendaraan TEXT NOT NULL,
+    harga_per_jam TEXT NOT NULL,
+    harga_maksimum_harian TEXT,
+    jendela TEXT NOT NULL DEFAULT '[]',
+    selisih_utc_menit INTEGER NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tarif_aktif ON tarif(tipe_kendaraan, jenis_tarif, updated_at)
+    WHERE is_active = 1;
+
+CREATE TABLE IF NOT EXISTS tarif_versi (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versi INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO tarif_versi (id, versi) VALUES (1, 0);
+"""
+
+
+# Teks ISO (detik dan pecahan opsional) -> mikrodetik sejak epoch, tanpa parsing di Python
+_MIKRO_SQL = (
+    "CAST(strftime('%s', {kolom}) AS INTEGER) * 1000000"
+    " + CAST(substr({kolom} || '.000000', 21, 6) AS INTEGER)"
+)
+
+
+def _iso(waktu: Optional[datetime]) -> Optional[str]:
+    return waktu.isoformat() if waktu is not None else None
+
+
+def _dt(nilai: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(nilai) if nilai is not None else None
+
+
+def _uuid(nilai: Optional[str]) -> Optional[UUID]:
+    return UUID(nilai) if nilai is not None else None
+
+
+def _str(nilai) -> Optional[str]:
+    return str(nilai) if nilai is not None else None
+
+
+def _halaman(rows: List[sqlite3.Row], batas: int, kunci) -> Tuple[List[sqlite3.Row], Optional[Kunci]]:
+    """Potong hasil ``LIMIT batas + 1`` menjadi (rows, kursor berikutnya)."""
+    if len(rows) <= batas:
+        return rows, None
+    rows = rows[:batas]
+    return rows, kunci(rows[-1])
+
+
+class SQLiteDatabase:
+    """Pool koneksi ke satu file SQLite dengan journal WAL."""
+
+    def __init__(self, path: str, pool_size: int = 4, busy_timeout_ms: int = 5000) -> None:
+        if path == ":memory:":
+            raise ValueError("SQLiteDatabase membutuhkan file; gunakan repository InMemory untuk :memory:")
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._semua: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        with self.koneksi() as conn:
+            conn.executescript(SKEMA)
+
+    def _buka(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def koneksi(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._semua) < self.pool_size:
+                    conn = self._buka()
+                    self._semua.append(conn)
+                else:
+                    conn = None
+            if conn is None:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaksi(self) -> Iterator[sqlite3.Connection]:
+        """Transaksi tulis; BEGIN IMMEDIATE mengambil write lock di awal."""
+        with self.koneksi() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._semua:
+                conn.close()
+            self._semua.clear()
+        self._pool = queue.Queue()
+
+
+class SQLiteAuthRepository:
+    _UPSERT = """
+        INSERT INTO akun (id, username, password_hash, peran, email, created_at,
+                          is_active, token, token_expires_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            username = excluded.username,
+            password_hash = excluded.password_hash,
+            peran = excluded.peran,
+            email = excluded.email,
+            is_active = excluded.is_active,
+            token = excluded.token,
+            token_expires_at = excluded.token_expires_at
+    """
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    def save(self, akun: Akun) -> None:
+        token = akun.current_token
+        with self.db.transaksi() as conn:
+            conn.execute(self._UPSERT, (
+                str(akun.id),
+                akun.kredensial.username,
+                akun.kredensial.password_hash,
+                akun.peran.value,
+                akun.email,
+                _iso(akun.created_at),
+                int(akun.is_active),
+                token.token if token else None,
+                _iso(token.expires_at) if token else None,
+            ))
+
+    def get_by_id(self, akun_id: UUID) -> Optional[Akun]:
+        return self._satu("SELECT * FROM akun WHERE id = ?", (str(akun_id),))
+
+    def get_by_username(self, username: str) -> Optional[Akun]:
+        return self._satu("SELECT * FROM akun WHERE username = ?", (username,))
+
+    def list(self) -> List[Akun]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute("SELECT * FROM akun ORDER BY rowid").fetchall()
+        return [self._ke_akun(row) for row in rows]
+
+    def delete(self, akun_id: UUID) -> bool:
+        with self.db.transaksi() as conn:
+            cur = conn.execute("DELETE FROM akun WHERE id = ?", (str(akun_id),))
+        return cur.rowcount > 0
+
+    def username_exists(self, username: str) -> bool:
+        with self.db.koneksi() as conn:
+            row = conn.execute("SELECT 1 FROM akun WHERE username = ?", (username,)).fetchone()
+        return row is not None
+
+    def _satu(self, sql: str, params: tuple) -> Optional[Akun]:
+        with self.db.koneksi() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return self._ke_akun(row) if row is not None else None
+
+    @staticmethod
+    def _ke_akun(row: sqlite3.Row) -> Akun:
+        token = None
+        if row["token"] is not None:
+            token = TokenAkses(token=row["token"], expires_at=_dt(row["token_expires_at"]))
+        return Akun(
+            kredensial=Kredensial(username=row["username"], password_hash=row["password_hash"]),
+            peran=Peran(row["peran"]),
+            id=UUID(row["id"]),
+            email=row["email"],
+            created_at=_dt(row["created_at"]),
+            is_active=bool(row["is_active"]),
+            current_token=token,
+        )
+
+
+class SQLiteUserRepository:
+    # jumlah user id per "WHERE user_id IN (...)" saat memuat kendaraan
+    _IN_PER_QUERY = 500
+
+    _UPSERT_USER = """
+        INSERT INTO users (id, name, akun_id, email, metode_pembayaran)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name,
+            akun_id = excluded.akun_id,
+            email = excluded.email,
+            metode_pembayaran = excluded.metode_pembayaran
+    """
+    _INSERT_VEHICLE = """
+        INSERT INTO vehicles (id, user_id, urutan, kode, tipe_kendaraan, tahun, warna,
+                              plate, plate_norm, vehicle_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    def save(self, user: User) -> None:
+        metode = json.dumps([
+            {
+                "id": str(m.id),
+                "tipe": m.tipe,
+                "token_eksternal": m.token_eksternal,
+                "nama_penyedia": m.nama_penyedia,
+                "is_default": m.is_default,
+                "is_active": m.is_active,
+            }
+            for m in user.metode_pembayaran
+        ])
+        with self.db.transaksi() as conn:
+            conn.execute(self._UPSERT_USER, (
+                str(user.id), user.name, _str(user.akun_id), user.email, metode,
+            ))
+            conn.execute("DELETE FROM vehicles WHERE user_id = ?", (str(user.id),))
+            conn.executemany(self._INSERT_VEHICLE, [
+                (
+                    str(v.id), str(user.id), urutan,
+                    v.nomor_plat.kode, v.nomor_plat.tipe_kendaraan, v.tahun, v.warna,
+                    v.plate, normalisasi_plat(v.plate) if v.plate else None, v.vehicle_type,
+                )
+                for urutan, v in enumerate(user.vehicles)
+            ])
+
+    def get_by_id(self, user_id: UUID) -> Optional[User]:
+        with self.db.koneksi() as conn:
+            row = conn.execute("SELECT * FROM users WHERE id = ?", (str(user_id),)).fetchone()
+            if row is None:
+                return None
+            return self._muat(conn, [row])[0]
+
+    def find_by_id(self, user_id: UUID) -> Optional[User]:
+        return self.get_by_id(user_id)
+
+    def find_by_plate(self, plate: str) -> Optional[Vehicle]:
+        with self.db.koneksi() as conn:
+            row = conn.execute(
+                "SELECT * FROM vehicles WHERE plate_norm = ? ORDER BY rowid LIMIT 1",
+                (normalisasi_plat(plate),),
+            ).fetchone()
+        return self._ke_vehicle(row) if row is not None else None
+
+    def find_by_vehicle_id(self, vehicle_id: UUID) -> Optional[Tuple[User, Vehicle]]:
+        with self.db.koneksi() as conn:
+            row = conn.execute(
+                "SELECT user_id FROM vehicles WHERE id = ?", (str(vehicle_id),)
+            ).fetchone()
+            if row is None:
+                return None
+            user_row = conn.execute("SELECT * FROM users WHERE id = ?", (row["user_id"],)).fetchone()
+            user = self._muat(conn, [user_row])[0]
+        vehicle = next(v for v in user.vehicles if v.id == vehicle_id)
+        return user, vehicle
+
+    def list(self) -> List[User]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute("SELECT * FROM users ORDER BY rowid").fetchall()
+            return self._muat(conn, rows)
+
+    def list_halaman(
+        self, setelah: Optional[Kunci] = None, batas: int = 50
+    ) -> Tuple[List[User], Optional[Kunci]]:
+        # rowid tidak berubah saat upsert, jadi sama dengan urutan simpan pertama
+        with self.db.koneksi() as conn:
+            rows = conn.execute(
+                "SELECT rowid, * FROM users WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (setelah[0] if setelah else 0, batas + 1),
+            ).fetchall()
+            rows, berikut = _halaman(rows, batas, lambda r: (r["rowid"], r["id"]))
+            return self._muat(conn, rows), berikut
+
+    def delete(self, user_id: UUID) -> bool:
+        with self.db.transaksi() as conn:
+            cur = conn.execute("DELETE FROM users WHERE id = ?", (str(user_id),))
+        return cur.rowcount > 0
+
+    def _muat(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[User]:
+        users: Dict[str, User] = {}
+        for row in rows:
+            users[row["id"]] = User(
+                id=UUID(row["id"]),
+                name=row["name"],
+                akun_id=_uuid(row["akun_id"]),
+                email=row["email"],
+                metode_pembayaran=[
+                    MetodePembayaran(
+                        id=UUID(m["id"]),
+                        tipe=m["tipe"],
+                        token_eksternal=m["token_eksternal"],
+                        nama_penyedia=m["nama_penyedia"],
+                        is_default=m["is_default"],
+                        is_active=m["is_active"],
+                    )
+                    for m in json.loads(row["metode_pembayaran"])
+                ],
+            )
+        if not users:
+            return []
+        # hanya kendaraan milik user di halaman ini, lewat ix_vehicles_user;
+        # dipecah agar jumlah parameter tetap di bawah batas SQLite
+        user_ids = list(users)
+        for i in range(0, len(user_ids), self._IN_PER_QUERY):
+            potongan = user_ids[i:i + self._IN_PER_QUERY]
+            vehicle_rows = conn.execute(
+                f"SELECT * FROM vehicles WHERE user_id IN ({', '.join('?' * len(potongan))}) "
+                "ORDER BY user_id, urutan",
+                potongan,
+            ).fetchall()
+            for vrow in vehicle_rows:
+                users[vrow["user_id"]].vehicles.append(self._ke_vehicle(vrow))
+        return list(users.values())
+
+    @staticmethod
+    def _ke_vehicle(row: sqlite3.Row) -> Vehicle:
+        return Vehicle(
+            id=UUID(row["id"]),
+            nomor_plat=NomorPlat(kode=row["kode"], tipe_kendaraan=row["tipe_kendaraan"]),
+            tahun=row["tahun"],
+            warna=row["warna"],
+            plate=row["plate"],
+            vehicle_type=row["vehicle_type"],
+        )
+
+
+class SQLiteSlotParkirRepository:
+    _UPSERT = """
+        INSERT INTO slots (id, lantai, posisi_x, posisi_y, kapasitas, status, waktu_update,
+                           sensor_id, sensor_tipe, sensor_kondisi, sensor_aktif, sensor_created_at,
+                           keterangan, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            lantai = excluded.lantai,
+            posisi_x = excluded.posisi_x,
+            posisi_y = excluded.posisi_y,
+            kapasitas = excluded.kapasitas,
+            status = excluded.status,
+            waktu_update = excluded.waktu_update,
+            sensor_id = excluded.sensor_id,
+            sensor_tipe = excluded.sensor_tipe,
+            sensor_kondisi = excluded.sensor_kondisi,
+            sensor_aktif = excluded.sensor_aktif,
+            sensor_created_at = excluded.sensor_created_at,
+            keterangan = excluded.keterangan,
+            updated_at = excluded.updated_at
+    """
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    @staticmethod
+    def _ke_params(slot: SlotParkir) -> tuple:
+        sensor = slot.sensor
+        return (
+            str(slot.id),
+            slot.koordinat.lantai,
+            slot.koordinat.posisi_x,
+            slot.koordinat.posisi_y,
+            slot.kapasitas,
+            slot.status_ketersediaan.status.value,
+            _iso(slot.status_ketersediaan.waktu_update),
+            str(sensor.id) if sensor else None,
+            sensor.tipe.value if sensor else None,
+            sensor.kondisi if sensor else None,
+            int(sensor.is_active) if sensor else None,
+            _iso(sensor.created_at) if sensor else None,
+            slot.keterangan,
+            _iso(slot.created_at),
+            _iso(slot.updated_at),
+        )
+
+    def save(self, slot: SlotParkir) -> SlotParkir:
+        with self.db.transaksi() as conn:
+            conn.execute(self._UPSERT, self._ke_params(slot))
+        return slot
+
+    def save_many(self, slots: List[SlotParkir]) -> List[SlotParkir]:
+        """Simpan banyak slot dalam satu transaksi."""
+        with self.db.transaksi() as conn:
+            conn.executemany(self._UPSERT, [self._ke_params(slot) for slot in slots])
+        return slots
+
+    def get_by_id(self, slot_id: UUID) -> Optional[SlotParkir]:
+        rows = self._query("SELECT * FROM slots WHERE id = ?", (str(slot_id),))
+        return rows[0] if rows else None
+
+    def find_by_id(self, slot_id: UUID) -> Optional[SlotParkir]:
+        """Alias for get_by_id for compatibility"""
+        return self.get_by_id(slot_id)
+
+    def list_all(self) -> List[SlotParkir]:
+        return self._query("SELECT * FROM slots ORDER BY rowid", ())
+
+    def list_by_lantai(self, lantai: int) -> List[SlotParkir]:
+        return self._query("SELECT * FROM slots WHERE lantai = ? ORDER BY rowid", (lantai,))
+
+    def lantai_per_slot(self) -> Dict[UUID, int]:
+        """slot_id -> lantai tanpa membangun objek SlotParkir."""
+        with self.db.koneksi() as conn:
+            rows = conn.execute("SELECT id, lantai FROM slots").fetchall()
+        return {UUID(slot_id): lantai for slot_id, lantai in rows}
+
+    def list_by_status(self, status: StatusSlot, lantai: Optional[int] = None) -> List[SlotParkir]:
+        if lantai is not None:
+            return self._query(
+                "SELECT * FROM slots WHERE lantai = ? AND status = ? ORDER BY rowid",
+                (lantai, status.value),
+            )
+        return self._query("SELECT * FROM slots WHERE status = ? ORDER BY rowid", (status.value,))
+
+    def list_tersedia(self, lantai: Optional[int] = None) -> List[SlotParkir]:
+        return self.list_by_status(StatusSlot.TERSEDIA, lantai)
+
+    def list_halaman(
+        self,
+        setelah: Optional[Kunci] = None,
+        batas: int = 50,
+        lantai: Optional[int] = None,
+        status: Optional[StatusSlot] = None,
+    ) -> Tuple[List[SlotParkir], Optional[Kunci]]:
+        syarat, params = [], []
+        if lantai is not None:
+            syarat.append("lantai = ?")
+            params.append(lantai)
+        if status is not None:
+            syarat.append("status = ?")
+            params.append(status.value)
+        if setelah is not None:
+            syarat.append("(created_at, id) > (?, ?)")
+            params += [_iso(setelah[0]), setelah[1]]
+        where = f" WHERE {' AND '.join(syarat)}" if syarat else ""
+        with self.db.koneksi() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM slots{where} ORDER BY created_at, id LIMIT ?", (*params, batas + 1)
+            ).fetchall()
+        rows, berikut = _halaman(rows, batas, lambda r: (_dt(r["created_at"]), r["id"]))
+        return [self._ke_slot(row) for row in rows], berikut
+
+    def cari_tersedia_terdekat(
+        self, koordinat: Koordinat, kecuali: Collection[UUID] = ()
+    ) -> Optional[SlotParkir]:
+        """Slot TERSEDIA terdekat: lantai yang sama dulu, lalu lantai terdekat.
+
+        Pemindaian memakai index status; tidak ada index spasial di SQLite.
+        """
+        tanda = ", ".join("?" * len(kecuali))
+        sql = (
+            "SELECT * FROM slots WHERE status = ?"
+            + (f" AND id NOT IN ({tanda})" if kecuali else "")
+            + " ORDER BY ABS(lantai - ?), lantai,"
+            " (posisi_x - ?) * (posisi_x - ?) + (posisi_y - ?) * (posisi_y - ?) LIMIT 1"
+        )
+        x, y = koordinat.posisi_x, koordinat.posisi_y
+        rows = self._query(sql, (
+            StatusSlot.TERSEDIA.value, *(str(i) for i in kecuali), koordinat.lantai, x, x, y, y,
+        ))
+        return rows[0] if rows else None
+
+    def ubah_status_jika(
+        self, slot_id: UUID, diharapkan: StatusSlot, baru: StatusSlot
+    ) -> Optional[SlotParkir]:
+        """Compare-and-set status slot dalam satu UPDATE bersyarat.
+
+        Karena write lock dipegang database, dua worker yang merebut slot
+        yang sama tidak mungkin keduanya berhasil. Mengembalikan None bila
+        slot tidak ada atau statusnya bukan ``diharapkan``.
+        """
+        return self._ubah_status(
+            "UPDATE slots SET status = ?, waktu_update = ?, updated_at = ? "
+            "WHERE id = ? AND status = ? RETURNING *",
+            baru, slot_id, diharapkan.value,
+        )
+
+    def reservasi(self, slot_id: UUID) -> Optional[SlotParkir]:
+        """Ubah slot TERSEDIA menjadi TERISI; None bila tidak tersedia."""
+        return self.ubah_status_jika(slot_id, StatusSlot.TERSEDIA, StatusSlot.TERISI)
+
+    def lepas(self, slot_id: UUID) -> Optional[SlotParkir]:
+        """Ubah slot TERISI menjadi TERSEDIA; None bila slot tidak sedang terisi."""
+        return self.ubah_status_jika(slot_id, StatusSlot.TERISI, StatusSlot.TERSEDIA)
+
+    def _ubah_status(self, sql: str, status: StatusSlot, slot_id: UUID, *syarat) -> Optional[SlotParkir]:
+        sekarang = _iso(datetime.now())
+        with self.db.transaksi() as conn:
+            row = conn.execute(sql, (status.value, sekarang, sekarang, str(slot_id), *syarat)).fetchone()
+        return self._ke_slot(row) if row is not None else None
+
+    def delete(self, slot_id: UUID) -> bool:
+        with self.db.transaksi() as conn:
+            cur = conn.execute("DELETE FROM slots WHERE id = ?", (str(slot_id),))
+        return cur.rowcount > 0
+
+    def count_total(self) -> int:
+        return self._scalar("SELECT COUNT(*) FROM slots", ())
+
+    def count_by_status(self, status: StatusSlot) -> int:
+        return self._scalar("SELECT COUNT(*) FROM slots WHERE status = ?", (status.value,))
+
+    def count_tersedia(self) -> int:
+        return self.count_by_status(StatusSlot.TERSEDIA)
+
+    def count_terisi(self) -> int:
+        return self.count_by_status(StatusSlot.TERISI)
+
+    def count_rusak(self) -> int:
+        return self.count_by_status(StatusSlot.RUSAK)
+
+    def count_per_lantai(self) -> Dict[int, Dict[str, int]]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute(
+                "SELECT lantai, status, COUNT(*) AS n FROM slots "
+                "GROUP BY lantai, status ORDER BY MIN(rowid)"
+            ).fetchall()
+        hasil: Dict[int, Dict[str, int]] = {}
+        for row in rows:
+            counts = hasil.setdefault(row["lantai"], {"total": 0, **{s.value: 0 for s in StatusSlot}})
+            counts[row["status"]] = row["n"]
+            counts["total"] += row["n"]
+        return hasil
+
+    def _scalar(self, sql: str, params: tuple) -> int:
+        with self.db.koneksi() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def _query(self, sql: str, params: tuple) -> List[SlotParkir]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._ke_slot(row) for row in rows]
+
+    @staticmethod
+    def _ke_slot(row: sqlite3.Row) -> SlotParkir:
+        sensor = None
+        if row["sensor_id"] is not None:
+            sensor = Sensor(
+                id=UUID(row["sensor_id"]),
+                tipe=TipeSensor(row["sensor_tipe"]),
+                kondisi=row["sensor_kondisi"],
+                is_active=bool(row["sensor_aktif"]),
+                created_at=_dt(row["sensor_created_at"]),
+            )
+        return SlotParkir(
+            id=UUID(row["id"]),
+            kapasitas=row["kapasitas"],
+            koordinat=Koordinat(lantai=row["lantai"], posisi_x=row["posisi_x"], posisi_y=row["posisi_y"]),
+            status_ketersediaan=StatusKetersediaan(
+                status=StatusSlot(row["status"]), waktu_update=_dt(row["waktu_update"])
+            ),
+            sensor=sensor,
+            keterangan=row["keterangan"],
+            created_at=_dt(row["created_at"]),
+            updated_at=_dt(row["updated_at"]),
+        )
+
+
+class SQLiteSesiParkirRepository:
+    _UPSERT = """
+        INSERT INTO sesi (id, kode_plat, tipe_kendaraan, waktu_masuk, waktu_keluar, status,
+                          durasi_menit, biaya, mata_uang, owner_id, vehicle_id, slot_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            kode_plat = excluded.kode_plat,
+            tipe_kendaraan = excluded.tipe_kendaraan,
+            waktu_masuk = excluded.waktu_masuk,
+            waktu_keluar = excluded.waktu_keluar,
+            status = excluded.status,
+            durasi_menit = excluded.durasi_menit,
+            biaya = excluded.biaya,
+            mata_uang = excluded.mata_uang,
+            owner_id = excluded.owner_id,
+            vehicle_id = excluded.vehicle_id,
+            slot_id = excluded.slot_id
+    """
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    def get_by_id(self, id_sesi: UUID) -> Optional[SesiParkir]:
+        rows = self._query("SELECT * FROM sesi WHERE id = ?", (str(id_sesi),))
+        return rows[0] if rows else None
+
+    def save(self, sesi: SesiParkir) -> None:
+        biaya = sesi.biaya_final
+        with self.db.transaksi() as conn:
+            conn.execute(self._UPSERT, (
+                str(sesi.id_sesi),
+                sesi.nomor_plat.kode,
+                sesi.nomor_plat.tipe_kendaraan,
+                _iso(sesi.waktu_masuk),
+                _iso(sesi.waktu_keluar),
+                sesi.status.value,
+                sesi.durasi.total_menit if sesi.durasi else None,
+                str(biaya.jumlah) if biaya else None,
+                biaya.mata_uang if biaya else None,
+                _str(sesi.owner_id),
+                _str(sesi.vehicle_id),
+                _str(sesi.slot_id),
+            ))
+
+    def selesaikan(self, sesi: SesiParkir) -> bool:
+        """Simpan hasil check-out hanya bila sesi masih AKTIF di database.
+
+        Dua worker yang meng-check-out sesi yang sama tidak mungkin keduanya
+        berhasil; yang kalah mendapat False dan tidak boleh melepas slot.
+        """
+        biaya = sesi.biaya_final
+        with self.db.transaksi() as conn:
+            cur = conn.execute(
+                "UPDATE sesi SET waktu_keluar = ?, status = ?, durasi_menit = ?, biaya = ?, mata_uang = ? "
+                "WHERE id = ? AND status = ?",
+                (
+                    _iso(sesi.waktu_keluar),
+                    sesi.status.value,
+                    sesi.durasi.total_menit if sesi.durasi else None,
+                    str(biaya.jumlah) if biaya else None,
+                    biaya.mata_uang if biaya else None,
+                    str(sesi.id_sesi),
+                    StatusSesi.AKTIF.value,
+                ),
+            )
+        return cur.rowcount > 0
+
+    def list(self) -> List[SesiParkir]:
+        return self._query("SELECT * FROM sesi ORDER BY rowid", ())
+
+    def list_halaman(
+        self,
+        setelah: Optional[Kunci] = None,
+        batas: int = 50,
+        dari: Optional[datetime] = None,
+        sampai: Optional[datetime] = None,
+        status: Optional[StatusSesi] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> Tuple[List[SesiParkir], Optional[Kunci]]:
+        syarat, params = [], []
+        if setelah is not None:
+            syarat.append("(waktu_masuk, id) > (?, ?)")
+            params += [_iso(setelah[0]), setelah[1]]
+        if dari is not None:
+            syarat.append("waktu_masuk >= ?")
+            params.append(_iso(dari))
+        if sampai is not None:
+            syarat.append("waktu_masuk < ?")
+            params.append(_iso(sampai))
+        if status is not None:
+            syarat.append("status = ?")
+            params.append(status.value)
+        if owner_id is not None:
+            syarat.append("owner_id = ?")
+            params.append(str(owner_id))
+        where = f" WHERE {' AND '.join(syarat)}" if syarat else ""
+        with self.db.koneksi() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM sesi{where} ORDER BY waktu_masuk, id LIMIT ?", (*params, batas + 1)
+            ).fetchall()
+        rows, berikut = _halaman(rows, batas, lambda r: (_dt(r["waktu_masuk"]), r["id"]))
+        return [self._ke_sesi(row) for row in rows], berikut
+
+    def kolom_analitik(
+        self, dari: Optional[datetime] = None, sampai: Optional[datetime] = None
+    ) -> KolomSesi:
+        """Sesi AKTIF dan SELESAI dengan waktu_masuk dalam [dari, sampai) sebagai kolom.
+
+        Waktu dikonversi ke mikrodetik epoch dan biaya ke sen di dalam SQL,
+        sehingga Python hanya menyalin int ke array.
+        """
+        syarat, params = ["status != ?"], [StatusSesi.DIBATALKAN.value]
+        if dari is not None:
+            syarat.append("waktu_masuk >= ?")
+            params.append(_iso(dari))
+        if sampai is not None:
+            syarat.append("waktu_masuk < ?")
+            params.append(_iso(sampai))
+        sql = f"""
+            SELECT {_MIKRO_SQL.format(kolom="waktu_masuk")},
+                   {_MIKRO_SQL.format(kolom="waktu_keluar")},
+                   COALESCE(CAST(ROUND(CAST(biaya AS REAL) * 100) AS INTEGER), 0),
+                   durasi_menit, slot_id
+            FROM sesi WHERE {' AND '.join(syarat)}
+            ORDER BY waktu_masuk
+        """
+        kolom = KolomSesi(run=[0])
+        kode_slot: Dict[Optional[str], int] = {None: 0}
+        with self.db.koneksi() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        for masuk, keluar, sen, menit, slot_id in rows:
+            kode = kode_slot.get(slot_id)
+            if kode is None:
+                kode = kode_slot[slot_id] = kolom.slot_id.kode(UUID(slot_id))
+            if keluar is None:
+                keluar, menit = KOSONG, 0
+            elif menit is None:
+                menit = (keluar - masuk) // 60_000_000
+            kolom.masuk.append(masuk)
+            kolom.keluar.append(keluar)
+            kolom.biaya_sen.append(sen)
+            kolom.menit.append(menit)
+            kolom.slot.append(kode)
+        return kolom
+
+    def list_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        return self._query("SELECT * FROM sesi WHERE owner_id = ? ORDER BY rowid", (str(owner_id),))
+
+    def list_active(self) -> List[SesiParkir]:
+        return self._query("SELECT * FROM sesi WHERE waktu_keluar IS NULL ORDER BY rowid", ())
+
+    def list_active_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        return self._query(
+            "SELECT * FROM sesi WHERE owner_id = ? AND waktu_keluar IS NULL ORDER BY rowid",
+            (str(owner_id),),
+        )
+
+    def list_history_by_owner(self, owner_id: UUID) -> List[SesiParkir]:
+        return self._query(
+            "SELECT * FROM sesi WHERE owner_id = ? AND waktu_keluar IS NOT NULL ORDER BY rowid",
+            (str(owner_id),),
+        )
+
+    def _query(self, sql: str, params: tuple) -> List[SesiParkir]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._ke_sesi(row) for row in rows]
+
+    @staticmethod
+    def _ke_sesi(row: sqlite3.Row) -> SesiParkir:
+        biaya = None
+        if row["biaya"] is not None:
+            biaya = BiayaFinal(jumlah=Decimal(row["biaya"]), mata_uang=row["mata_uang"])
+        return SesiParkir(
+            nomor_plat=NomorPlat(kode=row["kode_plat"], tipe_kendaraan=row["tipe_kendaraan"]),
+            id_sesi=UUID(row["id"]),
+            waktu_masuk=_dt(row["waktu_masuk"]),
+            waktu_keluar=_dt(row["waktu_keluar"]),
+            status=StatusSesi(row["status"]),
+            durasi=Durasi(total_menit=row["durasi_menit"]) if row["durasi_menit"] is not None else None,
+            biaya_final=biaya,
+            owner_id=_uuid(row["owner_id"]),
+            vehicle_id=_uuid(row["vehicle_id"]),
+            slot_id=_uuid(row["slot_id"]),
+        )
+
+
+class SQLiteTarifParkirRepository:
+    """Tarif di tabel ``tarif``; ``versi`` dibaca dari ``tarif_versi``.
+
+    Setiap ``save``/``delete`` menaikkan versi dalam transaksi yang sama,
+    jadi cache tarif di worker lain ikut kedaluwarsa. Perubahan entity baru
+    terlihat setelah disimpan.
+    """
+
+    _UPSERT = """
+        INSERT INTO tarif (id, nama, jenis_tarif, tipe_kendaraan, harga_per_jam,
+                           harga_maksimum_harian, jendela, selisih_utc_menit,
+                           is_active, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            nama = excluded.nama,
+            jenis_tarif = excluded.jenis_tarif,
+            tipe_kendaraan = excluded.tipe_kendaraan,
+            harga_per_jam = excluded.harga_per_jam,
+            harga_maksimum_harian = excluded.harga_maksimum_harian,
+            jendela = excluded.jendela,
+            selisih_utc_menit = excluded.selisih_utc_menit,
+            is_active = excluded.is_active,
+            updated_at = excluded.updated_at
+    """
+    _NAIKKAN_VERSI = "UPDATE tarif_versi SET versi = versi + 1 WHERE id = 1"
+
+    def __init__(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    @property
+    def versi(self) -> int:
+        with self.db.koneksi() as conn:
+            return conn.execute("SELECT versi FROM tarif_versi WHERE id = 1").fetchone()[0]
+
+    def save(self, tarif: TarifParkir) -> TarifParkir:
+        with self.db.transaksi() as conn:
+            conn.execute(self._UPSERT, (
+                str(tarif.id),
+                tarif.nama,
+                tarif.jenis_tarif.value,
+                tarif.tipe_kendaraan.value,
+                str(tarif.harga_per_jam),
+                _str(tarif.harga_maksimum_harian),
+                json.dumps([
+                    {
+                        "nama": j.nama,
+                        "harga_per_jam": str(j.harga_per_jam),
+                        "mulai": j.mulai.isoformat(),
+                        "selesai": j.selesai.isoformat(),
+                        "hari": sorted(j.hari),
+                    }
+                    for j in tarif.jendela
+                ]),
+                tarif.selisih_utc_menit,
+                int(tarif.is_active),
+                _iso(tarif.created_at),
+                _iso(tarif.updated_at),
+            ))
+            conn.execute(self._NAIKKAN_VERSI)
+        return tarif
+
+    def get_by_id(self, tarif_id: UUID) -> Optional[TarifParkir]:
+        rows = self._query("SELECT * FROM tarif WHERE id = ?", (str(tarif_id),))
+        return rows[0] if rows else None
+
+    def list_all(self) -> List[TarifParkir]:
+        return self._query("SELECT * FROM tarif ORDER BY rowid", ())
+
+    def cari_aktif(
+        self, tipe_kendaraan: TipeKendaraan, jenis_tarif: JenisTarif
+    ) -> Optional[TarifParkir]:
+        """Tarif aktif untuk kombinasi ini; bila ada beberapa, yang terakhir diubah."""
+        rows = self._query(
+            "SELECT * FROM tarif WHERE tipe_kendaraan = ? AND jenis_tarif = ? AND is_active = 1 "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (tipe_kendaraan.value, jenis_tarif.value),
+        )
+        return rows[0] if rows else None
+
+    def delete(self, tarif_id: UUID) -> bool:
+        with self.db.transaksi() as conn:
+            cur = conn.execute("DELETE FROM tarif WHERE id = ?", (str(tarif_id),))
+            if cur.rowcount > 0:
+                conn.execute(self._NAIKKAN_VERSI)
+        return cur.rowcount > 0
+
+    def _query(self, sql: str, params: tuple) -> List[TarifParkir]:
+        with self.db.koneksi() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._ke_tarif(row) for row in rows]
+
+    @staticmethod
+    def _ke_tarif(row: sqlite3.Row) -> TarifParkir:
+        maks = row["harga_maksimum_harian"]
+        return TarifParkir(
+            id=UUID(row["id"]),
+            nama=row["nama"],
+            jenis_tarif=JenisTarif(row["jenis_tarif"]),
+            tipe_kendaraan=TipeKendaraan(row["tipe_kendaraan"]),
+            harga_per_jam=Decimal(row["harga_per_jam"]),
+            harga_maksimum_harian=Decimal(maks) if maks is not None else None,
+            jendela=tuple(
+                JendelaTarif(
+                    nama=j["nama"],
+                    harga_per_jam=Decimal(j["harga_per_jam"]),
+                    mulai=time.fromisoformat(j["mulai"]),
+                    selesai=time.fromisoformat(j["selesai"]),
+                    hari=frozenset(j["hari"]),
+                )
+                for j in json.loads(row["jendela"])
+            ),
+            selisih_utc_menit=row["selisih_utc_menit"],
+            is_active=bool(row["is_active"]),
+            created_at=_dt(row["created_at"]),
+            updated_at=_dt(row["updated_at"]),
+        )
@@ -0,0 +1,72 @@
+"""
+Repository untuk tarif parkir
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from manajemen_parkir.domain.tariff import JenisTarif, TarifParkir, TipeKendaraan
+
+
+class InMemoryTarifParkirRepository:
+    """Tarif per id, ditambah index (tipe kendaraan, jenis tarif).
+
+    ``versi`` naik setiap kali isi repository berubah, termasuk saat tarif
+    yang tersimpan diubah lewat ``update_harga``, ``nonaktifkan``, atau
+    ``aktifkan``, sehingga cache di atasnya cukup membandingkan satu int.
+    """
+
+    def __init__(self, tarif: Iterable[TarifParkir] = ()):
+        self._tarif: Dict[UUID, TarifParkir] = {}
+        # Index dikunci dengan .value agar tidak bergantung pada identitas
+        # kelas enum milik tarif yang disimpan
+        self._per_jenis: Dict[Tuple[str, str], Dict[UUID, TarifParkir]] = {}
+        self._kunci_index: Dict[UUID, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.versi = 0
+        for t in tarif:
+            self.save(t)
+
+    def save(self, tarif: TarifParkir) -> TarifParkir:
+        with self._lock:
+            self._lepas_index(tarif.id)
+            kunci = (tarif.tipe_kendaraan.value, tarif.jenis_tarif.value)
+            self._tarif[tarif.id] = tarif
+            self._per_jenis.setdefault(kunci, {})[tarif.id] = tarif
+            self._kunci_index[tarif.id] = kunci
+            tarif._pengamat = self._tarif_berubah
+            self.versi += 1
+        return tarif
+
+    def get_by_id(self, tarif_id: UUID) -> Optional[TarifParkir]:
+        return self._tarif.get(tarif_id)
+
+    def list_all(self) -> List[TarifParkir]:
+        return list(self._tarif.values())
+
+    def cari_aktif(
+        self, tipe_kendaraan: TipeKendaraan, jenis_tarif: JenisTarif
+    ) -> Optional[TarifParkir]:
+        """Tarif aktif untuk kombinasi ini; bila ada beberapa, yang terakhir diubah."""
+        kandidat = self._per_jenis.get((tipe_kendaraan.value, jenis_tarif.value), {})
+        aktif = [t for t in list(kandidat.values()) if t.is_active]
+        return max(aktif, key=lambda t: t.updated_at, default=None)
+
+    def delete(self, tarif_id: UUID) -> bool:
+        with self._lock:
+            tarif = self._tarif.pop(tarif_id, None)
+            if tarif is None:
+                return False
+            self._lepas_index(tarif_id)
+            tarif._pengamat = None
+            self.versi += 1
+        return True
+
+    def _lepas_index(self, tarif_id: UUID) -> None:
+        kunci = self._kunci_index.pop(tarif_id, None)
+        if kunci is not None:
+            self._per_jenis[kunci].pop(tarif_id, None)
+
+    def _tarif_berubah(self, tarif: TarifParkir) -> None:
+        with self._lock:
+            self.versi += 1
@@ -1,31 +1,93 @@
-from typing import Dict, Optional, List
+import itertools
+from typing import Dict, Optional, List, Tuple
 from uuid import UUID
 
 from manajemen_parkir.domain.user import User, Vehicle
+from manajemen_parkir.infrastructure.index_urut import IndexUrut, Kunci
+
+
+def normalisasi_plat(plate: str) -> str:
+    return "".join(plate.split()).upper()
 
 
 class InMemoryUserRepository:
     def __init__(self) -> None:
         self._store: Dict[UUID, User] = {}
+        # vehicle_id -> (pemilik, kendaraan)
+        self._vehicle_index: Dict[UUID, Tuple[User, Vehicle]] = {}
+        # plat ternormalisasi -> {vehicle_id: kendaraan}, urut sesuai waktu simpan
+        self._plate_index: Dict[str, Dict[UUID, Vehicle]] = {}
+        # user_id -> {vehicle_id: plat ternormalisasi} yang terakhir diindeks
+        self._indexed_vehicles: Dict[UUID, Dict[UUID, Optional[str]]] = {}
+        # (urutan simpan pertama, user_id) terurut, untuk paginasi kursor
+        self._urut = IndexUrut()
+        self._urutan = itertools.count(1)
 
     def save(self, user: User) -> None:
         self._store[user.id] = user
+        if self._urut.kunci_dari(user.id) is None:
+            self._urut.simpan(user.id, next(self._urutan))
+        self._reindex(user)
 
     def get_by_id(self, user_id: UUID) -> Optional[User]:
         return self._store.get(user_id)
-    
+
     def find_by_id(self, user_id: UUID) -> Optional[User]:
         return self.get_by_id(user_id)
 
     def find_by_plate(self, plate: str) -> Optional[Vehicle]:
-        for user in self._store.values():
-            for v in user.vehicles:
-                if v.plate == plate:
-                    return v
+        bucket = self._plate_index.get(normalisasi_plat(plate))
+        if bucket:
+            return next(iter(bucket.values()))
         return None
 
+    def find_by_vehicle_id(self, vehicle_id: UUID) -> Optional[Tuple[User, Vehicle]]:
+        return self._vehicle_index.get(vehicle_id)
+
     def list(self) -> List[User]:
         return list(self._store.values())
 
+    def list_halaman(
+        self, setelah: Optional[Kunci] = None, batas: int = 50
+    ) -> Tuple[List[User], Optional[Kunci]]:
+        """User urut waktu simpan pertama setelah kursor ``setelah``."""
+        return self._urut.halaman(setelah, batas, lambda k: self._store.get(k[1]))
+
     def delete(self, user_id: UUID) -> bool:
-        return self._store.pop(user_id, None) is not None
+        user = self._store.pop(user_id, None)
+        if user is None:
+            return False
+        self._urut.hapus(user_id)
+        for vehicle_id, plat in self._indexed_vehicles.pop(user_id, {}).items():
+            self._unindex_vehicle(user_id, vehicle_id, plat)
+        return True
+
+    def _reindex(self, user: User) -> None:
+        lama = self._indexed_vehicles.get(user.id, {})
+        baru: Dict[UUID, Optional[str]] = {}
+        for v in user.vehicles:
+            baru[v.id] = normalisasi_plat(v.plate) if v.plate else None
+
+        for vehicle_id, plat in lama.items():
+            if baru.get(vehicle_id, object()) != plat:
+                self._unindex_vehicle(user.id, vehicle_id, plat)
+
+        for v in user.vehicles:
+            plat = baru[v.id]
+            self._vehicle_index[v.id] = (user, v)
+            if plat is not None:
+                self._plate_index.setdefault(plat, {})[v.id] = v
+
+        self._indexed_vehicles[user.id] = baru
+
+    def _unindex_vehicle(self, user_id: UUID, vehicle_id: UUID, plat: Optional[str]) -> None:
+        entry = self._vehicle_index.get(vehicle_id)
+        if entry is not None and entry[0].id == user_id:
+            del self._vehicle_index[vehicle_id]
+        if plat is None:
+            return
+        bucket = self._plate_index.get(plat)
+        if bucket is not None:
+            bucket.pop(vehicle_id, None)
+            if not bucket:
+                del self._plate_index[plat]
@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from uuid import uuid4
 
 from src.main import app
 
@@ -108,6 +109,44 @@ class TestParkingEndpoints:
         assert data["vehicle_id"] == vehicle_id
         assert data["status"] == "AKTIF"
     
+    def test_check_in_without_slot_picks_nearest_to_entrance(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        petugas_token = get_petugas_token(api_client)
+        slot_ids = []
+        for posisi_x in (5000.0, 5003.0):
+            response = api_client.post(
+                "/slots/",
+                headers={"Authorization": f"Bearer {petugas_token}"},
+                json={"lantai": 9, "posisi_x": posisi_x, "posisi_y": 5000.0}
+            )
+            slot_ids.append(response.json()["id"])
+        
+        response = api_client.post(
+            "/parking/check-in",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "vehicle_id": vehicle_id,
+                "pintu_masuk": {"lantai": 9, "posisi_x": 5004.0, "posisi_y": 5000.0}
+            }
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["slot_id"] == slot_ids[1]
+    
+    def test_check_in_invalid_entrance(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        
+        response = api_client.post(
+            "/parking/check-in",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "vehicle_id": vehicle_id,
+                "pintu_masuk": {"lantai": -1, "posisi_x": 0.0, "posisi_y": 0.0}
+            }
+        )
+        
+        assert response.status_code == 400
+    
     def test_check_in_vehicle_not_found(self, api_client):
         import uuid
         token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
@@ -225,6 +264,63 @@ class TestParkingEndpoints:
         
         assert response.status_code == 404
     
+    def test_batch_check_in_and_check_out(self, api_client):
+        import uuid
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        slot_id = create_available_slot(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        response = api_client.post(
+            "/parking/batch/check-in",
+            headers=headers,
+            json={"items": [
+                {"vehicle_id": vehicle_id, "slot_id": slot_id},
+                {"vehicle_id": vehicle_id, "slot_id": slot_id},
+                {"vehicle_id": str(uuid.uuid4())},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["berhasil"], data["gagal"]) == (1, 2)
+        assert [item["status_code"] for item in data["hasil"]] == [200, 400, 404]
+        assert data["hasil"][0]["data"]["slot_id"] == slot_id
+        assert "tidak tersedia" in data["hasil"][1]["detail"]
+        
+        id_sesi = data["hasil"][0]["data"]["id"]
+        response = api_client.post(
+            "/parking/batch/check-out",
+            headers=headers,
+            json={"id_sesi": [id_sesi, id_sesi]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["status_code"] for item in data["hasil"]] == [200, 404]
+        assert data["hasil"][0]["data"]["status"] == "SELESAI"
+    
+    def test_batch_check_in_rejects_empty_and_oversized(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        response = api_client.post("/parking/batch/check-in", headers=headers, json={"items": []})
+        assert response.status_code == 400
+        
+        response = api_client.post(
+            "/parking/batch/check-in",
+            headers=headers,
+            json={"items": [{"vehicle_id": vehicle_id}] * 501}
+        )
+        assert response.status_code == 400
+    
+    def test_batch_check_out_without_auth(self, api_client):
+        import uuid
+        response = api_client.post(
+            "/parking/batch/check-out",
+            json={"id_sesi": [str(uuid.uuid4())]}
+        )
+        assert response.status_code in [401, 403]
+    
     def test_get_session(self, api_client):
         token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
         
@@ -249,6 +345,34 @@ class TestParkingEndpoints:
         assert data["id"] == session_id
         assert data["vehicle_id"] == vehicle_id
     
+    def test_quote_session(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        slot_id = create_available_slot(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        session_id = api_client.post(
+            "/parking/check-in",
+            headers=headers,
+            json={"vehicle_id": vehicle_id, "slot_id": slot_id}
+        ).json()["id"]
+        
+        response = api_client.get(f"/parking/sessions/{session_id}/quote", headers=headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == session_id
+        assert data["fee"] == 3000.0
+        assert data["valid_until"] > data["quoted_at"]
+        assert response.headers["cache-control"].startswith("private, max-age=")
+        # sesi tetap aktif
+        sesi = api_client.get(f"/parking/sessions/{session_id}", headers=headers).json()
+        assert sesi["status"] == "AKTIF" and sesi["final_fee"] is None
+        
+        api_client.post(f"/parking/check-out/{session_id}", headers=headers)
+        response = api_client.get(f"/parking/sessions/{session_id}/quote", headers=headers)
+        assert response.status_code == 409
+        response = api_client.get(f"/parking/sessions/{uuid4()}/quote", headers=headers)
+        assert response.status_code == 404
+    
     def test_get_session_not_found(self, api_client):
         import uuid
         token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
@@ -284,6 +408,151 @@ class TestParkingEndpoints:
         assert isinstance(data, list)
         assert len(data) >= 3
     
+    def test_list_sessions_paginated(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        for _ in range(3):
+            api_client.post("/parking/check-in", headers=headers, json={"vehicle_id": vehicle_id})
+        semua = api_client.get("/parking/sessions", headers=headers).json()
+        
+        dilihat, params = [], {"limit": 2}
+        while True:
+            response = api_client.get("/parking/sessions", headers=headers, params=params)
+            assert response.status_code == 200
+            assert len(response.json()) <= 2
+            dilihat += [s["id"] for s in response.json()]
+            kursor = response.headers.get("X-Next-Cursor")
+            if kursor is None:
+                break
+            params = {"limit": 2, "cursor": kursor}
+        
+        assert len(dilihat) == len(set(dilihat))
+        assert set(dilihat) == {s["id"] for s in semua}
+        waktu = [s["checkin_time"] for s in api_client.get(
+            "/parking/sessions", headers=headers, params={"limit": 500}
+        ).json()]
+        assert waktu == sorted(waktu)
+    
+    def test_list_sessions_invalid_cursor_or_limit(self, api_client):
+        token, _, _ = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        response = api_client.get("/parking/sessions", headers=headers, params={"cursor": "bukan-kursor"})
+        assert response.status_code == 400
+        response = api_client.get("/parking/sessions", headers=headers, params={"limit": 0})
+        assert response.status_code == 422
+        response = api_client.get("/parking/sessions", headers=headers, params={"limit": 501})
+        assert response.status_code == 422
+    
+    def test_export_sessions_ndjson_and_csv(self, api_client):
+        import csv
+        import io
+        import json
+        
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        sesi_id = api_client.post(
+            "/parking/check-in", headers=headers, json={"vehicle_id": vehicle_id}
+        ).json()["id"]
+        api_client.post(f"/parking/check-out/{sesi_id}", headers=headers)
+        api_client.post("/parking/check-in", headers=headers, json={"vehicle_id": vehicle_id})
+        
+        response = api_client.get(
+            "/parking/sessions/export", headers=headers, params={"owner_id": user_id}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        baris = [json.loads(line) for line in response.text.splitlines()]
+        assert len(baris) == 2
+        assert all(b["owner_id"] == user_id for b in baris)
+        
+        response = api_client.get(
+            "/parking/sessions/export",
+            headers=headers,
+            params={"format": "csv", "owner_id": user_id, "status": "selesai"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["id"] for r in rows] == [sesi_id]
+        assert rows[0]["status"] == "SELESAI"
+        assert rows[0]["checkout_time"] != ""
+        
+        response = api_client.get(
+            "/parking/sessions/export",
+            headers=headers,
+            params={"owner_id": user_id, "dari": "2999-01-01T00:00:00Z"},
+        )
+        assert response.status_code == 200
+        assert response.text == ""
+    
+    def test_export_sessions_invalid_params(self, api_client):
+        token, _, _ = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        for params in (
+            {"format": "xml"},
+            {"status": "PARKIR"},
+            {"dari": "2024-02-01T00:00:00", "sampai": "2024-01-01T00:00:00"},
+        ):
+            response = api_client.get("/parking/sessions/export", headers=headers, params=params)
+            assert response.status_code == 400
+        assert api_client.get("/parking/sessions/export").status_code in [401, 403]
+    
+    def test_analytics(self, api_client):
+        token, user_id, vehicle_id = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        petugas = {"Authorization": f"Bearer {get_petugas_token(api_client)}"}
+        slot_ids = [
+            api_client.post(
+                "/slots/", headers=petugas, json={"lantai": 24, "posisi_x": float(i), "posisi_y": 0.0}
+            ).json()["id"]
+            for i in range(2)
+        ]
+        sesi_ids = [
+            api_client.post(
+                "/parking/check-in", headers=headers, json={"vehicle_id": vehicle_id, "slot_id": slot_id}
+            ).json()["id"]
+            for slot_id in slot_ids
+        ]
+        api_client.post(f"/parking/check-out/{sesi_ids[0]}", headers=headers)
+
+        response = api_client.get(
+            "/parking/analytics",
+            headers=headers,
+            params={"interval": "hour", "percentile": [50, 99.5]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["interval"] == "hour"
+        assert data["sessions"] >= 1
+        assert data["revenue"]["total"] == sum(b["revenue"] for b in data["revenue"]["buckets"])
+        assert sum(b["sessions"] for b in data["revenue"]["buckets"]) == data["sessions"]
+        assert set(data["duration_minutes"]["percentiles"]) == {"p50", "p99.5"}
+        lantai = {p["floor"]: p for p in data["peak_occupancy"]}
+        assert lantai[24]["peak"] == 2
+
+        kosong = api_client.get(
+            "/parking/analytics", headers=headers, params={"dari": "2999-01-01T00:00:00Z"}
+        ).json()
+        assert kosong["sessions"] == 0
+        assert kosong["revenue"] == {"total": 0.0, "buckets": []}
+        assert kosong["duration_minutes"]["mean"] is None
+        assert kosong["peak_occupancy"] == []
+
+    def test_analytics_invalid_params(self, api_client):
+        token, _, _ = get_pengguna_token_and_data(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for params in (
+            {"interval": "week"},
+            {"percentile": 101},
+            {"dari": "2024-02-01T00:00:00", "sampai": "2024-01-01T00:00:00"},
+        ):
+            response = api_client.get("/parking/analytics", headers=headers, params=params)
+            assert response.status_code == 400
+        assert api_client.get("/parking/analytics").status_code in [401, 403]
+
     def test_check_in_without_auth(self, api_client):
         response = api_client.post(
             "/parking/check-in",
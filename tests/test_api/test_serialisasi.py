@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from src.manajemen_parkir.api import serialisasi
+from src.manajemen_parkir.api.serialisasi import (
+    ResponsJSON,
+    dumps,
+    encode_list,
+    sesi_dict,
+    slot_detail_dict,
+    slot_dict,
+    slot_ringkas_dict,
+)
+from src.manajemen_parkir.domain.alokasi_slot import Sensor, SlotParkir, TipeSensor
+from src.manajemen_parkir.domain.model import SesiParkir
+from src.manajemen_parkir.domain.value_objects import BiayaFinal, NomorPlat
+
+
+class TestSerialisasi:
+    def test_sesi_sama_dengan_format_lama(self):
+        sesi = SesiParkir(
+            nomor_plat=NomorPlat("B 1 XY", "MOBIL"),
+            waktu_masuk=datetime(2024, 1, 1, 8, 0, 0, 500),
+            owner_id=uuid4(),
+        )
+        sesi.waktu_keluar = datetime(2024, 1, 1, 9, 30)
+        sesi.biaya_final = BiayaFinal(jumlah=Decimal("6000"))
+
+        data = json.loads(dumps(sesi_dict(sesi)))
+
+        assert data == {
+            "id": str(sesi.id_sesi),
+            "plate": "B 1 XY",
+            "vehicle_type": "MOBIL",
+            "owner_id": str(sesi.owner_id),
+            "vehicle_id": None,
+            "slot_id": None,
+            "checkin_time": "2024-01-01T08:00:00.000500",
+            "checkout_time": "2024-01-01T09:30:00",
+            "status": "AKTIF",
+            "final_fee": 6000.0,
+        }
+
+    def test_slot_list_detail_dan_ringkas(self):
+        slot = SlotParkir.create(2, 1.5, 3.0, sensor=Sensor.create(TipeSensor.KAMERA))
+
+        data = json.loads(encode_list(slot_dict, [slot]))[0]
+        assert data["sensor"] == {
+            "id": str(slot.sensor.id), "tipe": "KAMERA", "kondisi": "Normal", "is_active": True
+        }
+        assert data["waktu_update"] == slot.status_ketersediaan.waktu_update.isoformat()
+        assert "created_at" not in data
+
+        detail = json.loads(dumps(slot_detail_dict(slot)))
+        assert detail["created_at"] == slot.created_at.isoformat()
+        assert detail["sensor"]["created_at"] == slot.sensor.created_at.isoformat()
+
+        assert json.loads(dumps(slot_ringkas_dict(slot))) == {
+            "id": str(slot.id), "lantai": 2, "posisi_x": 1.5, "posisi_y": 3.0, "status": "TERSEDIA"
+        }
+
+    def test_respons_bytes_tidak_diencode_ulang(self):
+        response = ResponsJSON(b'[{"a":1}]')
+        assert response.body == b'[{"a":1}]'
+        assert response.headers["content-type"] == "application/json"
+        assert ResponsJSON({"jumlah": Decimal("1.5")}).body == b'{"jumlah":1.5}'
+
+    def test_fallback_json_sama_dengan_orjson(self):
+        data = {"id": uuid4(), "waktu": datetime(2024, 1, 1, 7, 5), "biaya": Decimal("2500")}
+
+        fallback = json.dumps(data, default=serialisasi._default)
+
+        assert json.loads(fallback) == json.loads(dumps(data))
@@ -96,6 +96,100 @@ class TestSlotEndpoints:
         data = response.json()
         assert data["lantai"] == 1
     
+    def test_create_slots_bulk_grid(self, api_client):
+        token = get_admin_token(api_client)
+        
+        response = api_client.post(
+            "/slots/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"grid": {
+                "lantai": 20, "baris": 3, "kolom": 4,
+                "jarak_x": 2.5, "jarak_y": 5.0, "tipe_sensor": "KAMERA"
+            }}
+        )
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert data["jumlah"] == 12
+        
+        response = api_client.get("/slots/?lantai=20", headers={"Authorization": f"Bearer {token}"})
+        ids = {slot["id"] for slot in response.json()}
+        assert set(data["ids"]) <= ids
+    
+    def test_create_slots_bulk_list(self, api_client):
+        token = get_admin_token(api_client)
+        
+        response = api_client.post(
+            "/slots/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"slots": [
+                {"lantai": 21, "posisi_x": 0.0, "posisi_y": 0.0},
+                {"lantai": 21, "posisi_x": 3.0, "posisi_y": 0.0, "keterangan": "Dekat lift"},
+            ]}
+        )
+        
+        assert response.status_code == 201
+        assert response.json()["jumlah"] == 2
+    
+    def test_create_slots_bulk_invalid_creates_nothing(self, api_client):
+        token = get_admin_token(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        sebelum = api_client.get("/slots/statistik", headers=headers).json()["total"]
+        
+        response = api_client.post(
+            "/slots/bulk",
+            headers=headers,
+            json={"slots": [
+                {"lantai": 22, "posisi_x": 0.0, "posisi_y": 0.0},
+                {"lantai": 22, "posisi_x": 1.0, "posisi_y": 0.0, "tipe_sensor": "RADAR"},
+            ]}
+        )
+        assert response.status_code == 400
+        assert "Slot ke-1" in response.json()["detail"]
+        
+        response = api_client.post("/slots/bulk", headers=headers, json={})
+        assert response.status_code == 400
+        
+        assert api_client.get("/slots/statistik", headers=headers).json()["total"] == sebelum
+    
+    def test_list_slots_paginated(self, api_client):
+        token = get_admin_token(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        data = api_client.post(
+            "/slots/bulk",
+            headers=headers,
+            json={"grid": {"lantai": 23, "baris": 1, "kolom": 5, "jarak_x": 2.0, "jarak_y": 2.0}}
+        ).json()
+        
+        dilihat, params = [], {"lantai": 23, "limit": 2}
+        while True:
+            response = api_client.get("/slots/", headers=headers, params=params)
+            assert response.status_code == 200
+            dilihat += [slot["id"] for slot in response.json()]
+            kursor = response.headers.get("X-Next-Cursor")
+            if kursor is None:
+                break
+            params["cursor"] = kursor
+        
+        assert sorted(dilihat) == sorted(data["ids"])
+        assert len(api_client.get("/slots/", headers=headers, params={"limit": 3}).json()) == 3
+    
+    def test_list_slots_kursor_jenis_lain_ditolak(self, api_client):
+        from datetime import datetime, timedelta, timezone
+        from uuid import uuid4
+        from src.manajemen_parkir.api.pagination import encode_kursor
+        
+        token = get_admin_token(api_client)
+        headers = {"Authorization": f"Bearer {token}"}
+        api_client.post("/slots/", headers=headers, json={"lantai": 24, "posisi_x": 1.0, "posisi_y": 1.0})
+        
+        kursor_int = encode_kursor((3, str(uuid4())))
+        kursor_tz = encode_kursor((datetime.now(timezone(timedelta(hours=7))), str(uuid4())))
+        for kursor in (kursor_int, kursor_tz):
+            response = api_client.get("/slots/", headers=headers, params={"cursor": kursor})
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Kursor tidak valid"
+    
     def test_get_all_slots_unauthenticated(self, api_client):
         response = api_client.get("/slots/")
         assert response.status_code in [401, 403]
@@ -104,6 +104,37 @@ class TestUserEndpoints:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
     
+    def test_get_all_users_paginated(self, api_client):
+        admin_token = get_admin_token(api_client)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        get_pengguna_token_and_user_id(api_client)
+        get_pengguna_token_and_user_id(api_client)
+        semua = api_client.get("/users/", headers=headers).json()
+        
+        dilihat, params = [], {"limit": 2}
+        while True:
+            response = api_client.get("/users/", headers=headers, params=params)
+            assert response.status_code == 200
+            dilihat += [u["id"] for u in response.json()]
+            kursor = response.headers.get("X-Next-Cursor")
+            if kursor is None:
+                break
+            params = {"limit": 2, "cursor": kursor}
+        
+        assert dilihat == [u["id"] for u in semua]
+    
+    def test_get_all_users_kursor_waktu_ditolak(self, api_client):
+        from datetime import datetime
+        from uuid import uuid4
+        from src.manajemen_parkir.api.pagination import encode_kursor
+        
+        admin_token = get_admin_token(api_client)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        kursor = encode_kursor((datetime(2024, 1, 1), str(uuid4())))
+        
+        response = api_client.get("/users/", headers=headers, params={"cursor": kursor})
+        assert response.status_code == 400
+    
     def test_get_all_users_as_pengguna_forbidden(self, api_client):
         token, _ = get_pengguna_token_and_user_id(api_client)
         
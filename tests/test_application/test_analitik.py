@@ -0,0 +1,119 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.manajemen_parkir.application.analitik import (
+    LEBAR_INTERVAL,
+    okupansi_puncak,
+    pendapatan_per_interval,
+    persentil,
+    ringkas,
+)
+from src.manajemen_parkir.infrastructure.arsip_sesi import KolomSesi, ke_mikro
+
+JAM = LEBAR_INTERVAL["hour"]
+
+
+def _kolom_acak(rng, n, slots, jumlah_run=3):
+    """Sesi acak dalam beberapa run yang masing-masing urut waktu masuk."""
+    awal = datetime(2024, 3, 1)
+    kolom = KolomSesi()
+    sesi = []
+    for r in range(jumlah_run):
+        masuk = sorted(awal + timedelta(seconds=rng.randrange(3 * 86400)) for _ in range(n))
+        kolom.mulai_run()
+        for m in masuk:
+            aktif = rng.random() < 0.05
+            keluar = None if aktif else m + timedelta(seconds=rng.randrange(1, 6 * 3600))
+            sen = 0 if aktif else rng.randrange(1, 20) * 300000
+            slot_id = rng.choice(slots)
+            kolom.tambah(m, keluar, sen, None, slot_id)
+            sesi.append((m, keluar, sen, slot_id))
+    return kolom, sesi
+
+
+def _persentil_brute(nilai, p):
+    nilai = sorted(nilai)
+    posisi = p / 100 * (len(nilai) - 1)
+    bawah = int(posisi)
+    atas = min(bawah + 1, len(nilai) - 1)
+    return nilai[bawah] + (nilai[atas] - nilai[bawah]) * (posisi - bawah)
+
+
+def _puncak_brute(sesi, lantai_slot):
+    akhir = max(max(m, k or m) for m, k, _, _ in sesi) + timedelta(seconds=1)
+    event = defaultdict(list)
+    for m, k, _, slot_id in sesi:
+        lantai = lantai_slot.get(slot_id)
+        if lantai is not None:
+            event[lantai].append((ke_mikro(m) // 1_000_000, 1))
+            event[lantai].append((-(-ke_mikro(k or akhir) // 1_000_000), -1))
+    hasil = {}
+    for lantai, daftar in event.items():
+        terisi, puncak = 0, 0
+        # keluar (-1) sebelum masuk (+1) pada detik yang sama
+        for _, delta in sorted(daftar):
+            terisi += delta
+            puncak = max(puncak, terisi)
+        hasil[lantai] = puncak
+    return hasil
+
+
+class TestAnalitik:
+    def test_sama_dengan_perhitungan_langsung(self):
+        rng = random.Random(11)
+        slots = [uuid4() for _ in range(12)]
+        lantai_slot = {s: i % 3 for i, s in enumerate(slots[:-1])}
+        kolom, sesi = _kolom_acak(rng, 400, slots)
+
+        hasil = ringkas(kolom, lantai_slot, JAM, (0.0, 50.0, 90.0, 100.0))
+
+        selesai = [s for s in sesi if s[1] is not None]
+        per_jam = defaultdict(lambda: [0, 0])
+        for m, _, sen, _ in selesai:
+            awal = ke_mikro(m) // JAM * JAM
+            per_jam[awal][0] += sen
+            per_jam[awal][1] += 1
+        assert hasil.per_interval == [(k, *per_jam[k]) for k in sorted(per_jam)]
+        assert hasil.jumlah_sesi == len(selesai)
+        assert hasil.total_sen == sum(s[2] for s in selesai)
+
+        menit = [int((k - m).total_seconds() // 60) for m, k, _, _ in selesai]
+        assert hasil.rata_rata_menit == pytest.approx(sum(menit) / len(menit))
+        for p, nilai in hasil.persentil_menit.items():
+            assert nilai == pytest.approx(_persentil_brute(menit, p))
+
+        puncak = _puncak_brute(sesi, lantai_slot)
+        assert [(l, p) for l, p, _ in hasil.okupansi_puncak] == sorted(puncak.items())
+
+    def test_sesi_bergantian_di_detik_yang_sama_tidak_tumpang_tindih(self):
+        slot_id = uuid4()
+        awal = datetime(2024, 1, 1, 8)
+        kolom = KolomSesi()
+        kolom.mulai_run()
+        kolom.tambah(awal, awal + timedelta(hours=1), 300000, 60, slot_id)
+        kolom.tambah(awal + timedelta(hours=1), awal + timedelta(hours=2), 300000, 60, slot_id)
+        kolom.tambah(awal + timedelta(minutes=90), None, 0, None, slot_id)
+
+        hasil = okupansi_puncak(kolom, {slot_id: 4})
+
+        assert hasil == [(4, 2, ke_mikro(awal + timedelta(minutes=90)))]
+        assert okupansi_puncak(kolom, {}) == []
+
+    def test_pendapatan_per_hari_dan_persentil_kosong(self):
+        awal = datetime(2024, 1, 1, 23, 30)
+        kolom = KolomSesi()
+        kolom.mulai_run()
+        for i in range(3):
+            masuk = awal + timedelta(minutes=20 * i)
+            kolom.tambah(masuk, masuk + timedelta(minutes=10), 100 * (i + 1), 10, None)
+
+        hari = LEBAR_INTERVAL["day"]
+        assert pendapatan_per_interval(kolom, hari) == [
+            (ke_mikro(datetime(2024, 1, 1)), 300, 2),
+            (ke_mikro(datetime(2024, 1, 2)), 300, 1),
+        ]
+        assert persentil([], (50.0,)) == (None, {50.0: None})
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from uuid import uuid4
 
@@ -5,6 +6,11 @@ from manajemen_parkir.domain.auth import Akun, Peran
 from manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository
 from manajemen_parkir.infrastructure.user_repository import InMemoryUserRepository
 from manajemen_parkir.application.services import AuthService
+from manajemen_parkir.application.token_cache import TokenCache
+from manajemen_parkir.application.hashing_pool import HashingPool, HashingPoolPenuh
+from manajemen_parkir.application.password_hasher import (
+    BcryptHasher, ScryptHasher, Pbkdf2Hasher, buat_password_hashing
+)
 
 
 class TestAuthService:
@@ -132,3 +138,296 @@ class TestAuthService:
         hashed = service._hash_password("password123")
         assert service._verify_password("password123", hashed)
         assert not service._verify_password("wrongpassword", hashed)
+    
+    def test_verify_token_uses_cache(self):
+        auth_repo = InMemoryAuthRepository()
+        user_repo = InMemoryUserRepository()
+        service = AuthService(auth_repo, user_repo)
+        
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        
+        service.verify_token(token.token)
+        akun = service.verify_token(token.token)
+        
+        assert akun.kredensial.username == "testuser"
+        stats = service.token_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+    
+    def test_revoke_token_invalidates_cache(self):
+        auth_repo = InMemoryAuthRepository()
+        user_repo = InMemoryUserRepository()
+        service = AuthService(auth_repo, user_repo)
+        
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        akun = service.verify_token(token.token)
+        
+        akun.revoke_token()
+        assert service.token_cache.stats()["size"] == 0
+    
+    def test_deactivate_rejects_cached_token(self):
+        auth_repo = InMemoryAuthRepository()
+        user_repo = InMemoryUserRepository()
+        service = AuthService(auth_repo, user_repo)
+        
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        akun = service.verify_token(token.token)
+        
+        akun.deactivate()
+        with pytest.raises(ValueError, match="Akun tidak aktif"):
+            service.verify_token(token.token)
+    
+    def test_deleted_account_rejects_cached_token(self):
+        auth_repo = InMemoryAuthRepository()
+        user_repo = InMemoryUserRepository()
+        service = AuthService(auth_repo, user_repo)
+        
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        akun = service.verify_token(token.token)
+        
+        auth_repo.delete(akun.id)
+        with pytest.raises(ValueError, match="Akun tidak ditemukan"):
+            service.verify_token(token.token)
+        assert service.token_cache.stats()["size"] == 0
+
+    def test_revoke_token_sqlite_invalidates_cache(self, tmp_path):
+        from manajemen_parkir.infrastructure.sqlite_repository import (
+            SQLiteAuthRepository, SQLiteDatabase
+        )
+
+        db = SQLiteDatabase(str(tmp_path / "auth.db"), pool_size=1)
+        auth_repo = SQLiteAuthRepository(db)
+        service = AuthService(auth_repo)
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        akun = service.verify_token(token.token)
+
+        service.revoke_token(akun.id)
+        assert service.token_cache.get(token.token) is None
+        assert auth_repo.get_by_id(akun.id).current_token is None
+        db.close()
+
+    def test_deactivate_sqlite_rejects_cached_token(self, tmp_path):
+        from manajemen_parkir.infrastructure.sqlite_repository import (
+            SQLiteAuthRepository, SQLiteDatabase
+        )
+
+        db = SQLiteDatabase(str(tmp_path / "auth.db"), pool_size=1)
+        service = AuthService(SQLiteAuthRepository(db))
+        service.register("testuser", "password123", peran=Peran.PENGGUNA)
+        token = service.login("testuser", "password123")
+        akun = service.verify_token(token.token)
+
+        service.deactivate(akun.id)
+        assert service.token_cache.stats()["size"] == 0
+        with pytest.raises(ValueError, match="Akun tidak aktif"):
+            service.verify_token(token.token)
+        db.close()
+
+    def test_revoke_token_akun_tidak_ada(self):
+        service = AuthService(InMemoryAuthRepository())
+
+        with pytest.raises(ValueError, match="Akun tidak ditemukan"):
+            service.revoke_token(uuid4())
+
+
+class TestTokenCache:
+    def test_lru_eviction(self):
+        cache = TokenCache(maxsize=2)
+        cache.put("a", uuid4())
+        cache.put("b", uuid4())
+        cache.get("a")
+        cache.put("c", uuid4())
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+    
+    def test_entry_capped_at_exp(self):
+        import time
+        
+        cache = TokenCache(ttl_detik=300)
+        cache.put("expired", uuid4(), exp=time.time() - 1)
+        
+        assert cache.get("expired") is None
+        assert cache.stats()["size"] == 0
+
+
+class TestAuthServiceAsync:
+    def test_register_and_login_async(self):
+        pool = HashingPool(max_workers=1, max_antrian=4)
+        service = AuthService(InMemoryAuthRepository(), InMemoryUserRepository(), hashing_pool=pool)
+        
+        akun, user = asyncio.run(service.register_async("testuser", "password123"))
+        token = asyncio.run(service.login_async("testuser", "password123"))
+        
+        assert akun.kredensial.username == "testuser"
+        assert user is not None
+        assert service.verify_token(token.token).id == akun.id
+        assert pool.stats()["selesai"] == 2
+        pool.shutdown()
+    
+    def test_login_async_wrong_password(self):
+        pool = HashingPool(max_workers=1, max_antrian=4)
+        service = AuthService(InMemoryAuthRepository(), InMemoryUserRepository(), hashing_pool=pool)
+        asyncio.run(service.register_async("testuser", "password123"))
+        
+        with pytest.raises(ValueError, match="Username atau password salah"):
+            asyncio.run(service.login_async("testuser", "wrongpassword"))
+        pool.shutdown()
+
+
+    def test_repository_tidak_dipanggil_di_event_loop(self):
+        import threading
+        
+        class RepoTercatat(InMemoryAuthRepository):
+            def __init__(self):
+                super().__init__()
+                self.thread = []
+            
+            def username_exists(self, username):
+                self.thread.append(threading.get_ident())
+                return super().username_exists(username)
+            
+            def get_by_username(self, username):
+                self.thread.append(threading.get_ident())
+                return super().get_by_username(username)
+            
+            def save(self, akun):
+                self.thread.append(threading.get_ident())
+                return super().save(akun)
+        
+        pool = HashingPool(max_workers=1, max_antrian=4)
+        repo = RepoTercatat()
+        service = AuthService(repo, InMemoryUserRepository(), hashing_pool=pool)
+        
+        async def skenario():
+            await service.register_async("testuser", "password123")
+            await service.login_async("testuser", "password123")
+            return threading.get_ident()
+        
+        loop_thread = asyncio.run(skenario())
+        assert len(repo.thread) >= 5
+        assert loop_thread not in repo.thread
+        pool.shutdown()
+
+
+class TestHashingPool:
+    def test_rejects_when_queue_full(self):
+        import threading
+        
+        pool = HashingPool(max_workers=1, max_antrian=0)
+        lepas = threading.Event()
+        
+        async def skenario():
+            pertama = asyncio.ensure_future(pool.jalankan(lepas.wait))
+            await asyncio.sleep(0)
+            with pytest.raises(HashingPoolPenuh):
+                await pool.jalankan(lambda: None)
+            lepas.set()
+            await pertama
+        
+        asyncio.run(skenario())
+        stats = pool.stats()
+        assert stats["ditolak"] == 1
+        assert stats["selesai"] == 1
+        assert stats["mengantre"] == 0
+        assert stats["berjalan"] == 0
+        pool.shutdown()
+
+
+class TestPasswordHashing:
+    @pytest.mark.parametrize("hasher", [
+        BcryptHasher(rounds=4),
+        ScryptHasher(ln=4),
+        Pbkdf2Hasher(iterasi=10),
+    ])
+    def test_hash_round_trip(self, hasher):
+        hashed = hasher.hash("password123")
+        
+        assert hasher.cocok_format(hashed)
+        assert hasher.verify("password123", hashed)
+        assert not hasher.verify("wrongpassword", hashed)
+        assert not hasher.perlu_rehash(hashed)
+    
+    def test_hasher_tidak_lengkap_gagal_saat_dibuat(self):
+        from manajemen_parkir.application.password_hasher import PasswordHasher
+        
+        class TanpaRehash(PasswordHasher):
+            def hash(self, password):
+                return password
+            
+            def verify(self, password, hashed):
+                return password == hashed
+            
+            def cocok_format(self, hashed):
+                return True
+        
+        with pytest.raises(TypeError):
+            TanpaRehash()
+        with pytest.raises(TypeError):
+            PasswordHasher()
+    
+    def test_hash_carries_parameters(self):
+        assert ScryptHasher(ln=4).hash("pw").startswith("$scrypt$ln=4,r=8,p=1$")
+        assert Pbkdf2Hasher(iterasi=10).hash("pw").startswith("$pbkdf2-sha256$10$")
+        assert BcryptHasher(rounds=5).hash("pw").startswith("$2b$05$")
+    
+    def test_perlu_rehash_when_cost_changes(self):
+        lama = buat_password_hashing("bcrypt", bcrypt_rounds=4)
+        baru = buat_password_hashing("bcrypt", bcrypt_rounds=5)
+        hashed = lama.hash("password123")
+        
+        assert not lama.perlu_rehash(hashed)
+        assert baru.perlu_rehash(hashed)
+        assert baru.verify("password123", hashed)
+    
+    def test_login_rehashes_to_current_policy(self):
+        auth_repo = InMemoryAuthRepository()
+        lama = AuthService(auth_repo, password_hashing=buat_password_hashing("pbkdf2_sha256", pbkdf2_iterasi=10))
+        baru = AuthService(auth_repo, password_hashing=buat_password_hashing("scrypt", scrypt_ln=4))
+        lama.register("testuser", "password123")
+        
+        baru.login("testuser", "password123")
+        
+        stored = auth_repo.get_by_username("testuser").kredensial.password_hash
+        assert stored.startswith("$scrypt$ln=4,")
+        assert baru.login("testuser", "password123").token
+    
+    def test_login_migrates_legacy_sha256(self):
+        import hashlib
+        
+        auth_repo = InMemoryAuthRepository()
+        auth_repo.save(Akun.create("legacy", hashlib.sha256(b"password123").hexdigest()))
+        service = AuthService(auth_repo, password_hashing=buat_password_hashing("pbkdf2_sha256", pbkdf2_iterasi=10))
+        
+        service.login("legacy", "password123")
+        
+        stored = auth_repo.get_by_username("legacy").kredensial.password_hash
+        assert stored.startswith("$pbkdf2-sha256$10$")
+    
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError, match="tidak dikenal"):
+            buat_password_hashing("md5")
+
+
+class TestTokenCodec:
+    def test_codec_selected_once(self):
+        service1 = AuthService(InMemoryAuthRepository())
+        service2 = AuthService(InMemoryAuthRepository())
+        
+        assert service1.token_codec is service2.token_codec
+        assert service1.token_codec.nama == "python-jose"
+    
+    def test_codec_round_trip(self):
+        service = AuthService(InMemoryAuthRepository())
+        token = service._create_access_token({"sub": "testuser"})
+        
+        payload = service._decode_token(token)
+        assert payload["sub"] == "testuser"
+        assert "exp" in payload
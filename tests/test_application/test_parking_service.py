@@ -1,14 +1,25 @@
 import pytest
-from datetime import datetime
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 from manajemen_parkir.domain.auth import Peran
-from manajemen_parkir.domain.alokasi_slot import StatusSlot
+from manajemen_parkir.domain.alokasi_slot import Koordinat, StatusKetersediaan, StatusSlot
+from manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from manajemen_parkir.domain.value_objects import NomorPlat
 from manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository
 from manajemen_parkir.infrastructure.user_repository import InMemoryUserRepository
 from manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository
 from manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
-from manajemen_parkir.application.services import ParkingService, AuthService
+from manajemen_parkir.application.services import (
+    AuthService,
+    KendaraanTidakDitemukan,
+    ParkingService,
+    SlotTidakDitemukan,
+    SlotTidakTersedia,
+)
 from manajemen_parkir.application.slot_service import SlotParkirService
 
 
@@ -87,6 +98,74 @@ class TestParkingService:
                 slot_id=self.slot.id
             )
     
+    def test_start_parking_tanpa_slot_pilih_terdekat(self):
+        jauh = self.slot_service.buat_slot(lantai=1, posisi_x=0.0, posisi_y=0.0)
+        dekat = self.slot_service.buat_slot(lantai=1, posisi_x=48.0, posisi_y=50.0)
+        
+        sesi = self.parking_service.start_parking(
+            user_id=self.user.id,
+            vehicle_id=self.user.vehicles[0].id,
+            slot_id=None,
+            pintu_masuk=Koordinat(lantai=1, posisi_x=50.0, posisi_y=50.0)
+        )
+        
+        assert sesi.slot_id == dekat.id
+        assert dekat.status_ketersediaan.status == StatusSlot.TERISI
+        assert jauh.status_ketersediaan.status == StatusSlot.TERSEDIA
+    
+    def test_start_parking_tanpa_slot_saat_penuh(self):
+        self.slot.tandai_terisi()
+        
+        sesi = self.parking_service.start_parking(
+            user_id=self.user.id,
+            vehicle_id=self.user.vehicles[0].id,
+            slot_id=None,
+            pintu_masuk=Koordinat(lantai=1, posisi_x=0.0, posisi_y=0.0)
+        )
+        
+        assert sesi.slot_id is None
+    
+    def test_start_parking_batch_hasil_per_item(self):
+        vehicle_id = self.user.vehicles[0].id
+        kedua = self.slot_service.buat_slot(lantai=1, posisi_x=0.0, posisi_y=0.0)
+        
+        hasil = self.parking_service.start_parking_batch([
+            (vehicle_id, self.slot.id, None),
+            (vehicle_id, self.slot.id, None),
+            (uuid4(), kedua.id, None),
+            (vehicle_id, uuid4(), None),
+            (vehicle_id, None, Koordinat(lantai=1, posisi_x=0.0, posisi_y=0.0)),
+        ])
+        
+        assert hasil[0].slot_id == self.slot.id
+        assert hasil[0].owner_id == self.user.id
+        assert isinstance(hasil[1], SlotTidakTersedia)
+        assert isinstance(hasil[2], KendaraanTidakDitemukan)
+        assert isinstance(hasil[3], SlotTidakDitemukan)
+        assert hasil[4].slot_id == kedua.id
+        assert len(self.sesi_repo.list_active_by_owner(self.user.id)) == 2
+    
+    def test_start_parking_batch_cari_kendaraan_sekali(self):
+        dipanggil = []
+        asli = self.user_repo.find_by_vehicle_id
+        self.user_repo.find_by_vehicle_id = lambda vid: dipanggil.append(vid) or asli(vid)
+        vehicle_id = self.user.vehicles[0].id
+        
+        hasil = self.parking_service.start_parking_batch([(vehicle_id, None, None)] * 5)
+        
+        assert all(sesi.vehicle_id == vehicle_id for sesi in hasil)
+        assert dipanggil == [vehicle_id]
+    
+    def test_end_parking_batch_hasil_per_item(self):
+        sesi = self.parking_service.start_parking(self.user.id, self.user.vehicles[0].id, self.slot.id)
+        
+        hasil = self.parking_service.end_parking_batch([sesi.id_sesi, sesi.id_sesi, uuid4()])
+        
+        assert hasil[0].waktu_keluar is not None
+        assert str(hasil[1]) == "Sesi parkir sudah selesai"
+        assert str(hasil[2]) == "Sesi parkir tidak ditemukan"
+        assert self.slot.status_ketersediaan.status == StatusSlot.TERSEDIA
+    
     def test_end_parking_success(self):
         sesi = self.parking_service.start_parking(
             user_id=self.user.id,
@@ -150,6 +229,28 @@ class TestParkingService:
         assert len(history) == 1
         assert history[0].waktu_keluar is not None
     
+    def test_end_parking_memakai_tarif_tipe_kendaraan(self):
+        from decimal import Decimal
+        from manajemen_parkir.domain.tariff import DaftarTarif, TarifParkir, TipeKendaraan
+        
+        motor = TarifParkir.create(
+            nama="Motor", tipe_kendaraan=TipeKendaraan.MOTOR, harga_per_jam=Decimal("2000")
+        )
+        service = ParkingService(
+            self.sesi_repo, self.user_repo, self.slot_repo, DaftarTarif(tarif=[motor])
+        )
+        sesi = service.start_parking(
+            user_id=self.user.id,
+            vehicle_id=self.user.vehicles[0].id,
+            slot_id=self.slot.id
+        )
+        assert service.tarif_untuk(sesi) is motor
+        sesi.waktu_masuk -= timedelta(minutes=130)
+        
+        sesi = service.end_parking(sesi.id_sesi)
+        
+        assert sesi.biaya_final.jumlah == Decimal("6000")
+    
     def test_calculate_parking_fee(self):
         sesi = self.parking_service.start_parking(
             user_id=self.user.id,
@@ -159,3 +260,197 @@ class TestParkingService:
         
         fee = self.parking_service.calculate_parking_fee(sesi.id_sesi)
         assert fee >= 0
+        assert fee == 3000
+        
+        sesi = self.parking_service.end_parking(sesi.id_sesi)
+        assert self.parking_service.calculate_parking_fee(sesi.id_sesi) == sesi.biaya_final.jumlah
+    
+    def test_kutip_biaya_tanpa_mengubah_sesi_dan_dicache_per_jam(self):
+        from manajemen_parkir.application.services import SesiSudahSelesai
+        
+        sesi = self.parking_service.start_parking(
+            user_id=self.user.id,
+            vehicle_id=self.user.vehicles[0].id,
+            slot_id=self.slot.id
+        )
+        sesi.waktu_masuk = datetime(2024, 1, 1, 8, 0)
+        cache = self.parking_service.cache_kutipan
+        
+        kutipan = self.parking_service.kutip_biaya(sesi.id_sesi, datetime(2024, 1, 1, 9, 10))
+        assert kutipan.sen == 600000
+        assert kutipan.berlaku_sampai == datetime(2024, 1, 1, 10, 0)
+        assert sesi.status == StatusSesi.AKTIF
+        assert sesi.waktu_keluar is None and sesi.biaya_final is None
+        
+        for menit in (11, 30, 59):
+            ulang = self.parking_service.kutip_biaya(sesi.id_sesi, datetime(2024, 1, 1, 9, menit))
+            assert ulang.sen == 600000
+            assert ulang.dihitung_pada == datetime(2024, 1, 1, 9, menit)
+        assert cache.hits == 3 and cache.misses == 1
+        
+        # jam tertagih berikutnya: dihitung ulang
+        kutipan = self.parking_service.kutip_biaya(sesi.id_sesi, datetime(2024, 1, 1, 10, 0, 1))
+        assert kutipan.sen == 900000
+        assert cache.misses == 2
+        # harga berubah: penghitung lama tidak dipakai lagi
+        self.parking_service.tarif.price_per_hour = 4000.0
+        assert self.parking_service.kutip_biaya(sesi.id_sesi, datetime(2024, 1, 1, 10, 5)).sen == 1200000
+        # batas harian membuat tengah malam menjadi batas kutipan
+        kutipan = self.parking_service.kutip_biaya(sesi.id_sesi, datetime(2024, 1, 1, 23, 30))
+        assert kutipan.sen == 5000000
+        assert kutipan.berlaku_sampai == datetime(2024, 1, 2)
+        
+        self.parking_service.end_parking(sesi.id_sesi)
+        with pytest.raises(SesiSudahSelesai):
+            self.parking_service.kutip_biaya(sesi.id_sesi)
+        with pytest.raises(ValueError, match="tidak ditemukan"):
+            self.parking_service.kutip_biaya(uuid4())
+    
+    def test_ekspor_per_blok_dengan_filter(self):
+        awal = datetime(2024, 3, 1)
+        owner_lain = uuid4()
+        for i in range(7):
+            sesi = SesiParkir(
+                nomor_plat=NomorPlat(f"B {i} X"),
+                waktu_masuk=awal + timedelta(days=i),
+                owner_id=self.user.id if i % 2 == 0 else owner_lain,
+                status=StatusSesi.SELESAI if i < 5 else StatusSesi.AKTIF,
+            )
+            self.sesi_repo.save(sesi)
+        
+        blok_blok = list(self.parking_service.ekspor(ukuran_blok=3))
+        assert [len(b) for b in blok_blok] == [3, 3, 1]
+        
+        hasil = [
+            s.nomor_plat.kode
+            for blok in self.parking_service.ekspor(
+                dari=awal + timedelta(days=1),
+                sampai=awal + timedelta(days=6),
+                status=StatusSesi.SELESAI,
+                owner_id=self.user.id,
+                ukuran_blok=1,
+            )
+            for s in blok
+        ]
+        assert hasil == ["B 2 X", "B 4 X"]
+        assert list(self.parking_service.ekspor(owner_id=uuid4())) == []
+
+
+class TestParkingServiceKonkuren:
+    JUMLAH_SLOT = 200
+    PERCOBAAN_PER_SLOT = 10
+    
+    def setup_method(self):
+        self.slot_repo = InMemorySlotParkirRepository()
+        self.sesi_repo = InMemorySesiParkirRepository()
+        self.service = ParkingService(self.sesi_repo, None, self.slot_repo)
+        self.slot_service = SlotParkirService(self.slot_repo)
+        self.slots = [
+            self.slot_service.buat_slot(lantai=i % 4, posisi_x=float(i), posisi_y=0.0)
+            for i in range(self.JUMLAH_SLOT)
+        ]
+    
+    @pytest.fixture(autouse=True)
+    def perlambat_transisi(self, monkeypatch):
+        # Jeda di antara cek status dan pengisian slot membuat race
+        # check-then-set hampir pasti terjadi bila reservasi tidak atomik
+        terisi = StatusKetersediaan.terisi
+        
+        def terisi_lambat():
+            time.sleep(0.001)
+            return terisi()
+        
+        monkeypatch.setattr(StatusKetersediaan, "terisi", staticmethod(terisi_lambat))
+    
+    def _check_in(self, i):
+        slot = self.slots[i % self.JUMLAH_SLOT]
+        try:
+            return self.service.start_parking(uuid4(), uuid4(), slot.id)
+        except SlotTidakTersedia:
+            return None
+    
+    def test_ribuan_check_in_paralel_tidak_double_booking(self):
+        percobaan = self.JUMLAH_SLOT * self.PERCOBAAN_PER_SLOT
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            hasil = [sesi for sesi in pool.map(self._check_in, range(percobaan)) if sesi]
+        
+        per_slot = Counter(sesi.slot_id for sesi in hasil)
+        assert len(hasil) == self.JUMLAH_SLOT
+        assert max(per_slot.values()) == 1
+        assert self.slot_repo.count_terisi() == self.JUMLAH_SLOT
+        assert self.slot_repo.count_tersedia() == 0
+        assert len(self.sesi_repo.list_active()) == self.JUMLAH_SLOT
+    
+    def test_alokasi_otomatis_paralel_tidak_double_booking(self):
+        pintu = Koordinat(lantai=0, posisi_x=0.0, posisi_y=0.0)
+        
+        def check_in(_):
+            return self.service.start_parking(uuid4(), uuid4(), None, pintu)
+        
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            hasil = list(pool.map(check_in, range(self.JUMLAH_SLOT + 50)))
+        
+        dapat_slot = [sesi.slot_id for sesi in hasil if sesi.slot_id is not None]
+        assert len(dapat_slot) == len(set(dapat_slot)) == self.JUMLAH_SLOT
+        assert self.slot_repo.count_tersedia() == 0
+    
+    def test_check_in_dan_check_out_paralel_konsisten(self):
+        aktif = [self.service.start_parking(uuid4(), uuid4(), slot.id) for slot in self.slots[::2]]
+        
+        def kerja(i):
+            if i < len(aktif):
+                self.service.end_parking(aktif[i].id_sesi)
+                return None
+            return self._check_in(i)
+        
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            hasil = [sesi for sesi in pool.map(kerja, range(len(aktif) + 2000)) if sesi]
+        
+        per_slot = Counter(sesi.slot_id for sesi in hasil)
+        assert max(per_slot.values()) == 1
+        assert self.slot_repo.count_terisi() == len(hasil)
+        assert self.slot_repo.count_terisi() + self.slot_repo.count_tersedia() == self.JUMLAH_SLOT
+        per_lantai = self.slot_repo.count_per_lantai()
+        assert sum(c["TERISI"] for c in per_lantai.values()) == len(hasil)
+    
+    def test_check_out_bersamaan_tidak_menimpa_biaya_pemenang(self):
+        import itertools
+        import threading
+        
+        class TarifBerbeda:
+            """Tiap check-out mendapat biaya berbeda dan menunggu yang lain."""
+            
+            def __init__(self):
+                self.urutan = itertools.count(1)
+                self.bertemu = threading.Barrier(2)
+            
+            def hitung_sen(self, masuk, keluar):
+                sen = next(self.urutan) * 100000
+                self.bertemu.wait(timeout=5)
+                return sen
+        
+        class DaftarSatuTarif:
+            def __init__(self, tarif):
+                self.bawaan = tarif
+            
+            def pilih(self, tipe_kendaraan, jenis_tarif=None):
+                return self.bawaan
+        
+        for slot in self.slots[:20]:
+            service = ParkingService(self.sesi_repo, None, self.slot_repo, DaftarSatuTarif(TarifBerbeda()))
+            sesi = service.start_parking(uuid4(), uuid4(), slot.id)
+            
+            def check_out(_):
+                try:
+                    return service.end_parking(sesi.id_sesi)
+                except ValueError:
+                    return None
+            
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                hasil = [s for s in pool.map(check_out, range(2)) if s is not None]
+            
+            assert len(hasil) == 1
+            tersimpan = self.sesi_repo.get_by_id(sesi.id_sesi)
+            assert tersimpan.biaya_final == hasil[0].biaya_final
+            assert tersimpan.waktu_keluar == hasil[0].waktu_keluar
+            assert slot.status_ketersediaan.status == StatusSlot.TERSEDIA
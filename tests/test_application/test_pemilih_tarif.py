@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from src.manajemen_parkir.application.pemilih_tarif import PemilihTarif
+from src.manajemen_parkir.domain.tariff import JenisTarif, TarifParkir, TipeKendaraan
+from src.manajemen_parkir.infrastructure.tarif_repository import InMemoryTarifParkirRepository
+
+
+class _RepoTercatat(InMemoryTarifParkirRepository):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jumlah_cari = 0
+
+    def cari_aktif(self, tipe_kendaraan, jenis_tarif):
+        self.jumlah_cari += 1
+        return super().cari_aktif(tipe_kendaraan, jenis_tarif)
+
+
+def _tarif(tipe, harga, jenis=JenisTarif.REGULER):
+    return TarifParkir.create(
+        nama=f"Tarif {tipe.value}", tipe_kendaraan=tipe, harga_per_jam=Decimal(harga), jenis_tarif=jenis
+    )
+
+
+class TestPemilihTarif:
+    def test_cache_per_tipe_dan_jenis(self):
+        motor = _tarif(TipeKendaraan.MOTOR, "2000")
+        premium = _tarif(TipeKendaraan.MOBIL, "9000", JenisTarif.PREMIUM)
+        repo = _RepoTercatat([motor, premium])
+        pemilih = PemilihTarif(repo)
+
+        for _ in range(3):
+            assert pemilih.pilih("Motor") is motor
+            assert pemilih.pilih(" motor ") is motor
+            assert pemilih.pilih("mobil", JenisTarif.PREMIUM) is premium
+            assert pemilih.pilih("MOBIL") is pemilih.bawaan
+            assert pemilih.pilih(None) is pemilih.bawaan
+            assert pemilih.pilih("truk") is pemilih.bawaan
+        # satu pencarian per kombinasi yang dikenal, tipe tak dikenal tidak ditanyakan
+        assert repo.jumlah_cari == 3
+
+    def test_cache_dibuang_saat_tarif_berubah(self):
+        motor = _tarif(TipeKendaraan.MOTOR, "2000")
+        repo = _RepoTercatat([motor])
+        pemilih = PemilihTarif(repo)
+        assert pemilih.pilih("MOTOR") is motor
+
+        motor.nonaktifkan()
+        assert pemilih.pilih("MOTOR") is pemilih.bawaan
+        motor.aktifkan()
+        assert pemilih.pilih("MOTOR") is motor
+
+        motor.update_harga(Decimal("2500"))
+        jumlah = repo.jumlah_cari
+        assert pemilih.pilih("MOTOR") is motor
+        assert repo.jumlah_cari == jumlah + 1
+
+        mobil = repo.save(_tarif(TipeKendaraan.MOBIL, "5000"))
+        assert pemilih.pilih("MOBIL") is mobil
+        repo.delete(mobil.id)
+        assert pemilih.pilih("MOBIL") is pemilih.bawaan
@@ -0,0 +1,52 @@
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from src.manajemen_parkir.application.penjadwal_arsip import PenjadwalArsip
+from src.manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from src.manajemen_parkir.domain.value_objects import BiayaFinal, NomorPlat
+from src.manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
+
+
+def _selesai(menit_lalu):
+    keluar = datetime.utcnow() - timedelta(minutes=menit_lalu)
+    return SesiParkir(
+        nomor_plat=NomorPlat("B1111", "MOBIL"),
+        waktu_masuk=keluar - timedelta(hours=1),
+        waktu_keluar=keluar,
+        status=StatusSesi.SELESAI,
+        biaya_final=BiayaFinal(jumlah=Decimal("3000")),
+    )
+
+
+class TestPenjadwalArsip:
+    def test_hanya_sesi_yang_cukup_lama_selesai(self):
+        repo = InMemorySesiParkirRepository()
+        lama, baru = _selesai(120), _selesai(5)
+        repo.save(lama)
+        repo.save(baru)
+
+        assert PenjadwalArsip(repo, interval_detik=0, umur_menit=60).jalankan_sekali() == 1
+        assert repo.jumlah_arsip() == 1
+        assert repo.get_by_id(baru.id_sesi) is baru
+
+    def test_thread_berkala_bisa_dihentikan(self):
+        repo = InMemorySesiParkirRepository()
+        repo.save(_selesai(120))
+        penjadwal = PenjadwalArsip(repo, interval_detik=0.01, umur_menit=60)
+
+        penjadwal.mulai()
+        try:
+            batas = time.monotonic() + 5
+            while repo.jumlah_arsip() == 0 and time.monotonic() < batas:
+                time.sleep(0.01)
+        finally:
+            penjadwal.berhenti()
+
+        assert repo.jumlah_arsip() == 1
+        assert penjadwal._thread is None
+
+    def test_interval_nol_tidak_memulai_thread(self):
+        penjadwal = PenjadwalArsip(InMemorySesiParkirRepository(), interval_detik=0)
+        penjadwal.mulai()
+        assert penjadwal._thread is None
@@ -31,6 +31,66 @@ class TestSlotParkirService:
         assert slot.sensor is not None
         assert slot.sensor.tipe == TipeSensor.KAMERA
     
+    def test_buat_slot_massal(self):
+        repo = InMemorySlotParkirRepository()
+        service = SlotParkirService(repo)
+        
+        slots = service.buat_slot_massal([
+            {"lantai": 1, "posisi_x": 0.0, "posisi_y": 0.0},
+            {"lantai": 2, "posisi_x": 0.0, "posisi_y": 0.0, "tipe_sensor": "KAMERA"},
+        ])
+        
+        assert len(slots) == 2
+        assert slots[1].sensor.tipe == TipeSensor.KAMERA
+        assert repo.count_total() == 2
+        assert repo.count_per_lantai()[2]["TERSEDIA"] == 1
+    
+    def test_buat_slot_massal_validasi_sebelum_simpan(self):
+        repo = InMemorySlotParkirRepository()
+        service = SlotParkirService(repo)
+        
+        with pytest.raises(ValueError, match="Slot ke-1: Tipe sensor tidak valid"):
+            service.buat_slot_massal([
+                {"lantai": 1, "posisi_x": 0.0, "posisi_y": 0.0},
+                {"lantai": 1, "posisi_x": 1.0, "posisi_y": 0.0, "tipe_sensor": "RADAR"},
+            ])
+        with pytest.raises(ValueError, match="Slot ke-1: .*duplikat"):
+            service.buat_slot_massal([
+                {"lantai": 1, "posisi_x": 0.0, "posisi_y": 0.0},
+                {"lantai": 1, "posisi_x": 0.0, "posisi_y": 0.0},
+            ])
+        with pytest.raises(ValueError, match="Slot ke-0: Lantai tidak boleh negatif"):
+            service.buat_slot_massal([{"lantai": -1, "posisi_x": 0.0, "posisi_y": 0.0}])
+        with pytest.raises(ValueError, match="tidak boleh kosong"):
+            service.buat_slot_massal([])
+        
+        assert repo.count_total() == 0
+    
+    def test_buat_slot_grid(self):
+        repo = InMemorySlotParkirRepository()
+        service = SlotParkirService(repo)
+        
+        slots = service.buat_slot_grid(
+            lantai=3, baris=4, kolom=25, jarak_x=2.5, jarak_y=5.0,
+            asal_x=10.0, tipe_sensor="ULTRASONIK"
+        )
+        
+        assert len(slots) == 100
+        assert (slots[0].koordinat.posisi_x, slots[0].koordinat.posisi_y) == (10.0, 0.0)
+        assert (slots[-1].koordinat.posisi_x, slots[-1].koordinat.posisi_y) == (10.0 + 24 * 2.5, 15.0)
+        assert all(slot.sensor.tipe == TipeSensor.ULTRASONIK for slot in slots)
+        assert repo.count_per_lantai() == {3: {"total": 100, "TERSEDIA": 100, "TERISI": 0, "RUSAK": 0}}
+    
+    def test_buat_slot_grid_tidak_valid(self):
+        service = SlotParkirService(InMemorySlotParkirRepository())
+        
+        with pytest.raises(ValueError, match="minimal 1"):
+            service.buat_slot_grid(lantai=1, baris=0, kolom=5, jarak_x=1.0, jarak_y=1.0)
+        with pytest.raises(ValueError, match="harus positif"):
+            service.buat_slot_grid(lantai=1, baris=2, kolom=5, jarak_x=0.0, jarak_y=1.0)
+        with pytest.raises(ValueError, match="Maksimal"):
+            service.buat_slot_grid(lantai=1, baris=200, kolom=200, jarak_x=1.0, jarak_y=1.0)
+    
     def test_buat_slot_invalid_sensor(self):
         repo = InMemorySlotParkirRepository()
         service = SlotParkirService(repo)
@@ -68,6 +128,37 @@ class TestSlotParkirService:
         with pytest.raises(ValueError, match="Slot parkir tidak ditemukan"):
             service.update_status_slot(uuid4(), "TERISI")
     
+    def test_update_status_rusak_tidak_bisa_diisi(self):
+        repo = InMemorySlotParkirRepository()
+        service = SlotParkirService(repo)
+        
+        slot = service.buat_slot(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        service.update_status_slot(slot.id, "RUSAK")
+        
+        with pytest.raises(ValueError, match="Slot rusak tidak bisa diisi"):
+            service.update_status_slot(slot.id, "TERISI")
+        assert repo.count_rusak() == 1
+    
+    def test_update_status_dibaca_ulang_bila_keduluan_check_in(self):
+        class RepoDisela(InMemorySlotParkirRepository):
+            disela = False
+            
+            def ubah_status_jika(self, slot_id, diharapkan, baru):
+                if not self.disela:
+                    # check-in lain mereservasi slot setelah service membaca statusnya
+                    self.disela = True
+                    self.reservasi(slot_id)
+                return super().ubah_status_jika(slot_id, diharapkan, baru)
+        
+        repo = RepoDisela()
+        service = SlotParkirService(repo)
+        slot = service.buat_slot(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        
+        updated = service.update_status_slot(slot.id, "RUSAK")
+        
+        assert updated.status_ketersediaan.status == StatusSlot.RUSAK
+        assert (repo.count_terisi(), repo.count_rusak()) == (0, 1)
+    
     def test_update_status_invalid(self):
         repo = InMemorySlotParkirRepository()
         service = SlotParkirService(repo)
@@ -0,0 +1,144 @@
+"""Benchmark memori entitas domain.
+
+Riwayat sesi disimpan di memori dalam jumlah besar, jadi ukuran per objek
+dipantau di sini. Angka dicetak saat tes berjalan dan batasnya diberi
+ruang sekitar 10% di atas hasil pengukuran saat ini.
+"""
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from src.manajemen_parkir.domain.alokasi_slot import (
+    Koordinat, Sensor, SlotParkir, StatusKetersediaan, TipeSensor,
+)
+from src.manajemen_parkir.domain.auth import Akun
+from src.manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from src.manajemen_parkir.domain.tariff import ParkingTariff
+from src.manajemen_parkir.domain.user import User, Vehicle
+from src.manajemen_parkir.domain.value_objects import BiayaFinal, Durasi, NomorPlat
+from src.manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
+from src.manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository
+
+N = 10_000
+TARIF = ParkingTariff(price_per_hour=3000.0)
+
+
+def _bytes_per_item(buat, n=N):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        awal = tracemalloc.get_traced_memory()[0]
+        items = [buat(i) for i in range(n)]
+        akhir = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (akhir - awal) / n, items
+
+
+def _sesi_selesai(i):
+    sesi = SesiParkir(
+        nomor_plat=NomorPlat(f"B {i} XY", "MOBIL"),
+        waktu_masuk=datetime.utcnow() - timedelta(minutes=i % 600),
+        owner_id=uuid4(),
+        vehicle_id=uuid4(),
+        slot_id=uuid4(),
+    )
+    sesi.check_out(TARIF)
+    return sesi
+
+
+def _riwayat(n, sesi_per_kendaraan=50, jumlah_slot=500):
+    """Sesi selesai dengan owner, kendaraan dan slot yang berulang."""
+    kendaraan = [(uuid4(), uuid4(), f"B {i} XY") for i in range(n // sesi_per_kendaraan)]
+    slots = [uuid4() for _ in range(jumlah_slot)]
+    awal = datetime(2024, 1, 1, 6, 0)
+
+    def buat(i):
+        owner_id, vehicle_id, plat = kendaraan[i % len(kendaraan)]
+        masuk = awal + timedelta(seconds=37 * i, microseconds=i)
+        menit = 15 + i % 600
+        return SesiParkir(
+            nomor_plat=NomorPlat(plat, "MOBIL"),
+            waktu_masuk=masuk,
+            waktu_keluar=masuk + timedelta(minutes=menit),
+            status=StatusSesi.SELESAI,
+            durasi=Durasi(total_menit=menit),
+            biaya_final=BiayaFinal(jumlah=Decimal(3000 * (menit // 60 + 1))),
+            owner_id=owner_id,
+            vehicle_id=vehicle_id,
+            slot_id=slots[i % jumlah_slot],
+        )
+    return buat
+
+
+def _slot(i):
+    sensor = Sensor.create(TipeSensor.KAMERA) if i % 2 else None
+    return SlotParkir.create(i % 5, float(i), 0.0, sensor=sensor)
+
+
+def _lapor(capsys, record_property, nama, nilai):
+    record_property(nama, round(nilai))
+    with capsys.disabled():
+        print(f"\n  {nama}: {nilai:.0f} bytes")
+
+
+class TestMemoriDomain:
+    @pytest.mark.parametrize("obj", [
+        Koordinat(1, 0.0, 0.0),
+        StatusKetersediaan.tersedia(),
+        Sensor.create(TipeSensor.KAMERA),
+        SlotParkir.create(1, 0.0, 0.0),
+        SesiParkir(nomor_plat=NomorPlat("B 1 XY")),
+        Vehicle.create("B 1 XY", "MOBIL"),
+        User.create("Budi"),
+        Akun.create("budi", "hash"),
+    ], ids=lambda obj: type(obj).__name__)
+    def test_entitas_tanpa_dict(self, obj):
+        assert not hasattr(obj, "__dict__")
+
+    def test_bytes_per_sesi(self, capsys, record_property):
+        per_sesi, sessions = _bytes_per_item(_sesi_selesai)
+
+        repo = InMemorySesiParkirRepository()
+        per_simpan, _ = _bytes_per_item(lambda i: repo.save(sessions[i]), len(sessions))
+
+        _lapor(capsys, record_property, "bytes/sesi", per_sesi)
+        _lapor(capsys, record_property, "bytes/sesi di repository", per_sesi + per_simpan)
+        assert per_sesi < 800
+        assert per_sesi + per_simpan < 1250
+
+    def test_bytes_per_slot(self, capsys, record_property):
+        per_slot, slots = _bytes_per_item(_slot)
+
+        repo = InMemorySlotParkirRepository()
+        per_simpan, _ = _bytes_per_item(lambda i: repo.save(slots[i]), len(slots))
+
+        _lapor(capsys, record_property, "bytes/slot", per_slot)
+        _lapor(capsys, record_property, "bytes/slot di repository", per_slot + per_simpan)
+        assert per_slot < 640
+        assert per_slot + per_simpan < 1450
+
+    def test_arsip_sepuluh_kali_lebih_hemat(self, capsys, record_property):
+        buat = _riwayat(N)
+        repo = InMemorySesiParkirRepository()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            awal = tracemalloc.get_traced_memory()[0]
+            for i in range(N):
+                repo.save(buat(i))
+            gc.collect()
+            panas = (tracemalloc.get_traced_memory()[0] - awal) / N
+            assert repo.arsipkan() == N
+            gc.collect()
+            arsip = (tracemalloc.get_traced_memory()[0] - awal) / N
+        finally:
+            tracemalloc.stop()
+
+        _lapor(capsys, record_property, "bytes/sesi di repository", panas)
+        _lapor(capsys, record_property, "bytes/sesi di arsip", arsip)
+        assert panas / arsip >= 10
@@ -75,6 +75,23 @@ class TestSesiParkir:
         assert sesi.biaya_final is not None
         assert isinstance(sesi.biaya_final.jumlah, Decimal)
     
+    def test_checkout_biaya_tepat_dari_tarif_parkir(self):
+        from datetime import timedelta
+        from src.manajemen_parkir.domain.tariff import TarifParkir, TipeKendaraan
+        
+        tarif = TarifParkir.create(
+            nama="Motor",
+            tipe_kendaraan=TipeKendaraan.MOTOR,
+            harga_per_jam=Decimal("2500.10"),
+        )
+        sesi = SesiParkir(nomor_plat=NomorPlat(kode="B1234XYZ", tipe_kendaraan="MOTOR"))
+        sesi.waktu_masuk = datetime.utcnow() - timedelta(hours=2, minutes=30)
+        
+        sesi.check_out(tarif)
+        
+        assert sesi.durasi.total_menit == 150
+        assert sesi.biaya_final.jumlah == Decimal("7500.30")
+    
     def test_checkout_already_finished(self):
         nomor_plat = NomorPlat(kode="B1234XYZ")
         sesi = SesiParkir(nomor_plat=nomor_plat)
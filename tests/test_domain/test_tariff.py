@@ -178,3 +178,326 @@ class TestParkingTariffLegacy:
         
         fee = tariff.calculate(checkin, checkout)
         assert fee == 20000.0
+    
+    def test_calculate_sama_dengan_rumus_float_lama(self):
+        import random
+        from datetime import timedelta
+        from math import ceil
+        
+        def lama(tariff, checkin, checkout):
+            hours = max(1, ceil((checkout - checkin).total_seconds() / 3600))
+            fee = hours * tariff.price_per_hour
+            if tariff.max_daily is not None:
+                days = max(1, (checkout.date() - checkin.date()).days + 1)
+                fee = min(fee, days * tariff.max_daily)
+            return float(fee)
+        
+        rng = random.Random(3)
+        awal = datetime(2024, 1, 1)
+        checkins, checkouts = [], []
+        for _ in range(2000):
+            checkin = awal + timedelta(seconds=rng.randrange(86400 * 30), microseconds=rng.randrange(2) * 7)
+            lama_detik = rng.choice([0, 3600, 86400, 86400 * 8]) + rng.randrange(-120, 86400 * 3)
+            checkins.append(checkin)
+            checkouts.append(checkin + timedelta(seconds=lama_detik))
+        
+        for tariff in (
+            ParkingTariff(price_per_hour=3000.0, max_daily=50000.0),
+            ParkingTariff(price_per_hour=2500.0),
+            ParkingTariff(price_per_hour=7000.0, max_daily=20000.0),
+        ):
+            harapan = [lama(tariff, i, o) for i, o in zip(checkins, checkouts)]
+            assert [tariff.calculate(i, o) for i, o in zip(checkins, checkouts)] == harapan
+            assert tariff.calculate_many(checkins, checkouts) == harapan
+    
+    def test_calculate_mengikuti_perubahan_harga(self):
+        tariff = ParkingTariff(price_per_hour=5000.0)
+        checkin = datetime(2024, 1, 1, 10, 0, 0)
+        checkout = datetime(2024, 1, 1, 12, 30, 0)
+        assert tariff.calculate(checkin, checkout) == 15000.0
+        
+        tariff.price_per_hour = 4000.0
+        assert tariff.calculate(checkin, checkout) == 12000.0
+        with pytest.raises(ValueError):
+            tariff.calculate_many([checkin], [])
+
+
+class TestTabelTarif:
+    def test_tabel_sama_dengan_rumus_di_dalam_dan_di_luar_tabel(self):
+        from src.manajemen_parkir.domain.tariff import TabelTarif
+        
+        tabel = TabelTarif(300000, 5000000, jam_tabel=48)
+        for jam in range(0, 200):
+            for hari in range(1, 12):
+                assert tabel.biaya(jam, hari) == tabel.rumus(jam, hari)
+        assert tabel.biaya(20, 1) == 5000000
+        assert tabel.biaya(20, 2) == 6000000
+        assert TabelTarif(300000).biaya(1000, 1) == 300000000
+    
+    def test_tarif_parkir_batas_harian_berlaku_sekali(self):
+        from src.manajemen_parkir.domain.tariff import Durasi as DurasiTarif
+        
+        tarif = TarifParkir.create(
+            nama="Tarif Premium",
+            tipe_kendaraan=TipeKendaraan.MOBIL,
+            harga_per_jam=Decimal("10000"),
+            harga_maksimum_harian=Decimal("50000")
+        )
+        assert tarif.hitung_biaya(DurasiTarif(total_jam=49, total_menit=5)).jumlah == Decimal("50000")
+        assert tarif.hitung_biaya(DurasiTarif(total_jam=0, total_menit=0)).jumlah == Decimal("0")
+        
+        tarif.update_harga(Decimal("2500.50"))
+        biaya = tarif.hitung_biaya(DurasiTarif(total_jam=2, total_menit=0))
+        assert biaya.jumlah == Decimal("5001")
+        assert "REGULER" in biaya.keterangan
+    
+    def test_harga_di_bawah_sen_tetap_exact(self):
+        from src.manajemen_parkir.domain.tariff import Durasi as DurasiTarif
+        
+        tarif = TarifParkir.create(
+            nama="Tarif Aneh",
+            tipe_kendaraan=TipeKendaraan.MOTOR,
+            harga_per_jam=Decimal("1000.125"),
+            harga_maksimum_harian=Decimal("2500.3333")
+        )
+        assert tarif.hitung_biaya(DurasiTarif(total_jam=1, total_menit=30)).jumlah == Decimal("2000.250")
+        biaya = tarif.hitung_biaya(DurasiTarif(total_jam=3, total_menit=0))
+        assert biaya.jumlah == Decimal("2500.3333")
+        assert "maksimum harian" in biaya.keterangan.lower()
+
+
+class TestDaftarTarif:
+    def _tarif(self, tipe, harga, jenis=JenisTarif.REGULER, maks=None):
+        return TarifParkir.create(
+            nama=f"Tarif {tipe.value}",
+            tipe_kendaraan=tipe,
+            harga_per_jam=Decimal(harga),
+            jenis_tarif=jenis,
+            harga_maksimum_harian=Decimal(maks) if maks else None,
+        )
+
+    def test_hitung_sen_sama_untuk_kedua_kelas_tarif(self):
+        import random
+        from datetime import timedelta
+        
+        rng = random.Random(5)
+        tarif = self._tarif(TipeKendaraan.MOBIL, "3000", maks="50000")
+        legacy = ParkingTariff(price_per_hour=3000.0, max_daily=50000.0)
+        awal = datetime(2024, 1, 1)
+        for _ in range(500):
+            masuk = awal + timedelta(seconds=rng.randrange(7 * 86400))
+            keluar = masuk + timedelta(seconds=rng.randrange(4 * 86400), microseconds=rng.randrange(2))
+            assert tarif.hitung_sen(masuk, keluar) == legacy.hitung_sen(masuk, keluar)
+            assert legacy.calculate(masuk, keluar) == legacy.hitung_sen(masuk, keluar) / 100
+    
+    def test_hitung_sen_membulatkan_harga_di_bawah_sen(self):
+        tarif = self._tarif(TipeKendaraan.MOTOR, "1000.125")
+        masuk = datetime(2024, 1, 1, 8)
+        assert tarif.hitung_sen(masuk, datetime(2024, 1, 1, 9, 30)) == 200026
+        # hitung_biaya tetap memakai Decimal penuh
+        from src.manajemen_parkir.domain.tariff import Durasi as DurasiTarif
+        assert tarif.hitung_biaya(DurasiTarif(total_jam=1, total_menit=30)).jumlah == Decimal("2000.250")
+    
+    def test_pilih_per_tipe_dan_jenis(self):
+        from src.manajemen_parkir.domain.tariff import DaftarTarif
+        
+        motor = self._tarif(TipeKendaraan.MOTOR, "2000")
+        mobil_premium = self._tarif(TipeKendaraan.MOBIL, "8000", jenis=JenisTarif.PREMIUM)
+        daftar = DaftarTarif(tarif=[motor, mobil_premium])
+        
+        assert daftar.pilih("Motor") is motor
+        assert daftar.pilih(TipeKendaraan.MOTOR) is motor
+        assert daftar.pilih(" mobil ", JenisTarif.PREMIUM) is mobil_premium
+        assert daftar.pilih("MOBIL") is daftar.bawaan
+        assert daftar.pilih(None) is daftar.bawaan
+        assert daftar.pilih("Truk") is daftar.bawaan
+        assert daftar.bawaan.price_per_hour == 3000.0
+        assert daftar.bawaan.max_daily == 50000.0
+        
+        motor.nonaktifkan()
+        assert daftar.pilih("MOTOR") is daftar.bawaan
+        motor.aktifkan()
+        pengganti = self._tarif(TipeKendaraan.MOTOR, "2500")
+        daftar.daftarkan(pengganti)
+        assert daftar.pilih("MOTOR") is pengganti
+
+
+def _biaya_per_jam(tarif, masuk, keluar):
+    """Rujukan lambat: cari harga untuk setiap jam tertagih satu per satu."""
+    import math
+    from datetime import timedelta
+    
+    geser = timedelta(minutes=tarif.selisih_utc_menit)
+    jam = max(1, math.ceil((keluar - masuk).total_seconds() / 3600))
+    total = 0
+    for k in range(jam):
+        t = masuk + geser + timedelta(hours=k)
+        kemarin = (t - timedelta(days=1)).weekday()
+        harga = tarif.harga_per_jam
+        for j in tarif.jendela:
+            if j.mulai < j.selesai:
+                cocok = t.weekday() in j.hari and j.mulai <= t.time() < j.selesai
+            else:
+                cocok = (t.weekday() in j.hari and t.time() >= j.mulai) or (
+                    kemarin in j.hari and t.time() < j.selesai
+                )
+            if cocok:
+                harga = j.harga_per_jam
+                break
+        total += int(harga * 100)
+    if tarif.harga_maksimum_harian:
+        hari = ((keluar + geser).date() - (masuk + geser).date()).days + 1
+        total = min(total, hari * int(tarif.harga_maksimum_harian * 100))
+    return total
+
+
+class TestJadwalTarif:
+    def _jendela(self):
+        from datetime import time
+        from src.manajemen_parkir.domain.tariff import JendelaTarif
+        
+        return [
+            JendelaTarif("AKHIR_PEKAN", Decimal("4000"), time(0), time(0), frozenset({5, 6})),
+            JendelaTarif("MALAM", Decimal("1000"), time(22), time(6)),
+            JendelaTarif("PUNCAK", Decimal("6000"), time(7, 30), time(9, 15), frozenset(range(5))),
+            JendelaTarif("LEPAS_PUNCAK", Decimal("2500"), time(10), time(16)),
+        ]
+    
+    def test_sama_dengan_perhitungan_per_jam(self):
+        import random
+        from datetime import timedelta
+        
+        rng = random.Random(7)
+        for maks in (None, Decimal("60000")):
+            for selisih in (0, 420):
+                tarif = TarifParkir.create(
+                    nama="Mobil", tipe_kendaraan=TipeKendaraan.MOBIL, harga_per_jam=Decimal("3000"),
+                    harga_maksimum_harian=maks, jendela=self._jendela(), selisih_utc_menit=selisih,
+                )
+                for _ in range(300):
+                    masuk = datetime(2024, 1, 1) + timedelta(
+                        seconds=rng.randrange(14 * 86400), microseconds=rng.randrange(2)
+                    )
+                    lama = rng.choice([7200, 3 * 86400, 20 * 86400])
+                    keluar = masuk + timedelta(seconds=rng.randrange(lama))
+                    assert tarif.hitung_sen(masuk, keluar) == _biaya_per_jam(tarif, masuk, keluar)
+    
+    def test_pekan_penuh_berbiaya_sama(self):
+        from datetime import timedelta
+        from src.manajemen_parkir.domain.tariff import JadwalTarif
+        
+        jadwal = JadwalTarif(self._jendela(), 300000)
+        masuk = datetime(2024, 3, 6, 8, 20)
+        tarif = TarifParkir.create(
+            nama="Mobil", tipe_kendaraan=TipeKendaraan.MOBIL, harga_per_jam=Decimal("3000"),
+            jendela=self._jendela(),
+        )
+        sepekan = tarif.hitung_sen(masuk, masuk + timedelta(weeks=1))
+        sisa = tarif.hitung_sen(masuk, masuk + timedelta(hours=5))
+        assert tarif.hitung_sen(masuk, masuk + timedelta(weeks=52, hours=5)) == 52 * sepekan + sisa
+        assert jadwal.batas[0] == 0 and jadwal.batas[-1] == 7 * 24 * 3_600_000_000
+        assert len(jadwal.batas) == len(jadwal.harga) + 1
+    
+    def test_jendela_tidak_valid(self):
+        from datetime import time
+        from src.manajemen_parkir.domain.tariff import JendelaTarif
+        
+        with pytest.raises(ValueError, match="tidak boleh negatif"):
+            JendelaTarif("X", Decimal("-1"), time(1), time(2))
+        with pytest.raises(ValueError, match="Hari harus"):
+            JendelaTarif("X", Decimal("1"), time(1), time(2), frozenset({7}))
+    
+    def test_atur_jadwal_mengganti_harga_dan_memberi_tahu(self):
+        from datetime import timedelta
+        
+        tarif = TarifParkir.create(
+            nama="Mobil", tipe_kendaraan=TipeKendaraan.MOBIL, harga_per_jam=Decimal("3000")
+        )
+        perubahan = []
+        tarif._pengamat = perubahan.append
+        # Senin 23:00, dua jam di jendela malam
+        masuk = datetime(2024, 1, 1, 23)
+        keluar = masuk + timedelta(hours=2)
+        assert tarif.hitung_sen(masuk, keluar) == 600000
+        
+        tarif.atur_jadwal(self._jendela())
+        assert tarif.hitung_sen(masuk, keluar) == 200000
+        tarif.atur_jadwal(self._jendela(), selisih_utc_menit=480)
+        # Selasa 07:00-09:00 lokal: jam pertama dimulai sebelum puncak 07:30
+        assert tarif.hitung_sen(masuk, keluar) == 300000 + 600000
+        tarif.atur_jadwal([])
+        assert tarif.hitung_sen(masuk, keluar) == 600000
+        assert perubahan == [tarif, tarif, tarif]
+
+
+class TestKutipan:
+    def test_biaya_tetap_sampai_berlaku_sampai(self):
+        import random
+        from datetime import time, timedelta
+        from src.manajemen_parkir.domain.tariff import JendelaTarif
+        
+        rng = random.Random(9)
+        tarif_tarif = [
+            ParkingTariff(price_per_hour=3000.0),
+            ParkingTariff(price_per_hour=3000.0, max_daily=20000.0),
+            TarifParkir.create(
+                nama="Mobil", tipe_kendaraan=TipeKendaraan.MOBIL, harga_per_jam=Decimal("3000"),
+                harga_maksimum_harian=Decimal("20000"), selisih_utc_menit=420,
+                jendela=[JendelaTarif("MALAM", Decimal("1000"), time(22), time(6))],
+            ),
+            TarifParkir.create(
+                nama="Motor", tipe_kendaraan=TipeKendaraan.MOTOR, harga_per_jam=Decimal("3000"),
+                harga_maksimum_harian=Decimal("20000"), selisih_utc_menit=420,
+            ),
+        ]
+        for tarif in tarif_tarif:
+            for _ in range(300):
+                masuk = datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(3 * 86400))
+                sekarang = masuk + timedelta(seconds=rng.randrange(-600, 2 * 86400))
+                sen, sampai = tarif.kutip_sen(masuk, sekarang)
+                assert sampai > sekarang
+                assert sen == tarif.hitung_sen(masuk, sekarang)
+                sebelum = sampai - timedelta(microseconds=1)
+                assert tarif.hitung_sen(masuk, sebelum) == sen
+                assert tarif.hitung_sen(masuk, sekarang + (sebelum - sekarang) / 2) == sen
+    
+    def test_selisih_utc_tanpa_jendela(self):
+        import random
+        from datetime import time, timedelta
+        from src.manajemen_parkir.domain.tariff import JendelaTarif
+        
+        def buat(selisih, jendela=()):
+            return TarifParkir.create(
+                nama="Mobil", tipe_kendaraan=TipeKendaraan.MOBIL, harga_per_jam=Decimal("3000"),
+                harga_maksimum_harian=Decimal("5000"), selisih_utc_menit=selisih, jendela=jendela,
+            )
+        
+        # 23:00-01:30 WIB menyentuh dua hari lokal, tetapi hanya satu hari UTC
+        masuk, keluar = datetime(2024, 1, 1, 16), datetime(2024, 1, 1, 18, 30)
+        assert buat(420).hitung_sen(masuk, keluar) == 900000
+        assert buat(0).hitung_sen(masuk, keluar) == 500000
+        assert buat(420).kutip_sen(masuk, keluar)[1] == datetime(2024, 1, 1, 19)
+        assert buat(420).kutip_sen(masuk, datetime(2024, 1, 1, 16, 30))[1] == datetime(2024, 1, 1, 17)
+        
+        # hari kalender sama dengan jalur berjadwal yang harganya seragam
+        tanpa_jendela = buat(420)
+        berjadwal = buat(420, [JendelaTarif("SIANG", Decimal("3000"), time(9), time(17))])
+        rng = random.Random(5)
+        for _ in range(300):
+            masuk = datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(3 * 86400))
+            keluar = masuk + timedelta(seconds=rng.randrange(1, 3 * 86400))
+            assert tanpa_jendela.hitung_sen(masuk, keluar) == berjadwal.hitung_sen(masuk, keluar)
+    
+    def test_berlaku_sampai(self):
+        from src.manajemen_parkir.domain.tariff import berlaku_sampai
+        
+        masuk = datetime(2024, 1, 1, 22, 40)
+        assert berlaku_sampai(masuk, masuk) == datetime(2024, 1, 1, 23, 40)
+        assert berlaku_sampai(masuk, datetime(2024, 1, 1, 23, 40)) == datetime(2024, 1, 1, 23, 40)
+        assert berlaku_sampai(masuk, datetime(2024, 1, 1, 23, 41)) == datetime(2024, 1, 2, 0, 40)
+        assert berlaku_sampai(masuk, datetime(2024, 1, 1, 23, 41), 0) == datetime(2024, 1, 2)
+        # tengah malam WIB = 17:00 UTC
+        assert berlaku_sampai(masuk, datetime(2024, 1, 1, 23, 41), 420) == datetime(2024, 1, 2, 0, 40)
+        assert berlaku_sampai(
+            datetime(2024, 1, 2, 16, 30), datetime(2024, 1, 2, 16, 45), 420
+        ) == datetime(2024, 1, 2, 17)
@@ -1,14 +1,23 @@
+import math
+import random
+
 import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
 from uuid import UUID, uuid4
 
 from src.manajemen_parkir.infrastructure.auth_repository import InMemoryAuthRepository
 from src.manajemen_parkir.infrastructure.user_repository import InMemoryUserRepository
 from src.manajemen_parkir.infrastructure.slot_repository import InMemorySlotParkirRepository
 from src.manajemen_parkir.infrastructure.repository import InMemorySesiParkirRepository
+from src.manajemen_parkir.infrastructure.tarif_repository import InMemoryTarifParkirRepository
+from src.manajemen_parkir.infrastructure.slot_grid import GridSpasial
+from src.manajemen_parkir.infrastructure.index_urut import IndexUrut
 from src.manajemen_parkir.domain.auth import Akun, Kredensial, Peran
 from src.manajemen_parkir.domain.user import User, Vehicle
-from src.manajemen_parkir.domain.alokasi_slot import SlotParkir, Koordinat
+from src.manajemen_parkir.domain.alokasi_slot import SlotParkir, Koordinat, StatusSlot
 from src.manajemen_parkir.domain.model import SesiParkir
+from src.manajemen_parkir.domain.tariff import JenisTarif, TarifParkir, TipeKendaraan
 from src.manajemen_parkir.domain.value_objects import NomorPlat
 
 
@@ -120,6 +129,71 @@ class TestUserRepository:
         repo = InMemoryUserRepository()
         result = repo.find_by_plate("NOTFOUND")
         assert result is None
+
+    def test_find_by_plate_normalized(self):
+        repo = InMemoryUserRepository()
+        user = User.create("Test User")
+        vehicle = Vehicle.create_legacy("B 1234 xyz", "MOBIL")
+        user.vehicles.append(vehicle)
+        repo.save(user)
+        
+        result = repo.find_by_plate("b1234XYZ")
+        assert result is not None
+        assert result.id == vehicle.id
+    
+    def test_find_by_vehicle_id(self):
+        repo = InMemoryUserRepository()
+        user = User.create("Test User")
+        vehicle = Vehicle.create_legacy("B1234XYZ", "MOBIL")
+        user.vehicles.append(vehicle)
+        repo.save(user)
+        
+        owner, found = repo.find_by_vehicle_id(vehicle.id)
+        assert owner.id == user.id
+        assert found.id == vehicle.id
+        assert repo.find_by_vehicle_id(uuid4()) is None
+    
+    def test_vehicle_index_follows_resave(self):
+        repo = InMemoryUserRepository()
+        user = User.create("Test User")
+        old = Vehicle.create_legacy("B1111AAA", "MOBIL")
+        user.vehicles.append(old)
+        repo.save(user)
+        
+        new = Vehicle.create_legacy("B2222BBB", "MOTOR")
+        user.vehicles = [new]
+        repo.save(user)
+        
+        assert repo.find_by_vehicle_id(old.id) is None
+        assert repo.find_by_plate("B1111AAA") is None
+        assert repo.find_by_vehicle_id(new.id)[1].id == new.id
+        assert repo.find_by_plate("B2222BBB").id == new.id
+    
+    def test_vehicle_index_cleared_on_delete(self):
+        repo = InMemoryUserRepository()
+        user = User.create("Test User")
+        vehicle = Vehicle.create_legacy("B1234XYZ", "MOBIL")
+        user.vehicles.append(vehicle)
+        repo.save(user)
+        
+        repo.delete(user.id)
+        assert repo.find_by_vehicle_id(vehicle.id) is None
+        assert repo.find_by_plate("B1234XYZ") is None
+    
+    def test_find_by_plate_shared_plate_keeps_first(self):
+        repo = InMemoryUserRepository()
+        user1 = User.create("User 1")
+        user2 = User.create("User 2")
+        v1 = Vehicle.create_legacy("B1234XYZ", "MOBIL")
+        v2 = Vehicle.create_legacy("B1234XYZ", "MOBIL")
+        user1.vehicles.append(v1)
+        user2.vehicles.append(v2)
+        repo.save(user1)
+        repo.save(user2)
+        
+        assert repo.find_by_plate("B1234XYZ").id == v1.id
+        repo.delete(user1.id)
+        assert repo.find_by_plate("B1234XYZ").id == v2.id
     
     def test_list(self):
         repo = InMemoryUserRepository()
@@ -147,6 +221,22 @@ class TestUserRepository:
         repo = InMemoryUserRepository()
         result = repo.delete(uuid4())
         assert result is False
+    
+    def test_list_halaman_urut_simpan(self):
+        repo = InMemoryUserRepository()
+        users = [User.create(f"User {i}") for i in range(5)]
+        for user in users:
+            repo.save(user)
+        # simpan ulang tidak memindahkan posisi user
+        repo.save(users[0])
+        repo.delete(users[2].id)
+    
+        halaman1, kursor = repo.list_halaman(batas=2)
+        halaman2, kursor2 = repo.list_halaman(kursor, batas=2)
+    
+        assert [u.id for u in halaman1] == [users[0].id, users[1].id]
+        assert [u.id for u in halaman2] == [users[3].id, users[4].id]
+        assert kursor2 is None
 
 
 class TestSlotRepository:
@@ -197,6 +287,10 @@ class TestSlotRepository:
         assert slot1 in result
         assert slot3 in result
         assert slot2 not in result
+        assert repo.lantai_per_slot() == {slot1.id: 1, slot2.id: 2, slot3.id: 1}
+        
+        repo.delete(slot2.id)
+        assert repo.lantai_per_slot() == {slot1.id: 1, slot3.id: 1}
     
     def test_delete(self):
         repo = InMemorySlotParkirRepository()
@@ -211,6 +305,258 @@ class TestSlotRepository:
         repo = InMemorySlotParkirRepository()
         result = repo.delete(uuid4())
         assert result is False
+    
+    def test_counters_follow_status_transitions(self):
+        from src.manajemen_parkir.domain.alokasi_slot import StatusSlot
+        
+        repo = InMemorySlotParkirRepository()
+        slot1 = SlotParkir.create(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        slot2 = SlotParkir.create(lantai=2, posisi_x=15.0, posisi_y=25.0)
+        repo.save(slot1)
+        repo.save(slot2)
+        
+        slot1.tandai_terisi()
+        assert repo.count_tersedia() == 1
+        assert repo.count_terisi() == 1
+        assert repo.count_by_status(StatusSlot.TERISI) == 1
+        
+        slot2.tandai_rusak()
+        assert repo.count_tersedia() == 0
+        assert repo.count_rusak() == 1
+        
+        per_lantai = repo.count_per_lantai()
+        assert per_lantai[1]["total"] == 1
+        assert per_lantai[1]["TERISI"] == 1
+        assert per_lantai[2]["RUSAK"] == 1
+    
+    def test_list_by_status_partitioned_by_lantai(self):
+        from src.manajemen_parkir.domain.alokasi_slot import StatusSlot
+        
+        repo = InMemorySlotParkirRepository()
+        slot1 = SlotParkir.create(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        slot2 = SlotParkir.create(lantai=1, posisi_x=15.0, posisi_y=20.0)
+        slot3 = SlotParkir.create(lantai=2, posisi_x=10.0, posisi_y=20.0)
+        for slot in (slot1, slot2, slot3):
+            repo.save(slot)
+        
+        slot2.tandai_terisi()
+        
+        assert repo.list_tersedia(1) == [slot1]
+        assert repo.list_tersedia() == [slot1, slot3]
+        assert repo.list_by_status(StatusSlot.TERISI, 1) == [slot2]
+        assert repo.list_by_status(StatusSlot.TERISI, 2) == []
+        assert repo.list_by_lantai(1) == [slot1, slot2]
+        
+        slot2.tandai_tersedia()
+        assert repo.list_tersedia(1) == [slot1, slot2]
+        assert repo.list_by_lantai(1) == [slot1, slot2]
+    
+    def test_save_instance_baru_dengan_id_sama(self):
+        import dataclasses
+        
+        repo = InMemorySlotParkirRepository()
+        lama = SlotParkir.create(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        repo.save(lama)
+        baru = dataclasses.replace(lama, keterangan="baru")
+        repo.save(baru)
+        
+        assert repo.list_by_lantai(1)[0] is baru
+        assert repo.list_tersedia() == [baru]
+        assert repo.list_by_status(StatusSlot.TERSEDIA, 1)[0].keterangan == "baru"
+        assert lama._pengamat is None
+        assert repo.count_tersedia() == 1
+        
+        # perubahan status pada instance lama tidak lagi menyentuh index
+        lama.tandai_rusak()
+        assert repo.count_rusak() == 0
+        assert repo.list_tersedia() == [baru]
+    
+    def test_counters_follow_delete(self):
+        repo = InMemorySlotParkirRepository()
+        slot = SlotParkir.create(lantai=3, posisi_x=10.0, posisi_y=20.0)
+        repo.save(slot)
+        repo.delete(slot.id)
+        
+        slot.tandai_terisi()
+        assert repo.count_tersedia() == 0
+        assert repo.count_terisi() == 0
+        assert 3 not in repo.count_per_lantai()
+    
+    def test_counters_follow_floor_change_on_save(self):
+        repo = InMemorySlotParkirRepository()
+        slot = SlotParkir.create(lantai=1, posisi_x=10.0, posisi_y=20.0)
+        repo.save(slot)
+        
+        slot.koordinat = Koordinat(lantai=2, posisi_x=10.0, posisi_y=20.0)
+        repo.save(slot)
+        
+        per_lantai = repo.count_per_lantai()
+        assert 1 not in per_lantai
+        assert per_lantai[2]["total"] == 1
+        assert repo.count_tersedia() == 1
+    
+    def test_save_many(self):
+        repo = InMemorySlotParkirRepository()
+        slots = [SlotParkir.create(lantai=i % 2, posisi_x=float(i), posisi_y=0.0) for i in range(6)]
+        
+        assert repo.save_many(slots) == slots
+        assert repo.count_total() == 6
+        assert len(repo.list_tersedia(1)) == 3
+        
+        slots[1].tandai_terisi()
+        assert repo.count_terisi() == 1
+        assert repo.cari_tersedia_terdekat(Koordinat(1, 1.0, 0.0)) is slots[3]
+    
+    def test_reservasi_hanya_dari_tersedia(self):
+        repo = InMemorySlotParkirRepository()
+        slot = SlotParkir.create(1, 0, 0)
+        repo.save(slot)
+        
+        assert repo.reservasi(slot.id) is slot
+        assert repo.reservasi(slot.id) is None
+        assert repo.reservasi(uuid4()) is None
+        assert repo.count_terisi() == 1
+        
+        assert repo.lepas(slot.id) is slot
+        assert repo.count_tersedia() == 1
+        assert repo.lepas(slot.id) is None
+        assert repo.lepas(uuid4()) is None
+        
+        # slot rusak tidak ikut menjadi tersedia karena check-out yang terlambat
+        slot.tandai_rusak()
+        assert repo.lepas(slot.id) is None
+        assert repo.count_rusak() == 1
+    
+    def test_cari_tersedia_terdekat_mengikuti_status(self):
+        repo = InMemorySlotParkirRepository(ukuran_sel_grid=5.0)
+        dekat = SlotParkir.create(1, 2.0, 0.0)
+        jauh = SlotParkir.create(1, 40.0, 0.0)
+        repo.save(dekat)
+        repo.save(jauh)
+        pintu = Koordinat(lantai=1, posisi_x=0.0, posisi_y=0.0)
+        
+        assert repo.cari_tersedia_terdekat(pintu) is dekat
+        dekat.tandai_terisi()
+        assert repo.cari_tersedia_terdekat(pintu) is jauh
+        assert repo.cari_tersedia_terdekat(pintu, kecuali={jauh.id}) is None
+        dekat.tandai_tersedia()
+        assert repo.cari_tersedia_terdekat(pintu) is dekat
+        
+        dekat.koordinat = Koordinat(lantai=1, posisi_x=100.0, posisi_y=0.0)
+        repo.save(dekat)
+        assert repo.cari_tersedia_terdekat(pintu) is jauh
+        repo.delete(jauh.id)
+        assert repo.cari_tersedia_terdekat(pintu) is dekat
+    
+    def test_cari_tersedia_terdekat_utamakan_lantai_pintu(self):
+        repo = InMemorySlotParkirRepository()
+        lantai_1 = SlotParkir.create(1, 90.0, 90.0)
+        lantai_2 = SlotParkir.create(2, 0.0, 0.0)
+        lantai_4 = SlotParkir.create(4, 0.0, 0.0)
+        for slot in (lantai_1, lantai_2, lantai_4):
+            repo.save(slot)
+        
+        assert repo.cari_tersedia_terdekat(Koordinat(1, 0.0, 0.0)) is lantai_1
+        assert repo.cari_tersedia_terdekat(Koordinat(3, 0.0, 0.0)) is lantai_2
+        lantai_2.tandai_rusak()
+        assert repo.cari_tersedia_terdekat(Koordinat(3, 0.0, 0.0)) is lantai_4
+    
+    def test_list_halaman_urut_created_at_dengan_filter(self):
+        repo = InMemorySlotParkirRepository()
+        awal = datetime(2024, 1, 1)
+        slots = []
+        for i in range(6):
+            slot = SlotParkir.create(lantai=1 + i % 2, posisi_x=float(i), posisi_y=0.0)
+            slot.created_at = awal + timedelta(minutes=5 - i)
+            slots.append(slot)
+            repo.save(slot)
+        slots[1].tandai_rusak()
+        urut = sorted(slots, key=lambda s: (s.created_at, str(s.id)))
+    
+        semua, kursor = [], None
+        while True:
+            halaman, kursor = repo.list_halaman(kursor, batas=4)
+            semua += halaman
+            if kursor is None:
+                break
+    
+        assert semua == urut
+        lantai_2, _ = repo.list_halaman(batas=10, lantai=2)
+        assert lantai_2 == [s for s in urut if s.koordinat.lantai == 2]
+        rusak, _ = repo.list_halaman(batas=10, status=StatusSlot.RUSAK)
+        assert rusak == [slots[1]]
+        repo.delete(slots[0].id)
+        assert slots[0] not in repo.list_halaman(batas=10)[0]
+
+
+class TestGridSpasial:
+    def test_terdekat_sama_dengan_pencarian_linear(self):
+        rng = random.Random(7)
+        grid = GridSpasial(ukuran_sel=4.0)
+        titik = {uuid4(): (rng.uniform(-50, 50), rng.uniform(-50, 50)) for _ in range(500)}
+        for slot_id, (x, y) in titik.items():
+            grid.tambah(slot_id, x, y)
+        for slot_id in list(titik)[:200]:
+            grid.hapus(slot_id)
+            del titik[slot_id]
+        
+        for _ in range(200):
+            x, y = rng.uniform(-80, 80), rng.uniform(-80, 80)
+            slot_id, jarak = grid.terdekat(x, y)
+            terbaik = min(math.hypot(px - x, py - y) for px, py in titik.values())
+            assert jarak == pytest.approx(terbaik)
+            assert math.hypot(titik[slot_id][0] - x, titik[slot_id][1] - y) == pytest.approx(terbaik)
+    
+    def test_grid_kosong_dan_kecuali(self):
+        grid = GridSpasial()
+        assert grid.terdekat(0.0, 0.0) is None
+        
+        a, b = uuid4(), uuid4()
+        grid.tambah(a, 1.0, 1.0)
+        grid.tambah(b, 500.0, 500.0)
+        assert grid.terdekat(0.0, 0.0)[0] == a
+        assert grid.terdekat(0.0, 0.0, kecuali={a})[0] == b
+        assert grid.terdekat(0.0, 0.0, kecuali={a, b}) is None
+        
+        grid.tambah(a, 499.0, 499.0)
+        assert len(grid) == 2
+        assert grid.terdekat(0.0, 0.0)[0] == a
+    
+    def test_ukuran_sel_harus_positif(self):
+        with pytest.raises(ValueError):
+            GridSpasial(ukuran_sel=0)
+
+
+class TestIndexUrut:
+    def test_setelah_kursor_dan_perubahan_kunci(self):
+        index = IndexUrut()
+        ids = [uuid4() for _ in range(5)]
+        for nilai, item_id in zip([3, 1, 2, 1, 5], ids):
+            index.simpan(item_id, nilai)
+        index.simpan(ids[4], 0)
+        index.hapus(ids[2])
+        
+        kunci = list(index.setelah())
+        assert [k[0] for k in kunci] == [0, 1, 1, 3]
+        assert kunci == sorted(kunci)
+        assert list(index.setelah(kunci[1])) == kunci[2:]
+        # kursor dari API/SQLite membawa id sebagai str
+        assert list(index.setelah((kunci[1][0], str(kunci[1][1])))) == kunci[2:]
+        assert list(index.setelah((1,))) == kunci[1:]
+        assert len(index) == 4
+        assert index.kunci_dari(ids[2]) is None
+    
+    def test_halaman_melewati_item_terfilter(self):
+        index = IndexUrut()
+        ids = [uuid4() for _ in range(10)]
+        for i, item_id in enumerate(ids):
+            index.simpan(item_id, i)
+        genap = {item_id: i for i, item_id in enumerate(ids) if i % 2 == 0}
+        
+        halaman, kursor = index.halaman(None, 3, lambda k: genap.get(k[1]))
+        assert halaman == [0, 2, 4]
+        halaman, kursor = index.halaman(kursor, 3, lambda k: genap.get(k[1]))
+        assert (halaman, kursor) == ([6, 8], None)
 
 
 class TestSesiRepository:
@@ -230,6 +576,18 @@ class TestSesiRepository:
         result = repo.get_by_id(uuid4())
         assert result is None
     
+    def test_selesaikan_hanya_sekali(self):
+        repo = InMemorySesiParkirRepository()
+        sesi = SesiParkir(nomor_plat=NomorPlat("B1234XYZ", "MOBIL"))
+        repo.save(sesi)
+        
+        sesi.check_out(TarifParkir.create("Mobil", TipeKendaraan.MOBIL, Decimal("3000")))
+        
+        assert repo.selesaikan(sesi) is True
+        assert repo.selesaikan(sesi) is False
+        assert repo.list_active() == []
+        assert repo.selesaikan(SesiParkir(nomor_plat=NomorPlat("B1"))) is False
+    
     def test_list(self):
         repo = InMemorySesiParkirRepository()
         sesi1 = SesiParkir(nomor_plat=NomorPlat("B1111", "MOBIL"))
@@ -242,3 +600,348 @@ class TestSesiRepository:
         assert len(result) == 2
         assert sesi1 in result
         assert sesi2 in result
+    
+    def test_list_by_owner(self):
+        repo = InMemorySesiParkirRepository()
+        owner = uuid4()
+        sesi1 = SesiParkir(nomor_plat=NomorPlat("B1111", "MOBIL"), owner_id=owner)
+        sesi2 = SesiParkir(nomor_plat=NomorPlat("B2222", "MOTOR"), owner_id=uuid4())
+        
+        repo.save(sesi1)
+        repo.save(sesi2)
+        
+        result = repo.list_by_owner(owner)
+        assert result == [sesi1]
+        assert repo.list_by_owner(uuid4()) == []
+    
+    def test_active_index_follows_check_out(self):
+        from src.manajemen_parkir.domain.tariff import ParkingTariff
+        
+        repo = InMemorySesiParkirRepository()
+        owner = uuid4()
+        sesi = SesiParkir(nomor_plat=NomorPlat("B1111", "MOBIL"), owner_id=owner)
+        repo.save(sesi)
+        
+        assert repo.list_active() == [sesi]
+        assert repo.list_active_by_owner(owner) == [sesi]
+        assert repo.list_history_by_owner(owner) == []
+        
+        sesi.check_out(ParkingTariff(price_per_hour=3000.0))
+        repo.save(sesi)
+        
+        assert repo.list_active() == []
+        assert repo.list_active_by_owner(owner) == []
+        assert repo.list_history_by_owner(owner) == [sesi]
+    
+    def test_owner_index_follows_owner_change(self):
+        repo = InMemorySesiParkirRepository()
+        owner_lama = uuid4()
+        owner_baru = uuid4()
+        sesi = SesiParkir(nomor_plat=NomorPlat("B1111", "MOBIL"), owner_id=owner_lama)
+        repo.save(sesi)
+        
+        sesi.owner_id = owner_baru
+        repo.save(sesi)
+        
+        assert repo.list_by_owner(owner_lama) == []
+        assert repo.list_by_owner(owner_baru) == [sesi]
+    
+    def test_list_halaman_urut_waktu_masuk(self):
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1, 8, 0)
+        sessions = [
+            SesiParkir(nomor_plat=NomorPlat(f"B{i}", "MOBIL"), waktu_masuk=awal + timedelta(minutes=m))
+            for i, m in enumerate([30, 10, 20, 10, 40])
+        ]
+        for sesi in sessions:
+            repo.save(sesi)
+        urut = sorted(sessions, key=lambda s: (s.waktu_masuk, str(s.id_sesi)))
+    
+        halaman1, kursor = repo.list_halaman(batas=2)
+        # sesi baru setelah kursor tetap muncul di halaman berikutnya
+        baru = SesiParkir(nomor_plat=NomorPlat("B9", "MOBIL"), waktu_masuk=awal + timedelta(hours=1))
+        repo.save(baru)
+        halaman2, kursor = repo.list_halaman(kursor, batas=10)
+    
+        assert halaman1 == urut[:2]
+        assert halaman2 == urut[2:] + [baru]
+        assert kursor is None
+    
+    def test_list_halaman_filter_rentang_status_owner(self):
+        from src.manajemen_parkir.domain.model import StatusSesi
+    
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        owner = uuid4()
+        sessions = []
+        for i in range(6):
+            sesi = SesiParkir(
+                nomor_plat=NomorPlat(f"B{i}", "MOBIL"),
+                waktu_masuk=awal + timedelta(hours=i),
+                owner_id=owner if i != 3 else uuid4(),
+                status=StatusSesi.SELESAI if i % 2 else StatusSesi.AKTIF,
+            )
+            sessions.append(sesi)
+            repo.save(sesi)
+    
+        rentang, _ = repo.list_halaman(batas=10, dari=awal + timedelta(hours=1), sampai=awal + timedelta(hours=4))
+        assert rentang == sessions[1:4]
+        selesai, _ = repo.list_halaman(batas=10, status=StatusSesi.SELESAI, owner_id=owner)
+        assert selesai == [sessions[1], sessions[5]]
+        halaman, kursor = repo.list_halaman(batas=1, dari=awal + timedelta(hours=4))
+        assert halaman == [sessions[4]]
+        assert repo.list_halaman(kursor, batas=1, dari=awal + timedelta(hours=4)) == ([sessions[5]], None)
+
+
+def _sesi_selesai(masuk, menit=90, owner_id=None, biaya="6000", **kwargs):
+    from decimal import Decimal
+    from src.manajemen_parkir.domain.model import StatusSesi
+    from src.manajemen_parkir.domain.value_objects import BiayaFinal, Durasi
+
+    return SesiParkir(
+        nomor_plat=NomorPlat(kwargs.pop("plat", "B1111"), "MOBIL"),
+        waktu_masuk=masuk,
+        waktu_keluar=masuk + timedelta(minutes=menit),
+        status=StatusSesi.SELESAI,
+        durasi=Durasi(total_menit=menit),
+        biaya_final=BiayaFinal(jumlah=Decimal(biaya)),
+        owner_id=owner_id,
+        **kwargs,
+    )
+
+
+def _ids(sessions):
+    return [s.id_sesi for s in sessions]
+
+
+def _nilai(sesi):
+    """Field sesi yang bisa dibandingkan lintas salinan modul domain."""
+    biaya = sesi.biaya_final
+    return (
+        sesi.id_sesi, sesi.nomor_plat.kode, sesi.nomor_plat.tipe_kendaraan,
+        sesi.waktu_masuk, sesi.waktu_keluar, sesi.status.value, sesi.durasi.total_menit,
+        biaya.jumlah, biaya.mata_uang, sesi.owner_id, sesi.vehicle_id, sesi.slot_id,
+    )
+
+
+class TestArsipSesi:
+    def test_arsipkan_hanya_sesi_selesai_dan_nilainya_utuh(self):
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1, 7, 0, 0, 123456)
+        owner = uuid4()
+        selesai = _sesi_selesai(awal, owner_id=owner, biaya="2500.50", vehicle_id=uuid4(), slot_id=uuid4())
+        aktif = SesiParkir(nomor_plat=NomorPlat("B2222", "MOTOR"), owner_id=owner)
+        repo.save(selesai)
+        repo.save(aktif)
+
+        assert repo.arsipkan() == 1
+        assert repo.jumlah_arsip() == 1
+
+        dari_arsip = repo.get_by_id(selesai.id_sesi)
+        assert dari_arsip is not selesai
+        assert _nilai(dari_arsip) == _nilai(selesai)
+        assert str(dari_arsip.biaya_final.jumlah) == "2500.50"
+        assert repo.get_by_id(aktif.id_sesi) is aktif
+        assert repo.list_active() == [aktif]
+        assert _ids(repo.list_by_owner(owner)) == _ids([selesai, aktif])
+        assert _ids(repo.list_history_by_owner(owner)) == [selesai.id_sesi]
+        assert _ids(repo.list()) == _ids([selesai, aktif])
+
+    def test_arsipkan_selesai_sebelum(self):
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        lama = _sesi_selesai(awal)
+        baru = _sesi_selesai(awal + timedelta(hours=5))
+        repo.save(lama)
+        repo.save(baru)
+
+        assert repo.arsipkan(selesai_sebelum=awal + timedelta(hours=3)) == 1
+        assert repo.jumlah_arsip() == 1
+        assert repo.arsipkan(selesai_sebelum=awal + timedelta(hours=3)) == 0
+        assert _ids(repo.list()) == _ids([lama, baru])
+        assert repo.list()[1] is baru
+
+    def test_list_halaman_gabungan_memori_dan_beberapa_segmen(self):
+        from src.manajemen_parkir.domain.model import StatusSesi
+
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        owner = uuid4()
+        sessions = []
+        # tiap kompaksi membuat segmen yang waktunya saling tumpang tindih
+        for gelombang in range(4):
+            for i in range(gelombang, 40, 4):
+                sesi = _sesi_selesai(awal + timedelta(minutes=i), owner_id=owner if i % 3 else None)
+                sessions.append(sesi)
+                repo.save(sesi)
+            repo.arsipkan()
+        aktif = SesiParkir(nomor_plat=NomorPlat("B9", "MOBIL"), waktu_masuk=awal + timedelta(minutes=15, seconds=30))
+        sessions.append(aktif)
+        repo.save(aktif)
+        urut = sorted(sessions, key=lambda s: (s.waktu_masuk, s.id_sesi))
+
+        hasil, kursor = [], None
+        while True:
+            halaman, kursor = repo.list_halaman(kursor, batas=7)
+            hasil.extend(halaman)
+            if kursor is None:
+                break
+
+        assert _ids(hasil) == _ids(urut)
+        milik, _ = repo.list_halaman(batas=100, status=StatusSesi.SELESAI, owner_id=owner)
+        assert _ids(milik) == _ids(s for s in urut if s.owner_id == owner)
+        assert _ids(repo.list_by_owner(owner)) == _ids(milik)
+        rentang, _ = repo.list_halaman(
+            (awal + timedelta(minutes=10), str(urut[10].id_sesi)),
+            batas=100,
+            sampai=awal + timedelta(minutes=20),
+        )
+        assert _ids(rentang) == _ids(urut[11:21])
+        assert repo.list_halaman(batas=10, status=StatusSesi.AKTIF) == ([aktif], None)
+
+    def test_riwayat_owner_beberapa_kendaraan_lintas_segmen(self):
+        from src.manajemen_parkir.domain.model import StatusSesi
+
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        owner = uuid4()
+        sessions = []
+        for gelombang in range(3):
+            for i in range(gelombang, 30, 3):
+                plat = ("B1", "B2", "B3")[i % 3] if i % 2 else "B9"
+                sesi = _sesi_selesai(
+                    awal + timedelta(minutes=i), owner_id=owner if plat != "B9" else None, plat=plat
+                )
+                sessions.append(sesi)
+                repo.save(sesi)
+            repo.arsipkan()
+        keluar = repo.get_by_id(sessions[1].id_sesi)
+        keluar.status = StatusSesi.DIBATALKAN
+        repo.save(keluar)
+
+        arsip = sorted(
+            (s for s in sessions if s.owner_id == owner and s.id_sesi != keluar.id_sesi),
+            key=lambda s: (s.waktu_masuk, s.id_sesi),
+        )
+        assert _ids(repo.list_history_by_owner(owner)) == _ids([*arsip, keluar])
+        milik, _ = repo.list_halaman(
+            (arsip[2].waktu_masuk, str(arsip[2].id_sesi)), batas=100, status=StatusSesi.SELESAI, owner_id=owner
+        )
+        assert _ids(milik) == _ids(arsip[3:])
+
+    def test_sesi_arsip_disimpan_ulang_keluar_dari_arsip(self):
+        from src.manajemen_parkir.domain.model import StatusSesi
+
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        sessions = [_sesi_selesai(awal + timedelta(minutes=i)) for i in range(3)]
+        for sesi in sessions:
+            repo.save(sesi)
+        repo.arsipkan()
+
+        sesi = repo.get_by_id(sessions[1].id_sesi)
+        sesi.status = StatusSesi.DIBATALKAN
+        repo.save(sesi)
+
+        assert repo.jumlah_arsip() == 2
+        assert repo.get_by_id(sesi.id_sesi) is sesi
+        assert [s.status.value for s in repo.list()] == ["SELESAI", "SELESAI", "DIBATALKAN"]
+        assert _ids(repo.list_halaman(batas=10)[0]) == _ids(sessions)
+
+        # kompaksi berikutnya menggabung segmen dan membuang baris lamanya
+        repo.save(_sesi_selesai(awal + timedelta(minutes=5)))
+        repo.arsipkan()
+        assert repo.jumlah_arsip() == 3
+        assert len(repo.list()) == 4
+
+    def test_biaya_yang_tidak_bisa_dibentuk_ulang_tetap_di_memori(self):
+        repo = InMemorySesiParkirRepository()
+        sesi = _sesi_selesai(datetime(2024, 1, 1), biaya="1000.125")
+        repo.save(sesi)
+
+        assert repo.arsipkan() == 0
+        assert repo.get_by_id(sesi.id_sesi) is sesi
+
+    def test_kolom_analitik_gabungan_arsip_dan_memori(self):
+        from src.manajemen_parkir.domain.model import StatusSesi
+
+        repo = InMemorySesiParkirRepository()
+        awal = datetime(2024, 1, 1)
+        slot = uuid4()
+        arsip = [_sesi_selesai(awal + timedelta(hours=i), menit=30 * i, biaya="2500.50", slot_id=slot) for i in range(4)]
+        for sesi in arsip:
+            repo.save(sesi)
+        repo.arsipkan()
+        batal = _sesi_selesai(awal + timedelta(hours=5))
+        batal.status = StatusSesi.DIBATALKAN
+        aktif = SesiParkir(nomor_plat=NomorPlat("B2"), waktu_masuk=awal + timedelta(hours=6))
+        repo.save(batal)
+        repo.save(aktif)
+
+        kolom = repo.kolom_analitik(awal + timedelta(hours=1), awal + timedelta(hours=7))
+
+        assert len(kolom) == 4
+        assert list(kolom.biaya_sen) == [250050, 250050, 250050, 0]
+        assert list(kolom.menit) == [30, 60, 90, 0]
+        assert kolom.keluar[-1] == -(1 << 63)
+        assert [kolom.slot_id.nilai[k] for k in kolom.slot] == [slot, slot, slot, None]
+        assert list(kolom.rentang_run()) == [(0, 3), (3, 4)]
+
+
+class TestTarifRepository:
+    def _tarif(self, tipe=TipeKendaraan.MOTOR, harga="2000", jenis=JenisTarif.REGULER):
+        return TarifParkir.create(
+            nama=f"Tarif {tipe.value}", tipe_kendaraan=tipe, harga_per_jam=Decimal(harga), jenis_tarif=jenis
+        )
+
+    def test_cari_aktif_per_tipe_dan_jenis(self):
+        motor = self._tarif()
+        mobil = self._tarif(TipeKendaraan.MOBIL, "5000")
+        premium = self._tarif(TipeKendaraan.MOBIL, "9000", JenisTarif.PREMIUM)
+        repo = InMemoryTarifParkirRepository([motor, mobil, premium])
+
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is motor
+        assert repo.cari_aktif(TipeKendaraan.MOBIL, JenisTarif.REGULER) is mobil
+        assert repo.cari_aktif(TipeKendaraan.MOBIL, JenisTarif.PREMIUM) is premium
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.PROMO) is None
+        assert repo.get_by_id(motor.id) is motor
+        assert len(repo.list_all()) == 3
+
+        motor.nonaktifkan()
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is None
+        pengganti = repo.save(self._tarif(harga="2500"))
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is pengganti
+        motor.aktifkan()
+        # yang terakhir diubah menang
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is motor
+
+    def test_versi_naik_saat_isi_atau_tarif_berubah(self):
+        repo = InMemoryTarifParkirRepository()
+        tarif = self._tarif()
+        versi = [repo.versi]
+
+        repo.save(tarif)
+        versi.append(repo.versi)
+        tarif.update_harga(Decimal("3000"))
+        versi.append(repo.versi)
+        tarif.nonaktifkan()
+        versi.append(repo.versi)
+        tarif.aktifkan()
+        versi.append(repo.versi)
+        assert versi == sorted(set(versi))
+
+        assert repo.delete(tarif.id)
+        assert not repo.delete(tarif.id)
+        sesudah_hapus = repo.versi
+        tarif.update_harga(Decimal("4000"))
+        assert repo.versi == sesudah_hapus
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is None
+
+    def test_simpan_ulang_memindah_index(self):
+        tarif = self._tarif()
+        repo = InMemoryTarifParkirRepository([tarif])
+        tarif.tipe_kendaraan = TipeKendaraan.MOBIL
+        repo.save(tarif)
+
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is None
+        assert repo.cari_aktif(TipeKendaraan.MOBIL, JenisTarif.REGULER) is tarif
@@ -0,0 +1,607 @@
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from src.manajemen_parkir.infrastructure.sqlite_repository import (
+    SQLiteAuthRepository,
+    SQLiteDatabase,
+    SQLiteSesiParkirRepository,
+    SQLiteSlotParkirRepository,
+    SQLiteTarifParkirRepository,
+    SQLiteUserRepository,
+)
+from src.manajemen_parkir.domain.auth import Akun, Peran
+from src.manajemen_parkir.domain.user import MetodePembayaran, User, Vehicle
+from src.manajemen_parkir.domain.alokasi_slot import (
+    Koordinat, Sensor, SlotParkir, StatusSlot, TipeSensor,
+)
+from src.manajemen_parkir.domain.model import SesiParkir, StatusSesi
+from src.manajemen_parkir.domain.tariff import JenisTarif, TarifParkir, TipeKendaraan
+from src.manajemen_parkir.domain.value_objects import BiayaFinal, Durasi, NomorPlat
+
+
+def _rebut_slot(path, slot_ids, hasil):
+    """Dijalankan di proses terpisah, seperti satu worker uvicorn."""
+    db = SQLiteDatabase(path, pool_size=1)
+    repo = SQLiteSlotParkirRepository(db)
+    hasil.put([str(slot_id) for slot_id in slot_ids if repo.reservasi(slot_id) is not None])
+    db.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "parkir.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+class TestSQLiteDatabase:
+    def test_memakai_wal(self, db):
+        with db.koneksi() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_index_dibuat(self, db):
+        with db.koneksi() as conn:
+            nama = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"ix_vehicles_plate", "ix_slots_lantai_status", "ix_sesi_owner"} <= nama
+
+    def test_menolak_memory(self):
+        with pytest.raises(ValueError):
+            SQLiteDatabase(":memory:")
+
+    def test_transaksi_rollback(self, db):
+        repo = SQLiteAuthRepository(db)
+        with pytest.raises(RuntimeError):
+            with db.transaksi() as conn:
+                conn.execute(
+                    "INSERT INTO akun (id, username, password_hash, peran, created_at, is_active) "
+                    "VALUES ('x', 'x', 'h', 'ADMIN', '2024-01-01', 1)"
+                )
+                raise RuntimeError("gagal")
+        assert repo.username_exists("x") is False
+
+    def test_data_bertahan_setelah_dibuka_ulang(self, tmp_path):
+        path = str(tmp_path / "ulang.db")
+        db1 = SQLiteDatabase(path)
+        akun = Akun.create("petugas", "hash", Peran.PETUGAS)
+        SQLiteAuthRepository(db1).save(akun)
+        db1.close()
+
+        db2 = SQLiteDatabase(path)
+        result = SQLiteAuthRepository(db2).get_by_username("petugas")
+        db2.close()
+        assert result is not None
+        assert result.id == akun.id
+
+    def test_pool_dipakai_banyak_thread(self, db):
+        repo = SQLiteAuthRepository(db)
+        errors = []
+
+        def daftar(i):
+            try:
+                repo.save(Akun.create(f"user{i}", "hash", Peran.PENGGUNA))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=daftar, args=(i,)) for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert len(repo.list()) == 16
+
+
+class TestSQLiteAuthRepository:
+    def test_save_and_get(self, db):
+        repo = SQLiteAuthRepository(db)
+        akun = Akun.create("testuser", "hash123", Peran.ADMIN, email="a@b.c")
+
+        repo.save(akun)
+        result = repo.get_by_id(akun.id)
+
+        assert result.kredensial.username == "testuser"
+        assert result.peran == Peran.ADMIN
+        assert result.email == "a@b.c"
+        assert repo.get_by_username("testuser").id == akun.id
+        assert repo.username_exists("testuser") is True
+        assert repo.username_exists("other") is False
+
+    def test_token_dan_status_tersimpan(self, db):
+        repo = SQLiteAuthRepository(db)
+        akun = Akun.create("testuser", "hash123", Peran.PENGGUNA)
+        repo.save(akun)
+
+        akun.issue_token("tok", 30)
+        akun.is_active = False
+        repo.save(akun)
+        result = repo.get_by_id(akun.id)
+
+        assert result.current_token.token == "tok"
+        assert result.current_token.expires_at == akun.current_token.expires_at
+        assert result.is_active is False
+        assert len(repo.list()) == 1
+
+    def test_delete(self, db):
+        repo = SQLiteAuthRepository(db)
+        akun = Akun.create("testuser", "hash123", Peran.PENGGUNA)
+        repo.save(akun)
+
+        assert repo.delete(akun.id) is True
+        assert repo.delete(akun.id) is False
+        assert repo.get_by_id(akun.id) is None
+
+
+class TestSQLiteUserRepository:
+    def test_save_and_get_with_vehicles(self, db):
+        repo = SQLiteUserRepository(db)
+        user = User.create("Budi", "budi@example.com")
+        user.add_vehicle("B 1234 CD", "MOBIL")
+        user.add_vehicle("D 99 X", "MOTOR")
+        user.tambah_metode_pembayaran(MetodePembayaran.create("EWALLET", "tok", "OVO", is_default=True))
+
+        repo.save(user)
+        result = repo.get_by_id(user.id)
+
+        assert result.name == "Budi"
+        assert [v.nomor_plat.kode for v in result.vehicles] == ["B 1234 CD", "D 99 X"]
+        assert [v.id for v in result.vehicles] == [v.id for v in user.vehicles]
+        metode = result.metode_pembayaran[0]
+        assert (metode.id, metode.nama_penyedia, metode.is_default) == (
+            user.metode_pembayaran[0].id, "OVO", True
+        )
+
+    def test_find_by_plate_normalized(self, db):
+        repo = SQLiteUserRepository(db)
+        user = User.create("Budi")
+        user.vehicles.append(Vehicle.create_legacy("B 1234 CD", "MOBIL"))
+        repo.save(user)
+
+        result = repo.find_by_plate("b1234cd")
+        assert result is not None
+        assert result.plate == "B 1234 CD"
+        assert repo.find_by_plate("XX") is None
+
+    def test_find_by_vehicle_id(self, db):
+        repo = SQLiteUserRepository(db)
+        user = User.create("Budi")
+        vehicle = Vehicle.create_legacy("B 1234 CD", "MOBIL")
+        user.vehicles.append(vehicle)
+        repo.save(user)
+
+        owner, found = repo.find_by_vehicle_id(vehicle.id)
+        assert owner.id == user.id
+        assert found.id == vehicle.id
+        assert repo.find_by_vehicle_id(uuid4()) is None
+
+    def test_resave_replaces_vehicles(self, db):
+        repo = SQLiteUserRepository(db)
+        user = User.create("Budi")
+        vehicle = Vehicle.create_legacy("B 1234 CD", "MOBIL")
+        user.vehicles.append(vehicle)
+        repo.save(user)
+
+        user.vehicles.clear()
+        repo.save(user)
+
+        assert repo.find_by_plate("B 1234 CD") is None
+        assert repo.find_by_vehicle_id(vehicle.id) is None
+
+    def test_list_and_delete(self, db):
+        repo = SQLiteUserRepository(db)
+        user1 = User.create("A")
+        user2 = User.create("B")
+        user1.vehicles.append(Vehicle.create_legacy("A 1", "MOTOR"))
+        repo.save(user1)
+        repo.save(user2)
+
+        assert [u.name for u in repo.list()] == ["A", "B"]
+        assert repo.list()[0].vehicles[0].plate == "A 1"
+
+        assert repo.delete(user1.id) is True
+        assert repo.find_by_plate("A 1") is None
+        assert repo.delete(user1.id) is False
+
+    def test_list_halaman_urut_simpan(self, db):
+        repo = SQLiteUserRepository(db)
+        users = [User.create(f"User {i}") for i in range(5)]
+        for i, user in enumerate(users):
+            user.add_vehicle(f"B {i} A", "MOBIL")
+            repo.save(user)
+        repo.save(users[0])
+
+        halaman1, kursor = repo.list_halaman(batas=3)
+        halaman2, kursor2 = repo.list_halaman(kursor, batas=3)
+
+        assert [u.id for u in halaman1 + halaman2] == [u.id for u in users]
+        assert halaman2[0].vehicles[0].plate == "B 3 A"
+        assert kursor2 is None
+
+    def test_kendaraan_dimuat_per_halaman(self, db, monkeypatch):
+        monkeypatch.setattr(SQLiteUserRepository, "_IN_PER_QUERY", 2)
+        repo = SQLiteUserRepository(db)
+        users = [User.create(f"User {i}") for i in range(5)]
+        for i, user in enumerate(users):
+            user.add_vehicle(f"B {i} A", "MOBIL")
+            user.add_vehicle(f"B {i} B", "MOTOR")
+            repo.save(user)
+
+        halaman, _ = repo.list_halaman(batas=3)
+
+        assert [[v.plate for v in u.vehicles] for u in halaman] == [
+            [f"B {i} A", f"B {i} B"] for i in range(3)
+        ]
+        assert [len(u.vehicles) for u in repo.list()] == [2] * 5
+
+
+class TestSQLiteSlotRepository:
+    def test_save_and_get(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        slot = SlotParkir.create(2, 1.5, 3.0, sensor=Sensor.create(TipeSensor.KAMERA))
+
+        repo.save(slot)
+        result = repo.get_by_id(slot.id)
+
+        assert (result.koordinat.lantai, result.koordinat.posisi_x, result.koordinat.posisi_y) == (2, 1.5, 3.0)
+        assert result.sensor.id == slot.sensor.id
+        assert result.sensor.tipe.value == "KAMERA"
+        assert result.status_ketersediaan.status.value == "TERSEDIA"
+        assert repo.find_by_id(slot.id).id == slot.id
+
+    def test_status_dan_counter(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        slots = [SlotParkir.create(lantai, i, 0) for lantai in (1, 2) for i in range(3)]
+        for slot in slots:
+            repo.save(slot)
+
+        slots[0].tandai_terisi()
+        repo.save(slots[0])
+        slots[4].tandai_rusak()
+        repo.save(slots[4])
+
+        assert repo.count_total() == 6
+        assert repo.count_tersedia() == 4
+        assert repo.count_terisi() == 1
+        assert repo.count_rusak() == 1
+        assert [s.id for s in repo.list_tersedia(1)] == [slots[1].id, slots[2].id]
+        assert [s.id for s in repo.list_by_status(StatusSlot.RUSAK)] == [slots[4].id]
+        assert repo.count_per_lantai() == {
+            1: {"total": 3, "TERSEDIA": 2, "TERISI": 1, "RUSAK": 0},
+            2: {"total": 3, "TERSEDIA": 2, "TERISI": 0, "RUSAK": 1},
+        }
+
+    def test_list_by_lantai_and_delete(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        slot1 = SlotParkir.create(1, 0, 0)
+        slot2 = SlotParkir.create(2, 0, 0)
+        repo.save(slot1)
+        repo.save(slot2)
+
+        assert [s.id for s in repo.list_by_lantai(2)] == [slot2.id]
+        assert repo.lantai_per_slot() == {slot1.id: 1, slot2.id: 2}
+        assert repo.delete(slot1.id) is True
+        assert repo.delete(slot1.id) is False
+        assert [s.id for s in repo.list_all()] == [slot2.id]
+
+
+    def test_save_many(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        slots = [SlotParkir.create(i % 2, float(i), 0.0) for i in range(6)]
+
+        repo.save_many(slots)
+
+        assert repo.count_total() == 6
+        assert [s.id for s in repo.list_tersedia(1)] == [slots[1].id, slots[3].id, slots[5].id]
+
+    def test_reservasi_hanya_dari_tersedia(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        slot = SlotParkir.create(1, 0, 0)
+        rusak = SlotParkir.create(1, 1, 0)
+        rusak.tandai_rusak()
+        repo.save(slot)
+        repo.save(rusak)
+
+        hasil = repo.reservasi(slot.id)
+        assert hasil.status_ketersediaan.status.value == "TERISI"
+        assert repo.reservasi(slot.id) is None
+        assert repo.reservasi(rusak.id) is None
+        assert repo.reservasi(uuid4()) is None
+        assert repo.count_terisi() == 1
+
+        assert repo.lepas(slot.id).status_ketersediaan.status.value == "TERSEDIA"
+        assert repo.count_tersedia() == 1
+        assert repo.lepas(slot.id) is None
+        assert repo.lepas(rusak.id) is None
+        assert repo.count_rusak() == 1
+
+    def test_cari_tersedia_terdekat(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        dekat = SlotParkir.create(1, 2.0, 0.0)
+        jauh = SlotParkir.create(1, 40.0, 0.0)
+        lantai_2 = SlotParkir.create(2, 0.0, 0.0)
+        for slot in (dekat, jauh, lantai_2):
+            repo.save(slot)
+        pintu = Koordinat(lantai=1, posisi_x=0.0, posisi_y=0.0)
+
+        assert repo.cari_tersedia_terdekat(pintu).id == dekat.id
+        assert repo.cari_tersedia_terdekat(pintu, kecuali={dekat.id}).id == jauh.id
+        repo.reservasi(dekat.id)
+        repo.reservasi(jauh.id)
+        assert repo.cari_tersedia_terdekat(pintu).id == lantai_2.id
+        assert repo.cari_tersedia_terdekat(pintu, kecuali={lantai_2.id}) is None
+
+    def test_reservasi_lintas_proses(self, tmp_path):
+        path = str(tmp_path / "bersama.db")
+        db = SQLiteDatabase(path)
+        repo = SQLiteSlotParkirRepository(db)
+        slots = [SlotParkir.create(1, i, 0) for i in range(50)]
+        for slot in slots:
+            repo.save(slot)
+        slot_ids = [slot.id for slot in slots]
+
+        ctx = multiprocessing.get_context("fork")
+        hasil = ctx.Queue()
+        workers = [ctx.Process(target=_rebut_slot, args=(path, slot_ids, hasil)) for _ in range(4)]
+        for w in workers:
+            w.start()
+        didapat = [slot_id for _ in workers for slot_id in hasil.get(timeout=30)]
+        for w in workers:
+            w.join()
+
+        assert sorted(didapat) == sorted(str(slot_id) for slot_id in slot_ids)
+        assert repo.count_terisi() == 50
+        db.close()
+
+    def test_list_halaman_urut_created_at(self, db):
+        repo = SQLiteSlotParkirRepository(db)
+        awal = datetime(2024, 1, 1)
+        slots = []
+        for i in range(7):
+            slot = SlotParkir.create(1 + i % 2, float(i), 0.0)
+            slot.created_at = awal + timedelta(minutes=6 - i)
+            slots.append(slot)
+        repo.save_many(slots)
+        repo.reservasi(slots[3].id)
+        urut = [str(s.id) for s in sorted(slots, key=lambda s: (s.created_at, str(s.id)))]
+
+        semua, kursor = [], None
+        while True:
+            halaman, kursor = repo.list_halaman(kursor, batas=3)
+            semua += [str(s.id) for s in halaman]
+            if kursor is None:
+                break
+
+        assert semua == urut
+        terisi, _ = repo.list_halaman(batas=10, lantai=2, status=StatusSlot.TERISI)
+        assert [s.id for s in terisi] == [slots[3].id]
+
+
+class TestSQLiteSesiRepository:
+    def test_save_and_get(self, db):
+        repo = SQLiteSesiParkirRepository(db)
+        sesi = SesiParkir(nomor_plat=NomorPlat("B 1 A", "MOBIL"), owner_id=uuid4(), slot_id=uuid4())
+
+        repo.save(sesi)
+        result = repo.get_by_id(sesi.id_sesi)
+
+        assert (result.nomor_plat.kode, result.nomor_plat.tipe_kendaraan) == ("B 1 A", "MOBIL")
+        assert result.waktu_masuk == sesi.waktu_masuk
+        assert (result.owner_id, result.slot_id) == (sesi.owner_id, sesi.slot_id)
+        assert result.status.value == "AKTIF"
+        assert repo.get_by_id(uuid4()) is None
+
+    def test_check_out_tersimpan(self, db):
+        repo = SQLiteSesiParkirRepository(db)
+        owner = uuid4()
+        aktif = SesiParkir(nomor_plat=NomorPlat("B 1 A"), owner_id=owner)
+        selesai = SesiParkir(nomor_plat=NomorPlat("B 2 A"), owner_id=owner)
+        repo.save(aktif)
+        repo.save(selesai)
+
+        selesai.waktu_keluar = datetime.utcnow()
+        selesai.durasi = Durasi(total_menit=75)
+        selesai.biaya_final = BiayaFinal(jumlah=Decimal("6000"))
+        repo.save(selesai)
+
+        assert [s.id_sesi for s in repo.list_active_by_owner(owner)] == [aktif.id_sesi]
+        assert [s.id_sesi for s in repo.list_history_by_owner(owner)] == [selesai.id_sesi]
+        assert [s.id_sesi for s in repo.list_active()] == [aktif.id_sesi]
+        assert len(repo.list_by_owner(owner)) == 2
+        assert len(repo.list()) == 2
+        assert repo.get_by_id(selesai.id_sesi).biaya_final.jumlah == Decimal("6000")
+
+    def test_selesaikan_hanya_sekali_lintas_koneksi(self, tmp_path):
+        path = str(tmp_path / "bersama.db")
+        db_a, db_b = SQLiteDatabase(path), SQLiteDatabase(path)
+        repo_a, repo_b = SQLiteSesiParkirRepository(db_a), SQLiteSesiParkirRepository(db_b)
+        sesi = SesiParkir(nomor_plat=NomorPlat("B 1 A", "MOBIL"))
+        repo_a.save(sesi)
+        tarif = TarifParkir.create("Mobil", TipeKendaraan.MOBIL, Decimal("3000"))
+
+        # kedua worker membaca sesi yang masih AKTIF sebelum salah satunya menulis
+        dibaca_a, dibaca_b = repo_a.get_by_id(sesi.id_sesi), repo_b.get_by_id(sesi.id_sesi)
+        dibaca_a.check_out(tarif)
+        dibaca_b.check_out(tarif)
+
+        assert repo_a.selesaikan(dibaca_a) is True
+        assert repo_b.selesaikan(dibaca_b) is False
+        hasil = repo_b.get_by_id(sesi.id_sesi)
+        assert hasil.status.value == "SELESAI"
+        assert hasil.waktu_keluar == dibaca_a.waktu_keluar
+        db_a.close()
+        db_b.close()
+
+    def test_check_out_paralel_hanya_satu_melepas_slot(self, tmp_path):
+        from src.manajemen_parkir.application.services import ParkingService
+
+        path = str(tmp_path / "bersama.db")
+        dbs = [SQLiteDatabase(path), SQLiteDatabase(path)]
+        slot_repo = SQLiteSlotParkirRepository(dbs[0])
+        slots = [SlotParkir.create(1, i, 0) for i in range(20)]
+        slot_repo.save_many(slots)
+        layanan = [
+            ParkingService(SQLiteSesiParkirRepository(db), None, SQLiteSlotParkirRepository(db))
+            for db in dbs
+        ]
+        sesi_ids = [layanan[0].start_parking(uuid4(), uuid4(), slot.id).id_sesi for slot in slots]
+        mulai = threading.Barrier(2)
+
+        def check_out(service):
+            mulai.wait()
+            berhasil = []
+            for sesi_id in sesi_ids:
+                try:
+                    service.end_parking(sesi_id)
+                    berhasil.append(sesi_id)
+                except ValueError as e:
+                    assert "sudah selesai" in str(e)
+            return berhasil
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            hasil = [sid for daftar in pool.map(check_out, layanan) for sid in daftar]
+
+        assert sorted(map(str, hasil)) == sorted(map(str, sesi_ids))
+        assert slot_repo.count_tersedia() == 20
+        for db in dbs:
+            db.close()
+
+    def test_list_halaman_urut_waktu_masuk(self, db):
+        repo = SQLiteSesiParkirRepository(db)
+        awal = datetime(2024, 1, 1, 8, 0)
+        sessions = [
+            SesiParkir(nomor_plat=NomorPlat(f"B {i}"), waktu_masuk=awal + timedelta(minutes=m))
+            for i, m in enumerate([30, 10, 20, 10, 40])
+        ]
+        for sesi in sessions:
+            repo.save(sesi)
+        urut = [s.id_sesi for s in sorted(sessions, key=lambda s: (s.waktu_masuk, str(s.id_sesi)))]
+
+        halaman1, kursor = repo.list_halaman(batas=2)
+        halaman2, kursor2 = repo.list_halaman(kursor, batas=10)
+
+        assert [s.id_sesi for s in halaman1] == urut[:2]
+        assert [s.id_sesi for s in halaman2] == urut[2:]
+        assert kursor == (halaman1[-1].waktu_masuk, str(halaman1[-1].id_sesi))
+        assert kursor2 is None
+
+    def test_list_halaman_filter_rentang_status_owner(self, db):
+        repo = SQLiteSesiParkirRepository(db)
+        awal = datetime(2024, 1, 1)
+        owner = uuid4()
+        sessions = []
+        for i in range(6):
+            sesi = SesiParkir(
+                nomor_plat=NomorPlat(f"B {i}"),
+                waktu_masuk=awal + timedelta(hours=i),
+                owner_id=owner if i != 3 else uuid4(),
+                status=StatusSesi.SELESAI if i % 2 else StatusSesi.AKTIF,
+            )
+            sessions.append(sesi.id_sesi)
+            repo.save(sesi)
+
+        rentang, _ = repo.list_halaman(batas=10, dari=awal + timedelta(hours=1), sampai=awal + timedelta(hours=4))
+        assert [s.id_sesi for s in rentang] == sessions[1:4]
+        selesai, _ = repo.list_halaman(batas=10, status=StatusSesi.SELESAI, owner_id=owner)
+        assert [s.id_sesi for s in selesai] == [sessions[1], sessions[5]]
+        halaman, kursor = repo.list_halaman(batas=1, dari=awal + timedelta(hours=4))
+        berikut, akhir = repo.list_halaman(kursor, batas=1, dari=awal + timedelta(hours=4))
+        assert [s.id_sesi for s in halaman + berikut] == sessions[4:]
+        assert akhir is None
+
+    def test_kolom_analitik(self, db):
+        repo = SQLiteSesiParkirRepository(db)
+        awal = datetime(2024, 1, 1, 8, 0, 0, 250000)
+        slot = uuid4()
+        for i, status in enumerate([StatusSesi.SELESAI, StatusSesi.DIBATALKAN, StatusSesi.AKTIF]):
+            sesi = SesiParkir(
+                nomor_plat=NomorPlat(f"B {i}"),
+                waktu_masuk=awal + timedelta(hours=i),
+                status=status,
+                slot_id=slot if i == 0 else None,
+            )
+            if status is StatusSesi.SELESAI:
+                sesi.waktu_keluar = awal + timedelta(minutes=95)
+                sesi.durasi = Durasi(total_menit=95)
+                sesi.biaya_final = BiayaFinal(jumlah=Decimal("6000.25"))
+            repo.save(sesi)
+
+        kolom = repo.kolom_analitik(sampai=awal + timedelta(hours=3))
+
+        mikro = int((awal - datetime(1970, 1, 1)).total_seconds()) * 1_000_000 + 250000
+        assert list(kolom.masuk) == [mikro, mikro + 2 * 3_600_000_000]
+        assert list(kolom.keluar) == [mikro + 95 * 60_000_000, -(1 << 63)]
+        assert list(kolom.biaya_sen) == [600025, 0]
+        assert list(kolom.menit) == [95, 0]
+        assert [kolom.slot_id.nilai[k] for k in kolom.slot] == [slot, None]
+        assert len(repo.kolom_analitik(dari=awal + timedelta(hours=3))) == 0
+
+
+class TestSQLiteTarifRepository:
+    def test_simpan_cari_aktif_dan_versi(self, db):
+        repo = SQLiteTarifParkirRepository(db)
+        motor = TarifParkir.create(
+            nama="Motor",
+            tipe_kendaraan=TipeKendaraan.MOTOR,
+            harga_per_jam=Decimal("2000.50"),
+            harga_maksimum_harian=Decimal("20000"),
+        )
+        versi_awal = repo.versi
+        repo.save(motor)
+        assert repo.versi == versi_awal + 1
+
+        hasil = repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER)
+        assert hasil.id == motor.id
+        assert hasil.harga_per_jam == Decimal("2000.50")
+        assert hasil.harga_maksimum_harian == Decimal("20000")
+        assert hasil.jenis_tarif.value == "REGULER"
+        assert repo.cari_aktif(TipeKendaraan.MOBIL, JenisTarif.REGULER) is None
+
+        # perubahan entity baru terlihat setelah disimpan
+        motor.nonaktifkan()
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is not None
+        repo.save(motor)
+        assert repo.cari_aktif(TipeKendaraan.MOTOR, JenisTarif.REGULER) is None
+        assert repo.get_by_id(motor.id).is_active is False
+
+        # versi dibagi antar repository di file yang sama (worker lain)
+        lain = SQLiteTarifParkirRepository(SQLiteDatabase(db.path, pool_size=1))
+        assert lain.versi == repo.versi
+        assert lain.delete(motor.id)
+        assert not lain.delete(motor.id)
+        assert repo.versi == versi_awal + 3
+        assert repo.list_all() == []
+        lain.db.close()
+
+    def test_jendela_tarif_tersimpan(self, db):
+        from datetime import time
+        from src.manajemen_parkir.domain.tariff import JendelaTarif
+        
+        repo = SQLiteTarifParkirRepository(db)
+        jendela = (
+            JendelaTarif("MALAM", Decimal("1000.50"), time(22), time(6)),
+            JendelaTarif("PUNCAK", Decimal("6000"), time(7, 30), time(9), frozenset({0, 4})),
+        )
+        tarif = repo.save(TarifParkir.create(
+            nama="Mobil",
+            tipe_kendaraan=TipeKendaraan.MOBIL,
+            harga_per_jam=Decimal("3000"),
+            jendela=jendela,
+            selisih_utc_menit=420,
+        ))
+
+        hasil = repo.get_by_id(tarif.id)
+        assert [(j.nama, j.harga_per_jam, j.mulai, j.selesai, j.hari) for j in hasil.jendela] == [
+            (j.nama, j.harga_per_jam, j.mulai, j.selesai, j.hari) for j in jendela
+        ]
+        assert hasil.selisih_utc_menit == 420
+        masuk = datetime(2024, 1, 1, 0, 15)
+        assert hasil.hitung_sen(masuk, masuk + timedelta(hours=5)) == tarif.hitung_sen(
+            masuk, masuk + timedelta(hours=5)
+        )